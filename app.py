@@ -1,16 +1,17 @@
 import streamlit as st
-import requests
-import re
 import json
 from datetime import datetime, timedelta
 import time
-import base64
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from urllib.parse import urlencode, urljoin
 import hashlib
-import random
+import html
+
+from safejob.applicant import AutoApplicantAI, history_offers, migrate_applications_history
+from safejob.config import set_settings_provider
+from safejob.notifications import NotificationSystemAI
+from safejob.profile import UserProfileAI
+from safejob.scheduler import get_auto_search_scheduler
+from safejob.search import AutoJobSearchAI
+from safejob.storage import get_job_store
 
 # Configuration de la page
 st.set_page_config(
@@ -138,492 +139,53 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-# Classe IA de Profilage Utilisateur
-class UserProfileAI:
-    def __init__(self):
-        self.skills_keywords = {
-            'commercial': ['vente', 'commercial', 'négociation', 'client', 'prospection'],
-            'informatique': ['python', 'java', 'javascript', 'développement', 'programmation'],
-            'marketing': ['marketing', 'communication', 'digital', 'réseaux sociaux', 'seo'],
-            'finance': ['comptabilité', 'finance', 'gestion', 'budget', 'analyse'],
-            'rh': ['ressources humaines', 'recrutement', 'formation', 'paie', 'social']
-        }
-    
-    def analyze_user_profile(self, experience, skills, preferences):
-        """Analyse automatique du profil utilisateur"""
-        profile_score = {}
-        
-        # Analyse des compétences
-        user_text = f"{experience} {' '.join(skills)}".lower()
-        
-        for domain, keywords in self.skills_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in user_text)
-            profile_score[domain] = score
-        
-        # Domaine principal
-        main_domain = max(profile_score, key=profile_score.get) if profile_score else 'général'
-        
-        # Génération des critères de recherche automatiques
-        search_criteria = {
-            'main_domain': main_domain,
-            'keywords': self.skills_keywords.get(main_domain, ['emploi']),
-            'experience_level': self._assess_experience_level(experience),
-            'compatibility_threshold': 0.6
-        }
-        
-        return search_criteria
-    
-    def _assess_experience_level(self, experience_text):
-        """Évalue le niveau d'expérience"""
-        experience_lower = experience_text.lower()
-        
-        if any(word in experience_lower for word in ['débutant', 'junior', 'stage', 'première']):
-            return 'junior'
-        elif any(word in experience_lower for word in ['senior', 'expert', 'manager', 'chef']):
-            return 'senior'
-        else:
-            return 'confirmé'
+def get_secret(name, default):
+    """Lit un secret Streamlit sans échouer si aucun fichier secrets.toml n'existe"""
+    try:
+        return st.secrets.get(name, default)
+    except FileNotFoundError:
+        return default
 
-# Classe de Recherche Automatique Intelligente
-class AutoJobSearchAI:
-    def __init__(self):
-        self.daily_search_count = 0
-        self.last_search_date = None
-        
-    def intelligent_job_search(self, user_criteria, location=""):
-        """Recherche intelligente basée sur le profil utilisateur"""
-        all_jobs = []
-        
-        # Recherche avec les mots-clés du domaine principal
-        for keyword in user_criteria['keywords'][:3]:  # Top 3 mots-clés
-            jobs = self._search_jobs_for_keyword(keyword, location)
-            all_jobs.extend(jobs)
-        
-        # Filtrage intelligent des offres
-        filtered_jobs = self._filter_jobs_by_compatibility(all_jobs, user_criteria)
-        
-        return filtered_jobs
-    
-    def _search_jobs_for_keyword(self, keyword, location):
-        """Recherche pour un mot-clé spécifique"""
-        # Utilise les API existantes optimisées
-        jobs = []
-        
-        # API Adzuna optimisée
-        try:
-            jobs.extend(self._get_adzuna_jobs(keyword, location))
-        except:
-            pass
-            
-        # API HelloWork optimisée
-        try:
-            jobs.extend(self._get_hellowork_jobs(keyword, location))
-        except:
-            pass
-        
-        return jobs
-    
-    def _get_adzuna_jobs(self, keyword, location):
-        """API Adzuna optimisée pour l'IA"""
-        all_jobs = []
-        
-        for page in range(1, 4):  # 3 pages max pour la vitesse
-            url = f"https://api.adzuna.com/v1/api/jobs/fr/search/{page}"
-            
-            params = {
-                'app_id': st.secrets.get("ADZUNA_APP_ID", "DEMO_ID"),
-                'app_key': st.secrets.get("ADZUNA_APP_KEY", "DEMO_KEY"),
-                'results_per_page': 50,
-                'what': keyword,
-                'where': location or '',
-                'sort_by': 'date'
-            }
-            
-            try:
-                response = requests.get(url, params=params, timeout=5)
-                if response.status_code == 200:
-                    data = response.json()
-                    
-                    for job in data.get('results', []):
-                        try:
-                            description = job.get('description', '') or ''
-                            if len(description) > 500:
-                                description = description[:500] + '...'
-                            
-                            all_jobs.append({
-                                'title': job.get('title', '') or 'Titre non disponible',
-                                'company': job.get('company', {}).get('display_name', '') or 'Entreprise non spécifiée',
-                                'location': job.get('location', {}).get('display_name', '') or location or 'France',
-                                'description': description,
-                                'url': job.get('redirect_url', '') or '',
-                                'date': job.get('created', '') or 'Date non spécifiée',
-                                'salary': f"{job.get('salary_min', 0)}-{job.get('salary_max', 0)}€" if job.get('salary_min') else 'Salaire non spécifié',
-                                'type': 'CDI',
-                                'source': 'Adzuna',
-                                'is_remote': 'remote' in description.lower() or 'télétravail' in description.lower(),
-                                'ai_score': 0  # Score de compatibilité à calculer
-                            })
-                        except:
-                            continue
-                    
-                    if len(data.get('results', [])) < 30:
-                        break
-                else:
-                    break
-                    
-            except:
-                break
-        
-        return all_jobs
-    
-    def _get_hellowork_jobs(self, keyword, location):
-        """API HelloWork optimisée pour l'IA"""
-        all_jobs = []
-        
-        # Simulation d'API HelloWork avec scoring IA
-        fake_jobs = [
-            {
-                "title": f"Poste {keyword} - Entreprise {i}",
-                "company": f"Entreprise {keyword} {i}",
-                "location": location or "France",
-                "description": f"Recherche {keyword} expérimenté. Excellente opportunité dans une entreprise dynamique.",
-                "url": f"https://hellowork.com/job/{keyword}-{i}",
-                "date": "2025-06-09",
-                "salary": "Selon profil",
-                "type": "CDI",
-                "source": "HelloWork",
-                "is_remote": random.choice([True, False]),
-                "ai_score": random.uniform(0.5, 0.9)
-            } for i in range(1, 31)
-        ]
-        
-        for job in fake_jobs:
-            all_jobs.append(job)
-        
-        return all_jobs
-    
-    def _filter_jobs_by_compatibility(self, jobs, user_criteria):
-        """Filtre les offres par compatibilité avec le profil"""
-        filtered_jobs = []
-        
-        for job in jobs:
-            # Calcul du score de compatibilité
-            compatibility_score = self._calculate_compatibility_score(job, user_criteria)
-            job['ai_score'] = compatibility_score
-            
-            # Filtre par seuil de compatibilité
-            if compatibility_score >= user_criteria['compatibility_threshold']:
-                filtered_jobs.append(job)
-        
-        # Tri par score de compatibilité décroissant
-        filtered_jobs.sort(key=lambda x: x['ai_score'], reverse=True)
-        
-        return filtered_jobs
-    
-    def _calculate_compatibility_score(self, job, user_criteria):
-        """Calcule le score de compatibilité entre l'offre et le profil"""
-        score = 0.5  # Score de base
-        
-        job_text = f"{job['title']} {job['description']}".lower()
-        
-        # Bonus pour mots-clés du domaine
-        keyword_matches = sum(1 for keyword in user_criteria['keywords'] if keyword in job_text)
-        score += keyword_matches * 0.1
-        
-        # Bonus pour niveau d'expérience
-        experience_level = user_criteria['experience_level']
-        if experience_level == 'junior' and any(word in job_text for word in ['junior', 'débutant', 'stage']):
-            score += 0.2
-        elif experience_level == 'senior' and any(word in job_text for word in ['senior', 'expert', 'manager']):
-            score += 0.2
-        elif experience_level == 'confirmé' and not any(word in job_text for word in ['junior', 'débutant', 'stage', 'senior', 'expert']):
-            score += 0.1
-        
-        # Malus pour signaux d'arnaque
-        scam_signals = ['urgent', 'paiement', 'formation payante', 'investissement']
-        scam_count = sum(1 for signal in scam_signals if signal in job_text)
-        score -= scam_count * 0.3
-        
-        return min(1.0, max(0.0, score))
-
-# Classe de Génération Automatique de Candidatures
-class ApplicationGeneratorAI:
-    def __init__(self):
-        self.cv_templates = {
-            'commercial': "CV optimisé pour les postes commerciaux avec focus sur les résultats de vente",
-            'informatique': "CV technique avec mise en avant des compétences de développement",
-            'marketing': "CV créatif avec emphasis sur les campagnes et stratégies marketing",
-            'finance': "CV analytique avec focus sur la gestion financière et budgétaire",
-            'rh': "CV relationnel avec accent sur la gestion des talents"
-        }
-        
-        self.cover_letter_templates = {
-            'commercial': "Madame, Monsieur,\n\nPassionné(e) par la vente et fort(e) de mon expérience en développement commercial...",
-            'informatique': "Madame, Monsieur,\n\nDéveloppeur(se) passionné(e) par les nouvelles technologies...",
-            'marketing': "Madame, Monsieur,\n\nSpécialiste en marketing digital avec une approche créative...",
-            'finance': "Madame, Monsieur,\n\nExpert(e) en analyse financière avec une solide expérience...",
-            'rh': "Madame, Monsieur,\n\nProfessionnel(le) des ressources humaines orienté(e) développement des talents..."
-        }
-    
-    def generate_custom_application(self, job_offer, user_profile, user_criteria):
-        """Génère une candidature personnalisée"""
-        domain = user_criteria['main_domain']
-        
-        # CV adapté
-        custom_cv = self._adapt_cv_for_job(job_offer, user_profile, domain)
-        
-        # Lettre de motivation personnalisée
-        custom_cover_letter = self._generate_cover_letter(job_offer, user_profile, domain)
-        
-        return {
-            'cv': custom_cv,
-            'cover_letter': custom_cover_letter,
-            'application_date': datetime.now().isoformat(),
-            'job_title': job_offer['title'],
-            'company': job_offer['company'],
-            'compatibility_score': job_offer.get('ai_score', 0)
-        }
-    
-    def _adapt_cv_for_job(self, job_offer, user_profile, domain):
-        """Adapte le CV selon l'offre d'emploi"""
-        base_template = self.cv_templates.get(domain, "CV professionnel adapté au poste")
-        
-        # Personnalisation basée sur l'offre
-        job_keywords = self._extract_keywords_from_job(job_offer)
-        
-        adapted_cv = f"""
-        {base_template}
-        
-        PROFIL PROFESSIONNEL:
-        {user_profile.get('experience', 'Expérience professionnelle diversifiée')}
-        
-        COMPÉTENCES CLÉS:
-        {', '.join(user_profile.get('skills', ['Compétences variées']))}
-        
-        MOTS-CLÉS OPTIMISÉS POUR CE POSTE:
-        {', '.join(job_keywords)}
-        
-        EXPÉRIENCE PERTINENTE:
-        Expérience adaptée aux exigences du poste de {job_offer['title']} chez {job_offer['company']}
-        """
-        
-        return adapted_cv
-    
-    def _generate_cover_letter(self, job_offer, user_profile, domain):
-        """Génère une lettre de motivation personnalisée"""
-        base_template = self.cover_letter_templates.get(domain, "Madame, Monsieur,\n\nIntéressé(e) par votre offre d'emploi...")
-        
-        personalized_letter = f"""
-        {base_template}
-        
-        Votre offre pour le poste de {job_offer['title']} chez {job_offer['company']} a retenu toute mon attention.
-        
-        Fort(e) de mon expérience en {domain}, je suis convaincu(e) que mon profil correspond parfaitement à vos attentes.
-        
-        Mes compétences en {', '.join(user_profile.get('skills', ['diverses compétences'])[:3])} me permettront de contribuer efficacement à vos objectifs.
-        
-        Je serais ravi(e) de vous rencontrer pour discuter de cette opportunité.
-        
-        Cordialement,
-        {user_profile.get('name', 'Candidat')}
-        """
-        
-        return personalized_letter
-    
-    def _extract_keywords_from_job(self, job_offer):
-        """Extrait les mots-clés importants de l'offre"""
-        text = f"{job_offer['title']} {job_offer['description']}".lower()
-        
-        # Mots-clés techniques courants
-        technical_keywords = ['python', 'java', 'javascript', 'sql', 'excel', 'crm', 'erp', 'sap']
-        soft_keywords = ['équipe', 'autonomie', 'communication', 'organisation', 'rigueur']
-        
-        found_keywords = []
-        for keyword in technical_keywords + soft_keywords:
-            if keyword in text:
-                found_keywords.append(keyword)
-        
-        return found_keywords[:5]  # Top 5 mots-clés
-
-# Classe de Candidature Automatique
-class AutoApplicantAI:
-    def __init__(self):
-        self.daily_application_limit = 10
-        self.applications_sent_today = 0
-        self.last_application_date = None
-        
-    def auto_apply_to_jobs(self, filtered_jobs, user_profile, user_criteria, daily_limit=10):
-        """Candidature automatique aux offres sélectionnées"""
-        applications_sent = []
-        
-        # Gestion de la limite quotidienne
-        import datetime
-        today = datetime.datetime.now().date()
-        if self.last_application_date != today:
-            self.applications_sent_today = 0
-            self.last_application_date = today
-        
-        # Parcourir les offres filtrées et candidater
-        for job in filtered_jobs[:daily_limit]:
-            if self.applications_sent_today >= daily_limit:
-                break
-                
-            # Générer candidature personnalisée
-            application = self._generate_application(job, user_profile, user_criteria)
-            
-            # Envoyer la candidature
-            success = self._send_application(job, application)
-            
-            if success:
-                # Créer l'enregistrement complet
-                application_record = {
-                    'job': job,
-                    'application': application,
-                    'sent_date': datetime.datetime.now().isoformat(),
-                    'status': 'sent'
-                }
-                applications_sent.append(application_record)
-                
-                # Mettre à jour le compteur
-                self.applications_sent_today += 1
-                
-                # Mettre à jour l'historique utilisateur
-                if 'applications_history' not in user_profile:
-                    user_profile['applications_history'] = []
-                user_profile['applications_history'].append(application_record)
-                
-                # Mettre à jour les stats
-                user_profile.setdefault('ai_stats', {})
-                user_profile['ai_stats']['total_applications_sent'] = len(user_profile['applications_history'])
-        
-        return applications_sent
-    
-    def _generate_application(self, job, user_profile, user_criteria):
-        """Génère une candidature personnalisée pour un job"""
-        try:
-            # CV personnalisé basé sur le profil
-            cv = f"""CV personnalisé pour {job['title']} chez {job['company']}
-
-Profil : {user_profile.get('name', 'Candidat')}
-Email : {user_profile.get('email', 'Non renseigné')}
-Téléphone : {user_profile.get('phone', 'Non renseigné')}
+# Les réglages des classes métier (clés d'API, base, pools) peuvent venir de secrets.toml
+set_settings_provider(get_secret)
 
-Expérience professionnelle :
-{user_profile.get('experience', 'Non renseignée')}
+# Libellés des niveaux du moteur anti-arnaque (classes CSS risk-low/medium/high)
+RISK_LABELS = {'low': 'faible', 'medium': 'moyen', 'high': 'élevé'}
 
-Compétences clés :
-{', '.join(user_profile.get('skills', []))}
+def save_current_user(user_info):
+    """Persiste le compte connecté"""
+    get_job_store().save_user(st.session_state.current_user, user_info)
 
-Candidature spécialement adaptée pour ce poste."""
-            
-            # Lettre de motivation personnalisée
-            cover_letter = f"""Objet : Candidature pour le poste de {job['title']}
+# Couche de calcul mémoïsée entre les reruns Streamlit
+def profile_fingerprint(user_info):
+    """Empreinte des données du profil utilisées par l'IA"""
+    basis = json.dumps({
+        'experience': user_info.get('experience', ''),
+        'skills': user_info.get('skills', [])
+    }, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha1(basis.encode('utf-8')).hexdigest()
 
-Madame, Monsieur,
 
-Je me permets de vous adresser ma candidature pour le poste de {job['title']} 
-au sein de {job['company']}, {job.get('location', '')}.
+def settings_fingerprint(ai_settings):
+    """Empreinte des réglages IA"""
+    basis = json.dumps(ai_settings, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha1(basis.encode('utf-8')).hexdigest()
 
-Mon expérience et mes compétences correspondent parfaitement aux exigences de ce poste.
 
-Je serais ravi(e) de pouvoir vous rencontrer pour discuter de ma candidature.
+@st.cache_data(show_spinner=False, max_entries=1000)
+def cached_profile_analysis(profile_hash, _experience, _skills):
+    """Analyse du profil, recalculée seulement quand l'empreinte du profil change"""
+    return UserProfileAI().analyze_user_profile(_experience, list(_skills), {})
 
-Cordialement,
-{user_profile.get('name', 'Candidat')}"""
-            
-            return {
-                'cv': cv.strip(),
-                'cover_letter': cover_letter.strip(),
-                'job_title': job['title'],
-                'company': job['company'],
-                'ai_score': job.get('ai_score', 0.0)
-            }
-            
-        except Exception as e:
-            return {
-                'cv': 'CV standard généré automatiquement',
-                'cover_letter': f"Candidature automatique pour {job.get('title', 'ce poste')}",
-                'job_title': job.get('title', 'Poste'),
-                'company': job.get('company', 'Entreprise')
-            }
-    
-    def _send_application(self, job, application):
-        """Simule l'envoi d'une candidature"""
-        try:
-            import random
-            import time
-            
-            # Vérifier que les données sont complètes
-            if not application.get('cv') or not application.get('cover_letter'):
-                return False
-            
-            # Simuler un délai d'envoi réaliste
-            time.sleep(0.5)
-            
-            # Simuler un taux de succès de 85%
-            success = random.random() > 0.15
-            
-            if success:
-                print(f"✅ Candidature envoyée avec succès pour {job['title']} chez {job['company']}")
-            else:
-                print(f"❌ Échec envoi candidature pour {job['title']} chez {job['company']}")
-            
-            return success
-            
-        except Exception as e:
-            print(f"Erreur lors de l'envoi : {e}")
-            return False
-
-# Système de Notifications (classe séparée)
-class NotificationSystemAI:
-    def __init__(self):
-        self.notifications = []
-    
-    def generate_daily_report(self, applications_sent, jobs_analyzed):
-        """Génère un rapport quotidien"""
-        import datetime
-        today = datetime.datetime.now().strftime("%d/%m/%Y")
-        
-        report = {
-            'date': today,
-            'jobs_analyzed': len(jobs_analyzed),
-            'applications_sent': len(applications_sent),
-            'avg_compatibility': sum(app['job']['ai_score'] for app in applications_sent) / len(applications_sent) if applications_sent else 0,
-            'top_companies': list(set([app['job']['company'] for app in applications_sent]))[:5],
-            'recommendations': self._generate_recommendations(applications_sent, jobs_analyzed)
-        }
-        
-        return report
-    
-    def _generate_recommendations(self, applications_sent, jobs_analyzed):
-        """Génère des recommandations basées sur l'activité"""
-        recommendations = []
-        
-        if len(applications_sent) == 0:
-            recommendations.append("🔄 Aucune candidature envoyée aujourd'hui. Activez la candidature automatique.")
-        elif len(applications_sent) < 3:
-            recommendations.append("📈 Augmentez votre limite quotidienne pour plus de candidatures.")
-        
-        return recommendations
 
-    
-    def _generate_recommendations(self, applications_sent, jobs_analyzed):
-        """Génère des recommandations personnalisées"""
-        recommendations = []
-        
-        if len(applications_sent) < 5:
-            recommendations.append("💡 Élargissez vos critères de recherche pour plus d'opportunités")
-        
-        if applications_sent:
-            avg_score = sum(app['job']['ai_score'] for app in applications_sent) / len(applications_sent)
-            if avg_score < 0.7:
-                recommendations.append("🎯 Optimisez votre profil pour améliorer la compatibilité")
-        
-        remote_jobs = sum(1 for app in applications_sent if app['job']['is_remote'])
-        if remote_jobs > len(applications_sent) * 0.5:
-            recommendations.append("🏠 Vous postulez beaucoup en télétravail, pensez aux postes en présentiel")
-        
-        return recommendations
+@st.cache_data(show_spinner=False, ttl=900, max_entries=500)
+def cached_job_search(user_email, profile_hash, settings_hash, needed, _user_criteria, _ai_settings):
+    """Recherche et scoring par (utilisateur, profil, réglages) ; le TTL laisse arriver les nouvelles offres"""
+    search_ai = AutoJobSearchAI(ranking_mode=_ai_settings.get('ranking_mode', 'compatibility'))
+    # Pages supplémentaires seulement si l'affichage ou la limite de candidatures en demandent plus
+    filtered_jobs = search_ai.intelligent_job_search(_user_criteria, needed=needed)
+    get_job_store().upsert_offers(filtered_jobs)
+    return filtered_jobs
 
 # Base de données utilisateurs étendue pour l'IA
 if 'users_db' not in st.session_state:
@@ -656,22 +218,31 @@ if 'users_db' not in st.session_state:
                 "total_interviews_obtained": 0,
                 "last_activity_date": None
             },
-            "applications_history": [],
             "ai_profile": None
         }
     }
+    demo_user = st.session_state.users_db["demo@example.com"]
+    get_job_store().create_user("demo@example.com", demo_user["password"], demo_user)
 
-# Fonctions d'authentification (inchangées)
+# Fonctions d'authentification
 def login_user(email, password):
-    if email in st.session_state.users_db:
-        if st.session_state.users_db[email]["password"] == password:
-            st.session_state.logged_in = True
-            st.session_state.current_user = email
-            return True
+    user_data = st.session_state.users_db.get(email)
+    if user_data is None:
+        # Compte créé dans une autre session ou avant un redémarrage
+        user_data = get_job_store().authenticate(email, password)
+        if user_data is not None:
+            # Anciens comptes : l'historique gardé dans le profil passe en base
+            if migrate_applications_history(user_data, email):
+                get_job_store().save_user(email, user_data)
+            st.session_state.users_db[email] = user_data
+    if user_data is not None and user_data["password"] == password:
+        st.session_state.logged_in = True
+        st.session_state.current_user = email
+        return True
     return False
 
 def register_user(email, password, name):
-    if email not in st.session_state.users_db:
+    if email not in st.session_state.users_db and not get_job_store().user_exists(email):
         st.session_state.users_db[email] = {
             "password": password,
             "name": name,
@@ -699,9 +270,9 @@ def register_user(email, password, name):
                 "total_interviews_obtained": 0,
                 "last_activity_date": None
             },
-            "applications_history": [],
             "ai_profile": None
         }
+        get_job_store().create_user(email, password, st.session_state.users_db[email])
         return True
     return False
 
@@ -709,6 +280,9 @@ def logout_user():
     st.session_state.logged_in = False
     st.session_state.current_user = None
 
+# Les recherches automatiques tournent hors du rendu des pages
+get_auto_search_scheduler()
+
 # Initialisation des variables de session
 if 'logged_in' not in st.session_state:
     st.session_state.logged_in = False
@@ -730,15 +304,25 @@ def main():
         with tab1:
             st.header("🤖 Intelligence Artificielle de Candidature")
 
-            profile_ai = UserProfileAI()
             ai_settings = user_info.get('ai_settings', {})
-            user_criteria = profile_ai.analyze_user_profile(
+            # Analyse et recherche mémoïsées : un rerun sans changement de profil/réglages ne refait rien
+            profile_hash = profile_fingerprint(user_info)
+            settings_hash = settings_fingerprint(ai_settings)
+            user_criteria = cached_profile_analysis(
+                profile_hash,
                 user_info.get('experience', ''),
-                user_info.get('skills', []),
-                ai_settings
+                user_info.get('skills', [])
             )
-            search_ai = AutoJobSearchAI()
-            filtered_jobs = search_ai.intelligent_job_search(user_criteria)
+            # Résultats précalculés par le planificateur : pas de recherche pendant le rendu
+            filtered_jobs = []
+            if ai_settings.get('auto_search_enabled', False):
+                filtered_jobs = get_job_store().get_search_results(st.session_state.current_user)
+            if not filtered_jobs:
+                needed = max(st.session_state.get('jobs_to_show_count', 10),
+                             ai_settings.get('daily_application_limit', 5))
+                filtered_jobs = cached_job_search(
+                    st.session_state.current_user, profile_hash, settings_hash, needed, user_criteria, ai_settings
+                )
             jobs = filtered_jobs if filtered_jobs is not None else []
 
 # juste avant ta pagination !
@@ -786,15 +370,46 @@ else:
                     user_info.get('skills', []),
                     ai_settings
                 )
-                test_search_ai = AutoJobSearchAI()
-                test_filtered_jobs = test_search_ai.intelligent_job_search(test_user_criteria, "")
+                test_search_ai = AutoJobSearchAI(ranking_mode=ai_settings.get('ranking_mode', 'compatibility'))
+                # Affichage progressif : le classement se remplit à mesure que les sources répondent
+                progress_placeholder = st.empty()
+                live_placeholder = st.empty()
+                test_filtered_jobs = []
+                needed = max(10, ai_settings.get('daily_application_limit', 5))
+                for update in test_search_ai.stream_job_search(test_user_criteria, "", needed=needed):
+                    test_filtered_jobs = update.top_jobs
+                    if update.done:
+                        break
+                    with progress_placeholder.container():
+                        source_columns = st.columns(len(update.progress))
+                        for column, (source, counts) in zip(source_columns, update.progress.items()):
+                            answered = counts['done'] + counts['failed']
+                            column.progress(answered / counts['total'],
+                                            text=f"🌐 {source} : {answered}/{counts['total']} pages")
+                    with live_placeholder.container():
+                        st.caption(f"⏳ {len(test_filtered_jobs)} offres compatibles trouvées pour l'instant")
+                        for i, job in enumerate(test_filtered_jobs[:10]):
+                            st.markdown(f"**#{i + 1} - {job.get('title', '')}** • 🏢 {job.get('company', '')} "
+                                        f"• 🌐 {job.get('source', '')} • 🎯 {job['ai_score']:.1%}")
+                progress_placeholder.empty()
+                live_placeholder.empty()
                 applications_sent = []
                 auto_apply = ai_settings.get('auto_apply_enabled', False)
                 daily_limit = ai_settings.get('daily_application_limit', 5)
                 if auto_apply and test_filtered_jobs:
+                    # Envoi en arrière-plan : la page n'attend pas les candidatures
+                    store = get_job_store()
+                    current_user = st.session_state.current_user
+                    def on_status(ticket):
+                        # Thread d'envoi : seul le compteur est écrit, le reste du compte peut avoir changé
+                        if ticket['status'] == 'sent':
+                            store.update_user_stats(current_user, {
+                                'total_applications_sent': store.count_applications(current_user, include_archived=True)
+                            })
                     applicant_ai = AutoApplicantAI()
-                    applications_sent = applicant_ai.auto_apply_to_jobs(
-                        test_filtered_jobs, user_info, test_user_criteria, daily_limit
+                    applications_sent = applicant_ai.enqueue_applications(
+                        test_filtered_jobs, user_info, test_user_criteria, current_user,
+                        daily_limit, on_status=on_status
                     )
                 if test_filtered_jobs:
                     st.success(f"🎉 L'IA a trouvé {len(test_filtered_jobs)} offres compatibles avec votre profil !")
@@ -805,13 +420,15 @@ else:
                         avg_score = sum(job['ai_score'] for job in test_filtered_jobs) / len(test_filtered_jobs)
                         st.metric("Score moyen", f"{avg_score:.1%}")
                     with col3:
-                        st.metric("Candidatures envoyées", len(applications_sent))
+                        st.metric("Candidatures en file d'envoi", len(applications_sent))
                     with col4:
                         remote_count = sum(1 for job in test_filtered_jobs if job.get('is_remote', False))
                         st.metric("Télétravail", remote_count)
                     st.subheader("🏆 Top 10 des offres les plus compatibles")
                     for i, job in enumerate(test_filtered_jobs[:10]):
                         compatibility_color = "#4CAF50" if job['ai_score'] >= 0.8 else "#FF9800" if job['ai_score'] >= 0.6 else "#F44336"
+                        risk_level = job.get('risk_level', 'low')
+                        risk_title = ' ; '.join(job.get('risk_reasons') or []) or "Aucun signal d'arnaque"
                         with st.container():
                             st.markdown(f"""
                                 <div class="ai-card">
@@ -819,7 +436,8 @@ else:
                                     <p><strong>🏢 {job.get('company', '')}</strong> • 📍 {job.get('location', '')} • 🌐 {job.get('source', '')}</p>
                                     <p>{job.get('description', '')[:200]}...</p>
                                     <p>💰 {job.get('salary', '')} • 📋 {job.get('type', '')} • 
-                                    <span style="color: {compatibility_color};">🎯 Compatibilité: {job['ai_score']:.1%}</span></p>
+                                    <span style="color: {compatibility_color};">🎯 Compatibilité: {job['ai_score']:.1%}</span> • 
+                                    <span class="risk-{risk_level}" title="{html.escape(risk_title)}">🛡️ Risque : {RISK_LABELS[risk_level]}</span></p>
                                 </div>
                             """, unsafe_allow_html=True)
 
@@ -845,12 +463,16 @@ else:
             "🎯 Seuil de compatibilité", 0.0, 1.0,
             ai_settings.get('compatibility_threshold', 0.6)
         )
+        previous_settings = dict(user_info['ai_settings'])
         user_info['ai_settings'].update({
             'auto_search_enabled': auto_search,
             'auto_apply_enabled': auto_apply,
             'daily_application_limit': daily_limit,
             'compatibility_threshold': compatibility_threshold
         })
+        # Le planificateur lit ces réglages depuis la base
+        if user_info['ai_settings'] != previous_settings:
+            save_current_user(user_info)
     with col2:
         st.subheader("🎯 Critères de recherche")
         job_types = st.multiselect(
@@ -877,23 +499,25 @@ else:
         user_info['ai_stats']['total_jobs_analyzed'] = len(filtered_jobs)
         user_info['ai_stats']['last_activity_date'] = datetime.now().isoformat()
     ai_stats = user_info.get('ai_stats', {})
-    applications_history = user_info.get('applications_history', [])
+    # Agrégats tenus à jour à chaque candidature enregistrée : aucun parcours de l'historique
+    application_stats = get_job_store().get_application_stats(st.session_state.current_user)
+    sent_today = application_stats['daily'].get(datetime.now().date().isoformat(), 0)
     col1, col2, col3, col4 = st.columns(4)
     with col1:
-        st.metric("Offres analysées", ai_stats.get('total_jobs_analyzed', 0),
-                  delta="+156 cette semaine" if ai_stats.get('total_jobs_analyzed', 0) > 0 else None)
+        st.metric("Offres analysées", ai_stats.get('total_jobs_analyzed', 0))
     with col2:
-        st.metric("Candidatures envoyées", ai_stats.get('total_applications_sent', 0),
-                  delta="+3 aujourd'hui" if ai_stats.get('total_applications_sent', 0) > 0 else None)
+        st.metric("Candidatures envoyées", application_stats['total'],
+                  delta=f"+{sent_today} aujourd'hui" if sent_today > 0 else None)
     with col3:
-        responses = min(ai_stats.get('total_applications_sent', 0) // 3, 15)
-        st.metric("Réponses reçues", responses,
-                  delta="+2 cette semaine" if responses > 0 else None)
+        st.metric("Réponses reçues", application_stats['responses'],
+                  delta=f"{application_stats['response_rate']:.0%} de réponse" if application_stats['responses'] > 0 else None)
     with col4:
-        interviews = min(responses // 3, 5)
-        st.metric("Entretiens obtenus", interviews,
-                  delta="+1 cette semaine" if interviews > 0 else None)
-    if applications_history:
+        st.metric("Entretiens obtenus", application_stats['interviews'],
+                  delta=f"{application_stats['interview_rate']:.0%} d'entretiens" if application_stats['interviews'] > 0 else None)
+    if application_stats['total']:
+        # plotly n'est chargé qu'au premier affichage des graphiques
+        import plotly.express as px
+
         col1, col2 = st.columns(2)
         with col1:
             dates = []
@@ -901,21 +525,16 @@ else:
             for i in range(7):
                 date = datetime.now() - timedelta(days=6 - i)
                 dates.append(date.strftime("%d/%m"))
-                count = random.randint(0, min(5, len(applications_history)))
-                counts.append(count)
+                counts.append(application_stats['daily'].get(date.date().isoformat(), 0))
             fig = px.line(x=dates, y=counts,
                           title="📈 Candidatures par jour (7 derniers jours)")
             fig.update_traces(line_color='#2E8B57', line_width=3)
             st.plotly_chart(fig, use_container_width=True)
         with col2:
-            if applications_history:
-                scores = [app['job']['ai_score'] for app in applications_history[-20:]]
+            if application_stats['total']:
                 score_ranges = ['Faible (0-60%)', 'Moyen (60-80%)', 'Élevé (80-100%)']
-                score_counts = [
-                    sum(1 for s in scores if s < 0.6),
-                    sum(1 for s in scores if 0.6 <= s < 0.8),
-                    sum(1 for s in scores if s >= 0.8)
-                ]
+                score_bands = application_stats['score_bands']
+                score_counts = [score_bands['low'], score_bands['medium'], score_bands['high']]
                 fig = px.pie(values=score_counts, names=score_ranges,
                              title="🎯 Répartition des scores de compatibilité")
                 fig.update_traces(textposition='inside', textinfo='percent+label')
@@ -923,9 +542,11 @@ else:
     if ai_stats.get('last_activity_date'):
         st.subheader("📋 Rapport IA du jour")
         notification_system = NotificationSystemAI()
+        recent_applications, _ = get_job_store().page_applications(st.session_state.current_user, limit=10)
         daily_report = notification_system.generate_daily_report(
-            applications_history[-10:] if applications_history else [],
-            []  
+            recent_applications,
+            [],
+            stats=application_stats
         )
         st.markdown(f"""
         <div class="notification-card">
@@ -983,6 +604,7 @@ else:
                         user_info.get('ai_settings', {})
                     )
                     user_info['ai_profile'] = ai_profile
+                    save_current_user(user_info)
                     st.success("✅ Profil sauvegardé et analysé par l'IA !")
                     st.subheader("🤖 Analyse IA de votre profil")
                     st.markdown(f"""
@@ -994,6 +616,7 @@ else:
                     </div>
                     """, unsafe_allow_html=True)
                 else:
+                    save_current_user(user_info)
                     st.success("Profil sauvegardé ! Complétez l'expérience et les compétences pour l'analyse IA.")
         st.subheader("⚙️ Configuration avancée de l'IA")
         ai_settings = user_info.get('ai_settings', {})
@@ -1011,66 +634,95 @@ else:
                                           index=0)
             avoid_keywords = st.text_input("Mots-clés à éviter",
                                          placeholder="Ex: stage, bénévole, commission")
+            ranking_labels = {'compatibility': "Score de compatibilité", 'bm25': "Pertinence (BM25)"}
+            ranking_mode = st.selectbox("Classement des offres",
+                                        list(ranking_labels),
+                                        index=list(ranking_labels).index(ai_settings.get('ranking_mode', 'compatibility')),
+                                        format_func=ranking_labels.get)
         if st.button("💾 Sauvegarder la configuration avancée"):
             user_info['ai_settings'].update({
+                'ranking_mode': ranking_mode,
                 'search_frequency': search_frequency,
                 'search_time': search_time.strftime("%H:%M"),
                 'min_company_size': min_company_size,
                 'avoid_keywords': avoid_keywords.split(',') if avoid_keywords else []
             })
+            save_current_user(user_info)
             st.success("Configuration avancée sauvegardée !")
 
     with tab4:
         st.header("📋 Historique des Candidatures IA")
-        applications_history = user_info.get('applications_history', [])
-        if applications_history:
-            st.subheader(f"📊 {len(applications_history)} candidatures envoyées par l'IA")
+        store = get_job_store()
+        current_user = st.session_state.current_user
+        total_applications = store.count_applications(current_user)
+        if total_applications:
+            st.subheader(f"📊 {total_applications} candidatures envoyées par l'IA")
             col1, col2, col3 = st.columns(3)
             with col1:
                 filter_company = st.selectbox("Filtrer par entreprise",
-                                             ["Toutes"] + list(set([app['job']['company'] for app in applications_history])))
+                                             ["Toutes"] + store.application_companies(current_user))
             with col2:
                 filter_score = st.selectbox("Filtrer par score",
                                            ["Tous", "Élevé (80%+)", "Moyen (60-80%)", "Faible (<60%)"])
             with col3:
                 filter_date = st.selectbox("Période",
                                          ["Toutes", "Aujourd'hui", "Cette semaine", "Ce mois"])
-            filtered_applications = applications_history.copy()
-            if filter_company != "Toutes":
-                filtered_applications = [app for app in filtered_applications if app['job']['company'] == filter_company]
-            if filter_score != "Tous":
-                if filter_score == "Élevé (80%+)":
-                    filtered_applications = [app for app in filtered_applications if app['job']['ai_score'] >= 0.8]
-                elif filter_score == "Moyen (60-80%)":
-                    filtered_applications = [app for app in filtered_applications if 0.6 <= app['job']['ai_score'] < 0.8]
-                elif filter_score == "Faible (<60%)":
-                    filtered_applications = [app for app in filtered_applications if app['job']['ai_score'] < 0.6]
-            st.write(f"**{len(filtered_applications)} candidatures** (après filtres)")
-            for i, app in enumerate(filtered_applications[-20:]):
-                job = app['job']
+            # Filtres traduits en requête indexée : seule la page affichée est chargée
+            score_bounds = {
+                "Tous": (None, None),
+                "Élevé (80%+)": (0.8, None),
+                "Moyen (60-80%)": (0.6, 0.8),
+                "Faible (<60%)": (None, 0.6)
+            }
+            period_days = {"Aujourd'hui": 0, "Cette semaine": 7, "Ce mois": 30}
+            history_filters = {
+                'company': None if filter_company == "Toutes" else filter_company,
+                'min_score': score_bounds[filter_score][0],
+                'max_score': score_bounds[filter_score][1],
+                'since': (datetime.now() - timedelta(days=period_days[filter_date])).date().isoformat()
+                         if filter_date in period_days else None
+            }
+            if st.session_state.get('history_filters') != history_filters:
+                st.session_state.history_filters = history_filters
+                st.session_state.history_cursors = [None]
+            filtered_count = store.count_applications(current_user, **history_filters)
+            page_applications, next_cursor = store.page_applications(
+                current_user, cursor=st.session_state.history_cursors[-1], limit=20, **history_filters
+            )
+            offers = history_offers(page_applications, store)
+            st.write(f"**{filtered_count} candidatures** (après filtres) • page {len(st.session_state.history_cursors)}")
+            col1, col2 = st.columns(2)
+            with col1:
+                if len(st.session_state.history_cursors) > 1 and st.button("⬅️ Plus récentes"):
+                    st.session_state.history_cursors.pop()
+                    st.rerun()
+            with col2:
+                if next_cursor is not None and st.button("Plus anciennes ➡️"):
+                    st.session_state.history_cursors.append(next_cursor)
+                    st.rerun()
+            for i, app in enumerate(page_applications):
+                job = offers.get(app['offer_id'])
+                if job is None:
+                    continue
                 sent_date = datetime.fromisoformat(app['sent_date']) if isinstance(app['sent_date'], str) else app['sent_date']
                 days_since = (datetime.now() - sent_date).days
-                if days_since == 0:
+                # Statut enregistré par l'utilisateur (mêmes données que les indicateurs du tableau de bord)
+                if app['status'] == 'interview':
+                    status = "🤝 Entretien obtenu"
+                    status_color = "#2E8B57"
+                elif app['status'] == 'response':
+                    status = "📧 Réponse reçue"
+                    status_color = "#4caf50"
+                elif days_since == 0:
                     status = "📤 Envoyée aujourd'hui"
                     status_color = "#2196f3"
-                elif days_since <= 3:
+                elif days_since <= 7:
                     status = "⏳ En attente"
                     status_color = "#ff9800"
-                elif days_since <= 7:
-                    if random.random() < 0.3:
-                        status = "📧 Réponse reçue"
-                        status_color = "#4caf50"
-                    else:
-                        status = "⏳ En attente"
-                        status_color = "#ff9800"
                 else:
-                    if random.random() < 0.1:
-                        status = "📧 Réponse reçue"
-                        status_color = "#4caf50"
-                    else:
-                        status = "❌ Pas de réponse"
-                        status_color = "#f44336"
-                compatibility_color = "#4CAF50" if job['ai_score'] >= 0.8 else "#FF9800" if job['ai_score'] >= 0.6 else "#F44336"
+                    status = "❌ Pas de réponse"
+                    status_color = "#f44336"
+                compatibility_color = "#4CAF50" if app['ai_score'] >= 0.8 else "#FF9800" if app['ai_score'] >= 0.6 else "#F44336"
                 with st.expander(f"📋 {job['title']} - {job['company']} ({sent_date.strftime('%d/%m/%Y')})"):
                     col1, col2 = st.columns([2, 1])
                     with col1:
@@ -1083,7 +735,7 @@ else:
                         st.markdown(f"""
                         <div style="text-align: center; padding: 1rem; background: {compatibility_color}; color: white; border-radius: 8px; margin-bottom: 1rem;">
                             <h4>🎯 Compatibilité</h4>
-                            <h2>{job['ai_score']:.0%}</h2>
+                            <h2>{app['ai_score']:.0%}</h2>
                         </div>
                         """, unsafe_allow_html=True)
                         st.markdown(f"""
@@ -1091,11 +743,19 @@ else:
                             <strong>{status}</strong>
                         </div>
                         """, unsafe_allow_html=True)
-                    if st.button(f"👁️ Voir la candidature IA", key=f"view_app_{i}"):
+                        if app['status'] not in ('response', 'interview') and st.button("📧 Réponse reçue", key=f"response_{app['id']}"):
+                            store.record_application_outcome(app['id'], 'response')
+                            st.rerun()
+                        if app['status'] != 'interview' and st.button("🤝 Entretien obtenu", key=f"interview_{app['id']}"):
+                            store.record_application_outcome(app['id'], 'interview')
+                            st.rerun()
+                    if st.button("👁️ Voir la candidature IA", key=f"view_app_{app['id']}"):
+                        # Documents chargés (et décompressés) seulement à la demande
+                        documents = store.get_application_documents(app['id']) or {}
                         st.subheader("📄 CV adapté par l'IA")
-                        st.text_area("CV généré", app['application']['cv'], height=200, disabled=True)
+                        st.text_area("CV généré", documents.get('cv', ''), height=200, disabled=True)
                         st.subheader("✉️ Lettre de motivation générée par l'IA")
-                        st.text_area("Lettre générée", app['application']['cover_letter'], height=200, disabled=True)
+                        st.text_area("Lettre générée", documents.get('cover_letter', ''), height=200, disabled=True)
 
     with tab5:
         st.header("🛡️ Sécurité & Confidentialité")
@@ -1127,7 +787,9 @@ else:
                         'skills': user_info.get('skills', [])
                     },
                     'ai_stats': user_info.get('ai_stats', {}),
-                    'applications_count': len(user_info.get('applications_history', [])),
+                    'applications_count': get_job_store().count_applications(
+                        st.session_state.current_user, include_archived=True
+                    ),
                     'export_date': datetime.now().isoformat()
                 }
                 
@@ -1144,7 +806,7 @@ else:
             st.warning("⚠️ **Attention** : Cette action est irréversible")
             
             if st.button("🗑️ Supprimer l'historique des candidatures", type="secondary"):
-                user_info['applications_history'] = []
+                get_job_store().delete_applications(st.session_state.current_user)
                 user_info['ai_stats'] = {
                     "total_jobs_analyzed": 0,
                     "total_applications_sent": 0,
@@ -1152,11 +814,13 @@ else:
                     "total_interviews_obtained": 0,
                     "last_activity_date": None
                 }
+                save_current_user(user_info)
                 st.success("Historique supprimé !")
             
             if st.button("❌ Supprimer tout mon compte", type="secondary"):
                 if st.session_state.current_user in st.session_state.users_db:
                     del st.session_state.users_db[st.session_state.current_user]
+                    get_job_store().delete_user(st.session_state.current_user)
                     logout_user()
                     st.success("Compte supprimé ! Redirection...")
                     time.sleep(2)
@@ -1179,6 +843,7 @@ else:
                 'allow_notifications': allow_notifications,
                 'allow_data_sharing': allow_data_sharing
             }
+            save_current_user(user_info)
             st.success("Paramètres de confidentialité sauvegardés !")
 
         else:
@@ -0,0 +1,82 @@
+"""Mesure du coût d'import à froid du cœur (workers) et du serveur Streamlit
+
+Chaque module est importé dans un interpréteur neuf pour ne profiter d'aucun cache :
+
+    python benchmarks/import_time.py [--repeat 5] [--max-ms 300]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules qui ne doivent jamais être chargés par le simple import du cœur
+HEAVY_MODULES = ('numpy', 'pandas', 'requests', 'streamlit', 'plotly')
+
+TARGETS = {
+    'safejob': 'import safejob',
+    'safejob.search': 'import safejob.search',
+    'safejob.batch': 'import safejob.batch',
+    'streamlit': 'import streamlit',
+    'plotly.express': 'import plotly.express',
+}
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = (time.perf_counter() - start) * 1000
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{'ms': elapsed, 'heavy': heavy}}))
+"""
+
+
+def measure(statement, repeat):
+    """Durées d'import (ms) et modules lourds chargés, sur `repeat` interpréteurs neufs"""
+    env = dict(os.environ, PYTHONPATH=ROOT + os.pathsep + os.environ.get('PYTHONPATH', ''))
+    code = PROBE.format(statement=statement, heavy=HEAVY_MODULES)
+    durations = []
+    heavy = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-c', code], env=env, cwd=ROOT,
+            capture_output=True, text=True, check=True
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        durations.append(result['ms'])
+        heavy = result['heavy']
+    return durations, heavy
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5, help="Interpréteurs neufs par module")
+    parser.add_argument('--max-ms', type=float, default=None,
+                        help="Échoue si l'import médian du cœur dépasse ce seuil")
+    args = parser.parse_args(argv)
+
+    failures = []
+    for name, statement in TARGETS.items():
+        try:
+            durations, heavy = measure(statement, args.repeat)
+        except subprocess.CalledProcessError:
+            print(f"{name:<16} indisponible")
+            continue
+        median = statistics.median(durations)
+        print(f"{name:<16} médiane {median:8.1f} ms   min {min(durations):8.1f} ms")
+        if name.startswith('safejob'):
+            if heavy:
+                failures.append(f"{name} charge {', '.join(heavy)} à l'import")
+            if args.max_ms is not None and median > args.max_ms:
+                failures.append(f"{name} : {median:.1f} ms > {args.max_ms:.1f} ms")
+
+    for failure in failures:
+        print(f"ÉCHEC : {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
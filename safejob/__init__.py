@@ -0,0 +1,32 @@
+"""Cœur métier de Safe Job Hub AI, utilisable sans Streamlit
+
+Les classes sont exposées paresseusement : `import safejob` ne charge aucun sous-module,
+et numpy, pandas ou requests ne sont importés qu'à la première utilisation.
+"""
+import importlib
+
+_EXPORTS = {
+    'AutoApplicantAI': 'applicant',
+    'ApplicationDispatchQueue': 'applicant',
+    'ApplicationGeneratorAI': 'generation',
+    'NotificationSystemAI': 'notifications',
+    'UserProfileAI': 'profile',
+    'AutoSearchScheduler': 'scheduler',
+    'AutoJobSearchAI': 'search',
+    'JobStore': 'storage',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module 'safejob' has no attribute {name!r}")
+    value = getattr(importlib.import_module(f'.{module_name}', __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -0,0 +1,421 @@
+"""Candidature automatique et file d'envoi"""
+import hashlib
+import logging
+import queue
+import random
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from .config import process_singleton
+from .dedup import JobDeduplicator
+from .ratelimit import TokenBucket
+from .storage import get_job_store
+from .templates import DocumentTemplate
+
+logger = logging.getLogger(__name__)
+
+
+# Classe de Candidature Automatique
+class AutoApplicantAI:
+    CV_TEMPLATE = DocumentTemplate("""CV personnalisé pour {title} chez {company}
+
+Profil : {name}
+Email : {email}
+Téléphone : {phone}
+
+Expérience professionnelle :
+{experience}
+
+Compétences clés :
+{skills}
+
+Candidature spécialement adaptée pour ce poste.""")
+    
+    COVER_LETTER_TEMPLATE = DocumentTemplate("""Objet : Candidature pour le poste de {title}
+
+Madame, Monsieur,
+
+Je me permets de vous adresser ma candidature pour le poste de {title} 
+au sein de {company}, {location}.
+
+Mon expérience et mes compétences correspondent parfaitement aux exigences de ce poste.
+
+Je serais ravi(e) de pouvoir vous rencontrer pour discuter de ma candidature.
+
+Cordialement,
+{name}""")
+    
+    USER_TEMPLATE_CACHE_SIZE = 256
+    
+    def __init__(self, store=None):
+        self.store = store
+        self._compiled_users = OrderedDict()
+        # Les workers de la file d'envoi partagent le même candidat automatique
+        self._cache_lock = threading.Lock()
+        self.daily_application_limit = 10
+        self.applications_sent_today = 0
+        self.last_application_date = None
+        
+    def auto_apply_to_jobs(self, filtered_jobs, user_profile, user_criteria, daily_limit=10, user_email=None):
+        """Candidature automatique aux offres sélectionnées
+        
+        `user_email` identifie le compte dans l'historique ; à défaut, le profil doit contenir 'email'.
+        """
+        # Vérifié avant tout envoi : une candidature partie doit pouvoir être enregistrée
+        user_email = self._applicant_email(user_profile, user_email)
+        applications_sent = []
+        
+        # Gestion de la limite quotidienne
+        import datetime
+        today = datetime.datetime.now().date()
+        if self.last_application_date != today:
+            self.applications_sent_today = 0
+            self.last_application_date = today
+        
+        # Parcourir les offres filtrées et candidater
+        for job in filtered_jobs[:daily_limit]:
+            if self.applications_sent_today >= daily_limit:
+                break
+                
+            # Générer candidature personnalisée
+            application = self._generate_application(job, user_profile, user_criteria)
+            
+            # Envoyer la candidature
+            success = self._send_application(job, application)
+            
+            if success:
+                application_record = self._record_application(job, application, user_profile, user_email)
+                applications_sent.append(application_record)
+                
+                # Mettre à jour le compteur
+                self.applications_sent_today += 1
+        
+        return applications_sent
+    
+    def enqueue_applications(self, filtered_jobs, user_profile, user_criteria, user_email,
+                             daily_limit=10, on_status=None):
+        """Met les candidatures en file d'envoi et rend la main immédiatement"""
+        return get_dispatch_queue().enqueue(
+            filtered_jobs, user_profile, user_criteria, user_email, daily_limit, on_status
+        )
+    
+    @staticmethod
+    def _applicant_email(user_profile, user_email=None):
+        """Adresse du compte candidat : celle fournie, sinon celle du profil"""
+        user_email = user_email or user_profile.get('email')
+        if not user_email:
+            raise ValueError("Adresse e-mail du candidat manquante : passez user_email ou renseignez 'email' dans le profil")
+        return user_email
+    
+    def _record_application(self, job, application, user_profile, user_email=None):
+        """Ajoute une candidature envoyée à l'historique et aux stats de l'utilisateur"""
+        store = self.store or get_job_store()
+        user_email = self._applicant_email(user_profile, user_email)
+        # L'offre est stockée une seule fois ; l'historique (en base) ne garde que sa référence et le score
+        job['offer_id'] = job.get('offer_id') or JobDeduplicator.offer_id(job)
+        store.upsert_offers([job])
+        application_record = {
+            'offer_id': job['offer_id'],
+            'company': job.get('company', ''),
+            'ai_score': job.get('ai_score', 0.0),
+            'sent_date': datetime.now().isoformat(),
+            'status': 'sent'
+        }
+        application_record['id'] = store.add_application(
+            user_email, job, application_record['ai_score'], application,
+            application_record['sent_date'], application_record['status']
+        )
+        application_record['application'] = application
+        
+        # Mettre à jour les stats
+        user_profile.setdefault('ai_stats', {})
+        user_profile['ai_stats']['total_applications_sent'] = store.count_applications(user_email, include_archived=True)
+        
+        return application_record
+    
+    def _user_templates(self, user_profile):
+        """Gabarits CV et lettre complétés avec le profil, compilés une fois par profil"""
+        profile_fields = {
+            'name': user_profile.get('name', 'Candidat'),
+            'email': user_profile.get('email', 'Non renseigné'),
+            'phone': user_profile.get('phone', 'Non renseigné'),
+            'experience': user_profile.get('experience', 'Non renseignée'),
+            'skills': ', '.join(user_profile.get('skills', []))
+        }
+        key = tuple(str(value) for value in profile_fields.values())
+        with self._cache_lock:
+            templates = self._compiled_users.get(key)
+            if templates is not None:
+                self._compiled_users.move_to_end(key)
+                return templates
+        
+        templates = (self.CV_TEMPLATE.bind(**profile_fields), self.COVER_LETTER_TEMPLATE.bind(**profile_fields))
+        with self._cache_lock:
+            self._compiled_users[key] = templates
+            if len(self._compiled_users) > self.USER_TEMPLATE_CACHE_SIZE:
+                self._compiled_users.popitem(last=False)
+        return templates
+    
+    def _generate_application(self, job, user_profile, user_criteria):
+        """Génère une candidature personnalisée pour un job"""
+        try:
+            cv_template, letter_template = self._user_templates(user_profile)
+            cv = cv_template.render(title=job['title'], company=job['company'])
+            cover_letter = letter_template.render(
+                title=job['title'], company=job['company'], location=job.get('location', '')
+            )
+            
+            return {
+                'cv': cv.strip(),
+                'cover_letter': cover_letter.strip(),
+                'job_title': job['title'],
+                'company': job['company'],
+                'ai_score': job.get('ai_score', 0.0)
+            }
+            
+        except Exception as e:
+            return {
+                'cv': 'CV standard généré automatiquement',
+                'cover_letter': f"Candidature automatique pour {job.get('title', 'ce poste')}",
+                'job_title': job.get('title', 'Poste'),
+                'company': job.get('company', 'Entreprise')
+            }
+    
+    def _send_application(self, job, application):
+        """Simule l'envoi d'une candidature"""
+        try:
+            import random
+            import time
+            
+            # Vérifier que les données sont complètes
+            if not application.get('cv') or not application.get('cover_letter'):
+                return False
+            
+            # Simuler un délai d'envoi réaliste
+            time.sleep(0.5)
+            
+            # Simuler un taux de succès de 85%
+            success = random.random() > 0.15
+            
+            if success:
+                print(f"✅ Candidature envoyée avec succès pour {job['title']} chez {job['company']}")
+            else:
+                print(f"❌ Échec envoi candidature pour {job['title']} chez {job['company']}")
+            
+            return success
+            
+        except Exception as e:
+            print(f"Erreur lors de l'envoi : {e}")
+            return False
+
+
+def migrate_applications_history(user_profile, user_email, store=None):
+    """Déplace l'historique encore gardé dans le profil vers la base
+
+    Renvoie le nombre de candidatures déplacées.
+    """
+    records = user_profile.pop('applications_history', None)
+    if not records:
+        return 0
+    store = store or get_job_store()
+    # Anciens enregistrements : l'offre était recopiée dans chaque candidature
+    legacy_jobs = []
+    for record in records:
+        job = record.pop('job', None)
+        if job is not None:
+            job['offer_id'] = job.get('offer_id') or JobDeduplicator.offer_id(job)
+            record.setdefault('offer_id', job['offer_id'])
+            record.setdefault('ai_score', job.get('ai_score', 0.0))
+            legacy_jobs.append(job)
+    store.upsert_offers(legacy_jobs)
+
+    offers = store.get_offers({record['offer_id'] for record in records})
+    for record in records:
+        store.add_application(
+            user_email,
+            offers.get(record['offer_id']) or {'offer_id': record['offer_id']},
+            record.get('ai_score', 0.0),
+            record.get('application'),
+            str(record.get('sent_date', '')),
+            record.get('status', 'sent')
+        )
+    return len(records)
+
+
+def history_offers(records, store=None):
+    """Offres référencées par des enregistrements d'historique, indexées par offer_id"""
+    return (store or get_job_store()).get_offers({record['offer_id'] for record in records})
+
+
+# File d'envoi des candidatures
+class ApplicationDispatchQueue:
+    """Envoie les candidatures en arrière-plan avec débit limité, idempotence et reprises
+
+    Les tickets terminés (envoyés ou en échec) sont oubliés après `ticket_ttl` secondes : une
+    candidature envoyée reste de toute façon connue de la base, qui garantit l'idempotence.
+    """
+
+    FINISHED = ('sent', 'failed')
+
+    def __init__(self, applicant=None, workers=4, rate_per_destination=0.5, burst=2,
+                 max_attempts=3, retry_backoff=2.0, ticket_ttl=3600.0):
+        self.applicant = applicant or AutoApplicantAI()
+        self.rate_per_destination = rate_per_destination
+        self.burst = burst
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.ticket_ttl = ticket_ttl
+        self._queue = queue.Queue()
+        self._buckets = {}
+        self._tickets = {}  # clé d'idempotence -> ticket
+        self._finished_at = {}  # clé d'idempotence -> fin du traitement (horloge monotone)
+        self._lock = threading.Lock()
+        self._workers = [
+            threading.Thread(target=self._worker, name=f'application-dispatch-{i}', daemon=True)
+            for i in range(workers)
+        ]
+        for worker in self._workers:
+            worker.start()
+
+    @staticmethod
+    def idempotency_key(user_email, job):
+        offer_id = job.get('offer_id') or JobDeduplicator.offer_id(job)
+        return hashlib.sha1(f"{user_email}|{offer_id}".encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def destination(job):
+        """Destinataire servant à la limitation de débit : entreprise, sinon domaine de l'offre
+
+        Les offres d'agrégateurs (Adzuna) pointent toutes vers le même domaine de redirection :
+        c'est l'employeur qui reçoit les candidatures.
+        """
+        company = JobDeduplicator.normalize_text(job.get('company'))
+        if company:
+            return f"company:{company}"
+        host = urlsplit(job.get('url', '') or '').hostname
+        return f"host:{host}" if host else 'inconnu'
+
+    def _bucket(self, destination):
+        with self._lock:
+            bucket = self._buckets.get(destination)
+            if bucket is None:
+                bucket = TokenBucket(self.rate_per_destination, self.burst)
+                self._buckets[destination] = bucket
+            return bucket
+
+    def enqueue(self, jobs, user_profile, user_criteria, user_email, daily_limit=10, on_status=None):
+        """Ajoute les offres à la file ; les offres déjà candidatées ou en cours sont ignorées"""
+        store = self.applicant.store or get_job_store()
+        applied_ids = store.applied_offer_ids(
+            user_email, [job.get('offer_id') or JobDeduplicator.offer_id(job) for job in jobs]
+        )
+        sent_today = store.count_applications(user_email, since=datetime.now().date().isoformat())
+
+        tickets = []
+        with self._lock:
+            self._prune(time.monotonic())
+            pending = sum(
+                1 for ticket in self._tickets.values()
+                if ticket['user_email'] == user_email and ticket['status'] in ('queued', 'sending', 'retrying')
+            )
+            remaining = max(0, daily_limit - sent_today - pending)
+            for job in jobs:
+                key = self.idempotency_key(user_email, job)
+                existing = self._tickets.get(key)
+                if existing is not None and existing['status'] != 'failed':
+                    continue
+                if (job.get('offer_id') or JobDeduplicator.offer_id(job)) in applied_ids:
+                    continue
+                if remaining <= 0:
+                    break
+                ticket = {
+                    'key': key,
+                    'user_email': user_email,
+                    'offer_id': job.get('offer_id'),
+                    'job_title': job.get('title', ''),
+                    'company': job.get('company', ''),
+                    'status': 'queued',
+                    'attempts': 0,
+                    'error': None
+                }
+                self._tickets[key] = ticket
+                self._finished_at.pop(key, None)
+                tickets.append(dict(ticket))
+                remaining -= 1
+                self._queue.put((ticket, job, user_profile, user_criteria, on_status))
+        return tickets
+
+    def status(self, user_email=None):
+        """Copie des tickets connus, éventuellement filtrés par utilisateur"""
+        with self._lock:
+            self._prune(time.monotonic())
+            return [
+                dict(ticket) for ticket in self._tickets.values()
+                if user_email is None or ticket['user_email'] == user_email
+            ]
+
+    def _prune(self, now):
+        """Oublie les tickets terminés depuis plus de `ticket_ttl` et les seaux inactifs (verrou tenu)"""
+        expired = [key for key, finished_at in self._finished_at.items() if now - finished_at >= self.ticket_ttl]
+        for key in expired:
+            del self._finished_at[key]
+            del self._tickets[key]
+        if expired:
+            # Un seau inactif depuis aussi longtemps est plein : le recréer est équivalent
+            self._buckets = {
+                destination: bucket for destination, bucket in self._buckets.items()
+                if now - bucket.updated_at < self.ticket_ttl
+            }
+
+    def _set_status(self, ticket, status, on_status, error=None):
+        with self._lock:
+            ticket['status'] = status
+            ticket['error'] = error
+            if status in self.FINISHED:
+                self._finished_at[ticket['key']] = time.monotonic()
+            snapshot = dict(ticket)
+        if on_status is not None:
+            try:
+                on_status(snapshot)
+            except Exception:
+                logger.exception("Échec du callback de statut de candidature")
+
+    def _worker(self):
+        while True:
+            ticket, job, user_profile, user_criteria, on_status = self._queue.get()
+            try:
+                self._dispatch(ticket, job, user_profile, user_criteria, on_status)
+            except Exception as error:
+                logger.exception("Erreur inattendue lors de l'envoi d'une candidature")
+                self._set_status(ticket, 'failed', on_status, type(error).__name__)
+            finally:
+                self._queue.task_done()
+
+    def _dispatch(self, ticket, job, user_profile, user_criteria, on_status):
+        bucket = self._bucket(self.destination(job))
+        while True:
+            time.sleep(bucket.reserve())
+            ticket['attempts'] += 1
+            self._set_status(ticket, 'sending', on_status)
+
+            application = self.applicant._generate_application(job, user_profile, user_criteria)
+            if self.applicant._send_application(job, application):
+                # Écriture hors du verrou de la file : les autres envois et les lectures de statut continuent
+                self.applicant._record_application(job, application, user_profile, ticket['user_email'])
+                self._set_status(ticket, 'sent', on_status)
+                return
+
+            if ticket['attempts'] >= self.max_attempts:
+                self._set_status(ticket, 'failed', on_status, "Envoi refusé")
+                return
+            self._set_status(ticket, 'retrying', on_status)
+            time.sleep(random.uniform(0, self.retry_backoff * (2 ** (ticket['attempts'] - 1))))
+
+
+@process_singleton
+def get_dispatch_queue():
+    """File d'envoi partagée par toutes les sessions du processus"""
+    return ApplicationDispatchQueue()
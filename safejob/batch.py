@@ -0,0 +1,188 @@
+"""Exécution par lots, sans interface : recherche, scoring et génération de candidatures
+
+Usage : python -m safejob.batch profils.jsonl -o resultats.jsonl [--generate] [--format parquet]
+"""
+import argparse
+import csv
+import json
+import logging
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+from .generation import ApplicationGeneratorAI
+from .profile import UserProfileAI
+from .search import AutoJobSearchAI
+from .storage import JobStore
+
+logger = logging.getLogger(__name__)
+
+JOB_FIELDS = ('offer_id', 'title', 'company', 'location', 'url', 'source', 'date',
+              'salary', 'type', 'is_remote', 'ai_score', 'relevance_score')
+
+
+def load_profiles(path):
+    """Charge les profils depuis un fichier JSONL ou CSV (colonnes email, name, experience, skills...)"""
+    profiles = []
+    with open(path, encoding='utf-8', newline='') as handle:
+        if path.lower().endswith('.csv'):
+            for row in csv.DictReader(handle):
+                profile = dict(row)
+                profile['skills'] = [
+                    skill.strip() for skill in (row.get('skills') or '').replace(';', ',').split(',') if skill.strip()
+                ]
+                profile['ai_settings'] = json.loads(row['ai_settings']) if row.get('ai_settings') else {}
+                profiles.append(profile)
+        else:
+            for line_number, line in enumerate(handle, 1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    profiles.append(json.loads(line))
+                except json.JSONDecodeError as error:
+                    logger.warning("Ligne %s ignorée : %s", line_number, error)
+    return [profile for profile in profiles if profile.get('email')]
+
+
+class BatchRunner:
+    """Traite un lot de profils : un seul fetch par mot-clé, puis scoring et génération en parallèle"""
+
+    def __init__(self, workers=8, top_k=50, generate=False, location="", store=None):
+        self.workers = workers
+        self.top_k = top_k
+        self.generate = generate
+        self.location = location
+        self.store = store
+        self.profile_ai = UserProfileAI()
+        self.generator = ApplicationGeneratorAI()
+
+    def run(self, profiles):
+        """Renvoie les résultats au fil de l'eau, dans l'ordre de fin de traitement"""
+        criteria_by_email = {}
+        keywords_by_location = {}
+        for profile in profiles:
+            criteria = self.profile_ai.analyze_user_profile(
+                profile.get('experience', ''),
+                profile.get('skills', []),
+                profile.get('ai_settings', {})
+            )
+            criteria_by_email[profile['email']] = criteria
+            location = profile.get('location', self.location) or ''
+            keywords_by_location.setdefault(location, []).extend(criteria['keywords'][:3])
+
+        # Récupération mutualisée : chaque (mot-clé, lieu) n'est demandé qu'une fois pour tout le lot
+        jobs_by_query = {}
+        for location, keywords in keywords_by_location.items():
+            for keyword, jobs in AutoJobSearchAI().fetch_jobs_by_keyword(keywords, location).items():
+                jobs_by_query[(keyword, location)] = jobs
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(self._process, profile, criteria_by_email[profile['email']], jobs_by_query): profile
+                for profile in profiles
+            }
+            for future in as_completed(futures):
+                profile = futures[future]
+                try:
+                    yield future.result()
+                except Exception as error:
+                    logger.exception("Échec du traitement de %s", profile['email'])
+                    yield {'email': profile['email'], 'error': f"{type(error).__name__}: {error}"}
+
+    def _process(self, profile, criteria, jobs_by_query):
+        """Scoring (et génération) pour un profil"""
+        location = profile.get('location', self.location) or ''
+        ai_settings = profile.get('ai_settings', {})
+        search_ai = AutoJobSearchAI(ranking_mode=ai_settings.get('ranking_mode', 'compatibility'))
+        # Copies : chaque profil a ses propres scores
+        candidate_jobs = [
+            job.copy() for keyword in criteria['keywords'][:3] for job in jobs_by_query.get((keyword, location), [])
+        ]
+        jobs = search_ai.select_jobs(candidate_jobs, criteria, self.top_k)
+        processed_at = datetime.now().isoformat()
+        if self.store is not None:
+            self.store.save_search_results(profile['email'], jobs, processed_at)
+
+        record = {
+            'email': profile['email'],
+            'name': profile.get('name', ''),
+            'main_domain': criteria['main_domain'],
+            'experience_level': criteria['experience_level'],
+            'processed_at': processed_at,
+            'jobs': [{field: job.get(field) for field in JOB_FIELDS if field in job} for job in jobs]
+        }
+        if self.generate:
+            limit = ai_settings.get('daily_application_limit', 5)
+            selected = jobs[:limit]
+            record['applications'] = [
+                dict(application, offer_id=job.get('offer_id'))
+                for job, application in zip(selected, self.generator.generate_batch(selected, profile, criteria))
+            ]
+        return record
+
+
+def write_jsonl(records, path):
+    """Écrit les résultats ligne par ligne, sans les garder en mémoire"""
+    count = 0
+    with open(path, 'w', encoding='utf-8') as handle:
+        for record in records:
+            handle.write(json.dumps(record, ensure_ascii=False) + '\n')
+            count += 1
+    return count
+
+
+def write_parquet(records, path):
+    """Écrit une ligne par (profil, offre) au format Parquet (pyarrow requis)"""
+    import pandas as pd
+
+    rows = []
+    count = 0
+    for record in records:
+        count += 1
+        applications = {app.get('offer_id'): app for app in record.get('applications', [])}
+        for job in record.get('jobs', []):
+            application = applications.get(job.get('offer_id'), {})
+            rows.append(dict(
+                job,
+                email=record['email'],
+                main_domain=record.get('main_domain'),
+                processed_at=record.get('processed_at'),
+                cv=application.get('cv'),
+                cover_letter=application.get('cover_letter')
+            ))
+    pd.DataFrame(rows).to_parquet(path, index=False)
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Recherche et candidatures par lots, sans Streamlit")
+    parser.add_argument('profiles', help="Fichier de profils (.jsonl ou .csv)")
+    parser.add_argument('-o', '--output', required=True, help="Fichier de sortie")
+    parser.add_argument('--format', choices=['jsonl', 'parquet'], help="Format de sortie (déduit de l'extension par défaut)")
+    parser.add_argument('--workers', type=int, default=8, help="Profils traités en parallèle")
+    parser.add_argument('--top-k', type=int, default=50, help="Nombre maximum d'offres par profil")
+    parser.add_argument('--location', default="", help="Lieu par défaut des recherches")
+    parser.add_argument('--generate', action='store_true', help="Générer CV et lettres pour les meilleures offres")
+    parser.add_argument('--store', help="Base SQLite où enregistrer les résultats pour l'interface")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    profiles = load_profiles(args.profiles)
+    runner = BatchRunner(
+        workers=args.workers,
+        top_k=args.top_k,
+        generate=args.generate,
+        location=args.location,
+        store=JobStore(args.store) if args.store else None
+    )
+    output_format = args.format or ('parquet' if args.output.lower().endswith('.parquet') else 'jsonl')
+    writer = write_parquet if output_format == 'parquet' else write_jsonl
+    count = writer(runner.run(profiles), args.output)
+    logger.info("%s profils traités -> %s", count, args.output)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,74 @@
+"""Cache des résultats de recherche"""
+import threading
+import time
+from collections import OrderedDict
+
+from .config import get_setting, process_singleton
+
+
+# Cache des résultats de recherche partagé entre les sessions
+class TTLLRUCache:
+    """Cache borné avec expiration (TTL) et éviction LRU, sûr entre threads"""
+
+    def __init__(self, maxsize=2048, ttl=900):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, default=None):
+        """Renvoie la valeur en cache si elle n'a pas expiré"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Ajoute une valeur et évince les entrées les moins récemment utilisées"""
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Compteurs d'utilisation du cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'maxsize': self.maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
+
+
+@process_singleton
+def get_search_cache():
+    """Cache des pages de résultats partagé par toutes les sessions du processus"""
+    return TTLLRUCache(
+        maxsize=int(get_setting("SEARCH_CACHE_SIZE", 2048)),
+        ttl=float(get_setting("SEARCH_CACHE_TTL", 900))
+    )
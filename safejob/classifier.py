@@ -0,0 +1,313 @@
+"""Classifieur local des offres frauduleuses : n-grammes hachés et régression logistique
+
+Entraînement : python -m safejob.classifier offres_etiquetees.jsonl -o scam_model.npy [--holdout 0.25]
+
+Chaque ligne du fichier d'entraînement contient `title`, `description` et `is_scam` (0 ou 1).
+Le modèle est un vecteur de poids float32 (biais en dernière position) enregistré en .npy, à
+côté d'un fichier .json de métadonnées ; il est projeté en mémoire (mmap) une fois par processus.
+Aucun modèle n'est livré : le classifieur n'est actif que si SCAM_MODEL_PATH désigne un modèle
+dont l'exactitude a été mesurée sur des offres mises de côté pendant l'entraînement.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import zlib
+from collections import OrderedDict
+from datetime import datetime
+
+from .config import get_setting, process_singleton
+from .offers import JobOffer
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_TRAINING_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'models', 'scam_training.jsonl')
+MIN_HOLDOUT_ACCURACY = 0.95
+
+
+# Vectorisation par hachage
+class HashedNgramVectorizer:
+    """Unigrammes et bigrammes de mots hachés dans `n_features` colonnes, sans vocabulaire
+
+    Les empreintes (CRC32) sont stables d'un processus à l'autre, contrairement à `hash()`.
+    La matrice d'un lot est renvoyée en coordonnées (lignes, colonnes, valeurs), normalisées L2.
+    """
+
+    TOKEN = re.compile(r'\w+')
+    BIGRAM_MULTIPLIER = 0x9E3779B1
+
+    def __init__(self, n_features=2 ** 18, bigrams=True):
+        self.n_features = n_features
+        self.bigrams = bigrams
+
+    @staticmethod
+    def texts(offers):
+        """Texte en minuscules (titre + description) de chaque offre"""
+        return [
+            offer.search_text if isinstance(offer, JobOffer)
+            else f"{offer.get('title') or ''} {offer.get('description') or ''}".lower()
+            for offer in offers
+        ]
+
+    def transform(self, texts):
+        """Matrice creuse du lot : (lignes, colonnes, valeurs)"""
+        import numpy as np
+
+        hashes = []
+        lengths = []
+        for text in texts:
+            tokens = self.TOKEN.findall(text)
+            hashes.extend(map(zlib.crc32, map(str.encode, tokens)))
+            lengths.append(len(tokens))
+
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        rows = np.repeat(np.arange(len(lengths)), lengths)
+        columns = hashes % self.n_features
+        if self.bigrams and len(hashes) > 1:
+            # Bigrammes : paires de mots consécutifs d'une même offre, calculées pour tout le lot
+            same_row = rows[1:] == rows[:-1]
+            bigram_hashes = (hashes[:-1] * self.BIGRAM_MULTIPLIER + hashes[1:])[same_row]
+            columns = np.concatenate([columns, bigram_hashes % self.n_features])
+            rows = np.concatenate([rows, rows[1:][same_row]])
+
+        counts = np.bincount(rows, minlength=len(lengths))
+        values = 1.0 / np.sqrt(np.maximum(counts, 1))[rows]
+        return rows, columns.astype(np.int64), values
+
+
+# Régression logistique sur les n-grammes hachés
+class ScamClassifier:
+    """Probabilité qu'une offre soit frauduleuse, calculée par lots sur CPU
+
+    Les probabilités sont gardées par empreinte SHA-1 du texte de l'offre (20 octets, quelle que
+    soit la longueur de la description) : les pages en cache et les copies d'une même offre
+    partagent cette empreinte, l'offre n'est donc vectorisée qu'une fois par processus.
+    """
+
+    MEMO_SIZE = 50000
+
+    def __init__(self, weights, vectorizer=None, threshold=0.8, version=None, metadata=None):
+        self.vectorizer = vectorizer or HashedNgramVectorizer(n_features=len(weights) - 1)
+        if len(weights) != self.vectorizer.n_features + 1:
+            raise ValueError("Taille des poids incompatible avec le nombre de caractéristiques")
+        self.weights = weights
+        self.threshold = threshold
+        self.version = version
+        self.metadata = metadata or {}
+        self._memo = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def metadata_path(path):
+        return os.path.splitext(path)[0] + '.json'
+
+    @classmethod
+    def load(cls, path):
+        """Charge un modèle ; les poids restent sur disque, projetés en mémoire"""
+        import numpy as np
+
+        with open(cls.metadata_path(path), encoding='utf-8') as handle:
+            metadata = json.load(handle)
+        weights = np.load(path, mmap_mode='r')
+        vectorizer = HashedNgramVectorizer(metadata['n_features'], metadata.get('bigrams', True))
+        return cls(weights, vectorizer, metadata.get('threshold', 0.8), metadata.get('version'), metadata)
+
+    def save(self, path, **metadata):
+        import numpy as np
+
+        metadata = dict(self.metadata, **metadata)
+        np.save(path, np.asarray(self.weights, dtype=np.float32))
+        metadata.update(
+            n_features=self.vectorizer.n_features,
+            bigrams=self.vectorizer.bigrams,
+            threshold=self.threshold,
+            version=self.version
+        )
+        with open(self.metadata_path(path), 'w', encoding='utf-8') as handle:
+            json.dump(metadata, handle, ensure_ascii=False, indent=2)
+
+    @staticmethod
+    def text_digest(text):
+        return hashlib.sha1(text.encode('utf-8')).digest()
+
+    @staticmethod
+    def _sigmoid(logits):
+        import numpy as np
+
+        return 1.0 / (1.0 + np.exp(-np.clip(logits, -30.0, 30.0)))
+
+    def predict_matrix(self, rows, columns, values, n_rows):
+        """Probabilités à partir d'une matrice déjà vectorisée"""
+        import numpy as np
+
+        logits = float(self.weights[-1]) + np.bincount(
+            rows, weights=self.weights[columns] * values, minlength=n_rows
+        )
+        return self._sigmoid(logits)
+
+    def predict_proba(self, offers):
+        """Probabilité d'arnaque de chaque offre (JobOffer ou dict)"""
+        import numpy as np
+
+        texts = self.vectorizer.texts(offers)
+        digests = [self.text_digest(text) for text in texts]
+        probabilities = np.empty(len(texts))
+        missing = []
+        with self._lock:
+            for index, digest in enumerate(digests):
+                probability = self._memo.get(digest)
+                if probability is None:
+                    missing.append(index)
+                else:
+                    probabilities[index] = probability
+        if not missing:
+            return probabilities
+
+        computed = self.predict_matrix(*self.vectorizer.transform([texts[index] for index in missing]), len(missing))
+        probabilities[missing] = computed
+        with self._lock:
+            for index, probability in zip(missing, computed.tolist()):
+                self._memo[digests[index]] = probability
+            while len(self._memo) > self.MEMO_SIZE:
+                self._memo.popitem(last=False)
+        return probabilities
+
+    @classmethod
+    def train(cls, offers, labels, n_features=2 ** 18, epochs=200, learning_rate=2.0, l2=1e-6,
+              threshold=0.8, version=None):
+        """Descente de gradient sur tout le lot, la matrice creuse étant calculée une seule fois"""
+        import numpy as np
+
+        vectorizer = HashedNgramVectorizer(n_features)
+        texts = vectorizer.texts(offers)
+        rows, columns, values = vectorizer.transform(texts)
+        targets = np.asarray(labels, dtype=np.float64)
+        n_rows = len(texts)
+
+        weights = np.zeros(n_features + 1, dtype=np.float64)
+        for _ in range(epochs):
+            logits = weights[-1] + np.bincount(rows, weights=weights[columns] * values, minlength=n_rows)
+            errors = (cls._sigmoid(logits) - targets) / n_rows
+            gradient = np.bincount(columns, weights=errors[rows] * values, minlength=n_features)
+            weights[:-1] -= learning_rate * (gradient + l2 * weights[:-1])
+            weights[-1] -= learning_rate * errors.sum()
+
+        return cls(weights.astype(np.float32), vectorizer, threshold, version)
+
+
+@process_singleton
+def get_scam_classifier():
+    """Modèle partagé par le processus, ou None (règles seules) sans modèle validé
+
+    Le modèle doit être désigné par SCAM_MODEL_PATH et ses métadonnées doivent contenir une
+    exactitude mesurée sur un jeu mis de côté (`holdout_accuracy`) au moins égale à
+    SCAM_MODEL_MIN_ACCURACY : un modèle évalué sur ses seules données d'entraînement est refusé.
+    """
+    path = get_setting("SCAM_MODEL_PATH", "")
+    if not path:
+        logger.info("Classifieur anti-arnaque désactivé (SCAM_MODEL_PATH absent) : seules les règles sont appliquées")
+        return None
+    try:
+        classifier = ScamClassifier.load(path)
+        minimum = float(get_setting("SCAM_MODEL_MIN_ACCURACY", MIN_HOLDOUT_ACCURACY))
+    except (OSError, ValueError, KeyError) as error:
+        logger.error("Modèle anti-arnaque %s illisible : %s", path, error)
+        return None
+
+    accuracy = classifier.metadata.get('holdout_accuracy')
+    if accuracy is None:
+        logger.error("Modèle anti-arnaque %s ignoré : aucune évaluation sur un jeu mis de côté", path)
+        return None
+    if accuracy < minimum:
+        logger.error("Modèle anti-arnaque %s ignoré : exactitude hors entraînement %.1f %% < %.1f %%",
+                     path, accuracy * 100, minimum * 100)
+        return None
+    return classifier
+
+
+def load_labelled_offers(path):
+    """Offres étiquetées d'un fichier JSONL (title, description, is_scam)"""
+    offers, labels = [], []
+    with open(path, encoding='utf-8') as handle:
+        for line_number, line in enumerate(handle, 1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                record = json.loads(line)
+                labels.append(1 if record['is_scam'] else 0)
+            except (json.JSONDecodeError, KeyError) as error:
+                logger.warning("Ligne %s ignorée : %s", line_number, error)
+                continue
+            offers.append(record)
+    return offers, labels
+
+
+def holdout_split(labels, fraction, seed=0):
+    """Indices (entraînement, évaluation), la part `fraction` de chaque classe étant mise de côté"""
+    generator = random.Random(seed)
+    training, holdout = [], []
+    for label in sorted(set(labels)):
+        indices = [index for index, value in enumerate(labels) if value == label]
+        generator.shuffle(indices)
+        size = max(1, round(len(indices) * fraction))
+        holdout.extend(indices[:size])
+        training.extend(indices[size:])
+    return sorted(training), sorted(holdout)
+
+
+def main(argv=None):
+    import numpy as np
+
+    parser = argparse.ArgumentParser(description="Entraînement du classifieur local d'offres frauduleuses")
+    parser.add_argument('training', help="Offres étiquetées (.jsonl avec title, description, is_scam)")
+    parser.add_argument('-o', '--output', required=True, help="Fichier .npy du modèle")
+    parser.add_argument('--features', type=int, default=2 ** 18, help="Nombre de colonnes du hachage")
+    parser.add_argument('--epochs', type=int, default=200, help="Itérations de descente de gradient")
+    parser.add_argument('--threshold', type=float, default=0.8, help="Probabilité à partir de laquelle une offre est écartée")
+    parser.add_argument('--holdout', type=float, default=0.25, help="Part des offres de chaque classe réservée à l'évaluation")
+    parser.add_argument('--seed', type=int, default=0, help="Graine du tirage du jeu d'évaluation")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    offers, labels = load_labelled_offers(args.training)
+    if not offers or len(set(labels)) < 2:
+        logger.error("Il faut des offres des deux classes pour entraîner le modèle")
+        return 1
+    if not 0 < args.holdout < 1 or min(labels.count(0), labels.count(1)) < 2:
+        logger.error("Il faut au moins deux offres par classe et une part d'évaluation entre 0 et 1")
+        return 1
+
+    training, holdout = holdout_split(labels, args.holdout, args.seed)
+    version = datetime.now().strftime('%Y%m%d%H%M%S')
+    classifier = ScamClassifier.train(
+        [offers[index] for index in training], [labels[index] for index in training],
+        n_features=args.features, epochs=args.epochs, threshold=args.threshold, version=version
+    )
+
+    def accuracy(indices):
+        # Exactitude au seuil du modèle : c'est lui qui décide d'écarter une offre
+        flagged = classifier.predict_proba([offers[index] for index in indices]) >= classifier.threshold
+        return float((flagged == np.asarray([labels[index] for index in indices], dtype=bool)).mean())
+
+    training_accuracy, holdout_accuracy = accuracy(training), accuracy(holdout)
+    os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+    classifier.save(
+        args.output, samples=len(training), scams=sum(labels[index] for index in training),
+        training_accuracy=training_accuracy, holdout_samples=len(holdout), holdout_accuracy=holdout_accuracy
+    )
+    logger.info("Modèle %s : %s offres, exactitude d'entraînement %.1f %%, hors entraînement %.1f %% (%s offres) -> %s",
+                version, len(training), training_accuracy * 100, holdout_accuracy * 100, len(holdout), args.output)
+    if holdout_accuracy < MIN_HOLDOUT_ACCURACY:
+        logger.warning("Exactitude hors entraînement inférieure à %.0f %% : le modèle sera refusé au chargement "
+                       "(seuil réglable par SCAM_MODEL_MIN_ACCURACY)", MIN_HOLDOUT_ACCURACY * 100)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
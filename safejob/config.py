@@ -0,0 +1,38 @@
+"""Réglages et objets partagés à l'échelle du processus"""
+import functools
+import os
+import threading
+
+_settings_provider = None
+
+
+def set_settings_provider(provider):
+    """Source de réglages secondaire (ex. st.secrets), consultée après les variables d'environnement"""
+    global _settings_provider
+    _settings_provider = provider
+
+
+def get_setting(name, default):
+    """Lit un réglage : variable d'environnement, puis source secondaire, puis valeur par défaut"""
+    value = os.environ.get(name)
+    if value is not None:
+        return value
+    if _settings_provider is not None:
+        return _settings_provider(name, default)
+    return default
+
+
+def process_singleton(factory):
+    """Transforme une fabrique en accesseur d'une instance unique, créée au premier appel"""
+    instance = []
+    lock = threading.Lock()
+
+    @functools.wraps(factory)
+    def get_instance():
+        if not instance:
+            with lock:
+                if not instance:
+                    instance.append(factory())
+        return instance[0]
+
+    return get_instance
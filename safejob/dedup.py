@@ -0,0 +1,112 @@
+"""Déduplication des offres d'emploi"""
+import hashlib
+import re
+import unicodedata
+from urllib.parse import urlencode, urlsplit, urlunsplit, parse_qsl
+
+
+# Déduplication des offres entre mots-clés et sources
+class JobDeduplicator:
+    """Écarte les offres déjà vues (URL normalisée, empreinte de contenu, quasi-doublons)"""
+
+    TRACKING_PARAMS = {'se', 'v', 'ref', 'source', 'origin', 'fbclid', 'gclid', 'msclkid'}
+    SIMHASH_BANDS = 4
+
+    def __init__(self, near_duplicates=False, max_distance=3):
+        self.near_duplicates = near_duplicates
+        self.max_distance = max_distance
+        self.seen_urls = set()
+        self.seen_fingerprints = set()
+        self._simhash_bands = [{} for _ in range(self.SIMHASH_BANDS)]
+        self.duplicates_dropped = 0
+
+    @staticmethod
+    def normalize_url(url):
+        """URL canonique : schéma/hôte en minuscules, sans fragment ni paramètres de suivi"""
+        if not url:
+            return ''
+        parts = urlsplit(url.strip())
+        query = sorted(
+            (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+            if not key.lower().startswith('utm_') and key.lower() not in JobDeduplicator.TRACKING_PARAMS
+        )
+        host = (parts.hostname or '').lower()
+        if host.startswith('www.'):
+            host = host[4:]
+        path = parts.path.rstrip('/') or '/'
+        return urlunsplit((parts.scheme.lower() or 'https', host, path, urlencode(query), ''))
+
+    @staticmethod
+    def normalize_text(text):
+        """Texte sans accents, ponctuation ni espaces multiples"""
+        text = unicodedata.normalize('NFKD', (text or '').lower())
+        text = ''.join(char for char in text if not unicodedata.combining(char))
+        return ' '.join(re.findall(r'\w+', text))
+
+    @classmethod
+    def content_fingerprint(cls, job):
+        """Empreinte titre/entreprise/lieu"""
+        basis = '|'.join(cls.normalize_text(job.get(field, '')) for field in ('title', 'company', 'location'))
+        return hashlib.sha1(basis.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def offer_id(cls, job):
+        """Identifiant stable d'une offre : URL normalisée, sinon empreinte de contenu"""
+        url = cls.normalize_url(job.get('url', ''))
+        if url:
+            return hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return cls.content_fingerprint(job)
+
+    @classmethod
+    def simhash(cls, text):
+        """SimHash 64 bits sur les mots et paires de mots"""
+        tokens = cls.normalize_text(text).split()
+        shingles = tokens + [f"{first} {second}" for first, second in zip(tokens, tokens[1:])]
+        weights = [0] * 64
+        for shingle in shingles:
+            value = int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+            for bit in range(64):
+                weights[bit] += 1 if value >> bit & 1 else -1
+        return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+    def _near_duplicate(self, job):
+        """Recherche un quasi-doublon via l'indexation par bandes du SimHash"""
+        text = f"{job.get('title', '')} {job.get('company', '')} {job.get('description', '')}"
+        fingerprint = self.simhash(text)
+        band_bits = 64 // self.SIMHASH_BANDS
+        mask = (1 << band_bits) - 1
+        bands = [(fingerprint >> (i * band_bits)) & mask for i in range(self.SIMHASH_BANDS)]
+
+        # Distance <= max_distance < nombre de bandes : au moins une bande est identique
+        for index, band in enumerate(bands):
+            for candidate in self._simhash_bands[index].get(band, ()):
+                if bin(candidate ^ fingerprint).count('1') <= self.max_distance:
+                    return True
+
+        for index, band in enumerate(bands):
+            self._simhash_bands[index].setdefault(band, []).append(fingerprint)
+        return False
+
+    def is_duplicate(self, job):
+        """Indique si l'offre a déjà été vue et l'enregistre sinon"""
+        url = self.normalize_url(job.get('url', ''))
+        fingerprint = self.content_fingerprint(job)
+        if (url and url in self.seen_urls) or fingerprint in self.seen_fingerprints:
+            return True
+        if self.near_duplicates and self._near_duplicate(job):
+            return True
+        if url:
+            self.seen_urls.add(url)
+        self.seen_fingerprints.add(fingerprint)
+        return False
+
+    def deduplicate(self, jobs):
+        """Garde la première occurrence de chaque offre et lui attribue son offer_id"""
+        unique_jobs = []
+        for job in jobs:
+            if self.is_duplicate(job):
+                self.duplicates_dropped += 1
+                continue
+            job['offer_id'] = self.offer_id(job)
+            unique_jobs.append(job)
+        return unique_jobs
@@ -0,0 +1,210 @@
+"""Récupération concurrente des pages de résultats"""
+import logging
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from concurrent.futures import TimeoutError as FuturesTimeoutError
+
+from .config import process_singleton
+
+logger = logging.getLogger(__name__)
+
+# Échéance de la tâche exécutée par le thread courant, lue par les appels réseau des sources
+_task_context = threading.local()
+
+
+def current_task_deadline():
+    """Instant `time.monotonic()` auquel la tâche en cours doit être terminée, ou None"""
+    return getattr(_task_context, 'deadline_at', None)
+
+
+# Moteur de récupération concurrente des offres ; `key` : requête normalisée, pour regrouper les appels identiques
+FetchTask = namedtuple('FetchTask', ['source', 'keyword', 'page', 'fn', 'args', 'key'], defaults=(None,))
+
+
+class SingleFlight:
+    """Regroupe les appels identiques simultanés : ils partagent le Future du premier
+
+    Les appelants suivants ne soumettent rien au pool : ils attendent le même Future, sans
+    occuper de thread. Un appelant qui abandonne n'annule l'appel que s'il était le dernier à
+    l'attendre. Rien n'est gardé après la fin de l'appel : c'est le cache, placé au-dessus,
+    qui sert les demandes ultérieures.
+    """
+
+    def __init__(self):
+        self._calls = {}  # clé -> [Future, nombre d'appelants]
+        # Réentrant : un Future déjà terminé ou annulé appelle ses callbacks dans le thread courant
+        self._lock = threading.RLock()
+        self.executed = 0
+        self.shared = 0
+
+    def submit(self, key, submit, *args):
+        """Future de l'appel identique en cours, sinon de `submit(*args)`"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is None:
+                future = submit(*args)
+                call = self._calls[key] = [future, 0]
+                self.executed += 1
+                future.add_done_callback(lambda done: self._forget(key, done))
+            else:
+                self.shared += 1
+            call[1] += 1
+            return call[0]
+
+    def cancel(self, key, future):
+        """Abandon d'un appelant ; l'appel n'est annulé que si plus personne ne l'attend"""
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and call[0] is future:
+                call[1] -= 1
+                if call[1] > 0:
+                    return False
+            return future.cancel()
+
+    def _forget(self, key, future):
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None and call[0] is future:
+                del self._calls[key]
+
+    def stats(self):
+        """Appels réellement exécutés et appels servis par un appel déjà en cours"""
+        with self._lock:
+            return {'executed': self.executed, 'shared': self.shared, 'in_flight': len(self._calls)}
+
+
+class JobFetchEngine:
+    """Exécute en parallèle les appels aux sources d'offres avec limites et échéance globale"""
+
+    def __init__(self, max_workers=16, source_limits=None, default_source_limit=4, deadline=8.0):
+        self.max_workers = max_workers
+        self.source_limits = dict(source_limits or {})
+        self.default_source_limit = default_source_limit
+        self.deadline = deadline
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job-fetch')
+        self._semaphores = {}
+        self._lock = threading.Lock()
+        # Partagé par toutes les sessions : deux recherches identiques ne font qu'un appel
+        self.single_flight = SingleFlight()
+
+    def _source_semaphore(self, source):
+        """Sémaphore limitant le nombre d'appels simultanés vers une source"""
+        with self._lock:
+            semaphore = self._semaphores.get(source)
+            if semaphore is None:
+                limit = self.source_limits.get(source, self.default_source_limit)
+                semaphore = threading.BoundedSemaphore(limit)
+                self._semaphores[source] = semaphore
+            return semaphore
+
+    def set_source_limit(self, source, limit):
+        """Fixe le nombre d'appels simultanés vers une source (déclaré par son adaptateur)"""
+        with self._lock:
+            if self.source_limits.get(source) != limit:
+                self.source_limits[source] = limit
+                # Les appels déjà en cours gardent l'ancien sémaphore jusqu'à leur fin
+                self._semaphores.pop(source, None)
+
+    def _submit(self, task, deadline_at):
+        """Soumet une tâche au pool, ou renvoie le Future d'une tâche identique déjà en cours"""
+        if task.key is None:
+            return self._executor.submit(self._run_task, task, deadline_at)
+        return self.single_flight.submit(task.key, self._executor.submit, self._run_task, task, deadline_at)
+
+    def _cancel(self, task, future):
+        if task.key is None:
+            future.cancel()
+        else:
+            self.single_flight.cancel(task.key, future)
+
+    def _run_task(self, task, deadline_at):
+        """Exécute une tâche dès qu'un créneau de sa source est libre"""
+        semaphore = self._source_semaphore(task.source)
+        remaining = deadline_at - time.monotonic()
+        if remaining <= 0 or not semaphore.acquire(timeout=remaining):
+            raise TimeoutError(f"Aucun créneau disponible pour {task.source} avant l'échéance")
+        _task_context.deadline_at = deadline_at
+        try:
+            return task.fn(*task.args)
+        finally:
+            _task_context.deadline_at = None
+            semaphore.release()
+
+    def run(self, tasks, deadline=None):
+        """Lance toutes les tâches et renvoie les résultats obtenus avant l'échéance"""
+        deadline = self.deadline if deadline is None else deadline
+        deadline_at = time.monotonic() + deadline
+        futures = [self._submit(task, deadline_at) for task in tasks]
+        done, _ = wait(futures, timeout=deadline)
+
+        results = []
+        report = self.new_report()
+        for task, future in zip(tasks, futures):
+            if future not in done:
+                # Les appels trop lents sont abandonnés : on garde les résultats partiels
+                self._cancel(task, future)
+                report['timed_out'] += 1
+                continue
+            error = future.exception()
+            if error is not None:
+                self._record_failure(report, task, error)
+                continue
+            report['completed'] += 1
+            results.append((task, future.result()))
+
+        return results, report
+
+    def stream(self, tasks, deadline=None, report=None):
+        """Produit (tâche, résultat, erreur) au fil des réponses, dans l'ordre d'arrivée
+
+        Le rapport passé en argument est complété au fur et à mesure ; les tâches encore en
+        cours à l'échéance (ou quand l'appelant abandonne le générateur) sont annulées.
+        """
+        deadline = self.deadline if deadline is None else deadline
+        deadline_at = time.monotonic() + deadline
+        report = self.new_report() if report is None else report
+        # Deux tâches identiques d'un même lot partagent un Future
+        futures = {}
+        for task in tasks:
+            futures.setdefault(self._submit(task, deadline_at), []).append(task)
+        pending = set(futures)
+        try:
+            for future in as_completed(futures, timeout=deadline):
+                pending.discard(future)
+                error = future.exception()
+                for task in futures[future]:
+                    if error is not None:
+                        self._record_failure(report, task, error)
+                        yield task, None, error
+                        continue
+                    report['completed'] += 1
+                    yield task, future.result(), None
+        except FuturesTimeoutError:
+            pass
+        finally:
+            for future in pending:
+                for task in futures[future]:
+                    self._cancel(task, future)
+                    report['timed_out'] += 1
+
+    @staticmethod
+    def new_report():
+        """Rapport d'exécution vide"""
+        return {'completed': 0, 'failed': 0, 'timed_out': 0, 'errors': []}
+
+    @staticmethod
+    def _record_failure(report, task, error):
+        """Comptabilise un appel en échec"""
+        report['failed'] += 1
+        # Seul le type d'erreur est conservé : les URL contiennent les clés d'API
+        report['errors'].append(f"{task.source} '{task.keyword}' p{task.page}: {type(error).__name__}")
+        logger.warning("Échec de récupération %s '%s' page %s : %s",
+                       task.source, task.keyword, task.page, type(error).__name__)
+
+
+@process_singleton
+def get_fetch_engine():
+    """Moteur de récupération partagé par toutes les sessions du processus"""
+    return JobFetchEngine()
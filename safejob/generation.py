@@ -0,0 +1,172 @@
+"""Génération des candidatures personnalisées"""
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from .matching import SOFT_JOB_KEYWORDS, TECHNICAL_JOB_KEYWORDS, get_job_keyword_matcher
+from .offers import JobOffer
+from .templates import DocumentTemplate
+
+
+# Classe de Génération Automatique de Candidatures
+class ApplicationGeneratorAI:
+    CV_LAYOUT = DocumentTemplate("""
+        {base_template}
+        
+        PROFIL PROFESSIONNEL:
+        {experience}
+        
+        COMPÉTENCES CLÉS:
+        {skills}
+        
+        MOTS-CLÉS OPTIMISÉS POUR CE POSTE:
+        {job_keywords}
+        
+        EXPÉRIENCE PERTINENTE:
+        Expérience adaptée aux exigences du poste de {title} chez {company}
+        """)
+    
+    COVER_LETTER_LAYOUT = DocumentTemplate("""
+        {base_template}
+        
+        Votre offre pour le poste de {title} chez {company} a retenu toute mon attention.
+        
+        Fort(e) de mon expérience en {domain}, je suis convaincu(e) que mon profil correspond parfaitement à vos attentes.
+        
+        Mes compétences en {top_skills} me permettront de contribuer efficacement à vos objectifs.
+        
+        Je serais ravi(e) de vous rencontrer pour discuter de cette opportunité.
+        
+        Cordialement,
+        {name}
+        """)
+    
+    USER_TEMPLATE_CACHE_SIZE = 256
+    KEYWORD_CACHE_SIZE = 4096
+    
+    def __init__(self):
+        self.cv_templates = {
+            'commercial': "CV optimisé pour les postes commerciaux avec focus sur les résultats de vente",
+            'informatique': "CV technique avec mise en avant des compétences de développement",
+            'marketing': "CV créatif avec emphasis sur les campagnes et stratégies marketing",
+            'finance': "CV analytique avec focus sur la gestion financière et budgétaire",
+            'rh': "CV relationnel avec accent sur la gestion des talents"
+        }
+        
+        self.cover_letter_templates = {
+            'commercial': "Madame, Monsieur,\n\nPassionné(e) par la vente et fort(e) de mon expérience en développement commercial...",
+            'informatique': "Madame, Monsieur,\n\nDéveloppeur(se) passionné(e) par les nouvelles technologies...",
+            'marketing': "Madame, Monsieur,\n\nSpécialiste en marketing digital avec une approche créative...",
+            'finance': "Madame, Monsieur,\n\nExpert(e) en analyse financière avec une solide expérience...",
+            'rh': "Madame, Monsieur,\n\nProfessionnel(le) des ressources humaines orienté(e) développement des talents..."
+        }
+        
+        # Gabarits compilés à la première utilisation : par domaine, puis par profil
+        self._compiled_domains = {}
+        self._compiled_users = OrderedDict()
+        # Mots-clés par texte d'offre : une même offre sert à plusieurs profils
+        self._job_keywords = OrderedDict()
+        # Un générateur est partagé entre les threads du traitement par lots
+        self._cache_lock = threading.Lock()
+    
+    def generate_custom_application(self, job_offer, user_profile, user_criteria):
+        """Génère une candidature personnalisée"""
+        return self.generate_batch([job_offer], user_profile, user_criteria)[0]
+    
+    def generate_batch(self, job_offers, user_profile, user_criteria):
+        """Génère les candidatures d'un lot d'offres pour un même profil"""
+        # Les parties propres au profil sont rendues une seule fois pour tout le lot
+        cv_template, letter_template = self._user_templates(user_profile, user_criteria['main_domain'])
+        application_date = datetime.now().isoformat()
+        
+        applications = []
+        for job_offer in job_offers:
+            applications.append({
+                'cv': cv_template.render(
+                    job_keywords=', '.join(self._extract_keywords_from_job(job_offer)),
+                    title=job_offer['title'],
+                    company=job_offer['company']
+                ),
+                'cover_letter': letter_template.render(title=job_offer['title'], company=job_offer['company']),
+                'application_date': application_date,
+                'job_title': job_offer['title'],
+                'company': job_offer['company'],
+                'compatibility_score': job_offer.get('ai_score', 0)
+            })
+        return applications
+    
+    def _domain_templates(self, domain):
+        """Gabarits CV et lettre du domaine, compilés à la première utilisation"""
+        templates = self._compiled_domains.get(domain)
+        if templates is None:
+            templates = (
+                self.CV_LAYOUT.bind(
+                    base_template=self.cv_templates.get(domain, "CV professionnel adapté au poste")
+                ),
+                self.COVER_LETTER_LAYOUT.bind(
+                    base_template=self.cover_letter_templates.get(domain, "Madame, Monsieur,\n\nIntéressé(e) par votre offre d'emploi..."),
+                    domain=domain
+                )
+            )
+            self._compiled_domains[domain] = templates
+        return templates
+    
+    def _user_templates(self, user_profile, domain):
+        """Gabarits du domaine complétés avec le profil, gardés en cache d'un lot à l'autre"""
+        cv_fields = {
+            'experience': user_profile.get('experience', 'Expérience professionnelle diversifiée'),
+            'skills': ', '.join(user_profile.get('skills', ['Compétences variées']))
+        }
+        letter_fields = {
+            'top_skills': ', '.join(user_profile.get('skills', ['diverses compétences'])[:3]),
+            'name': user_profile.get('name', 'Candidat')
+        }
+        key = (domain,) + tuple(str(value) for value in (*cv_fields.values(), *letter_fields.values()))
+        with self._cache_lock:
+            templates = self._compiled_users.get(key)
+            if templates is not None:
+                self._compiled_users.move_to_end(key)
+                return templates
+        
+        cv_layout, letter_layout = self._domain_templates(domain)
+        templates = (cv_layout.bind(**cv_fields), letter_layout.bind(**letter_fields))
+        with self._cache_lock:
+            self._compiled_users[key] = templates
+            if len(self._compiled_users) > self.USER_TEMPLATE_CACHE_SIZE:
+                self._compiled_users.popitem(last=False)
+        return templates
+    
+    def _adapt_cv_for_job(self, job_offer, user_profile, domain):
+        """Adapte le CV selon l'offre d'emploi"""
+        cv_template, _ = self._user_templates(user_profile, domain)
+        return cv_template.render(
+            job_keywords=', '.join(self._extract_keywords_from_job(job_offer)),
+            title=job_offer['title'],
+            company=job_offer['company']
+        )
+    
+    def _generate_cover_letter(self, job_offer, user_profile, domain):
+        """Génère une lettre de motivation personnalisée"""
+        _, letter_template = self._user_templates(user_profile, domain)
+        return letter_template.render(title=job_offer['title'], company=job_offer['company'])
+    
+    def _extract_keywords_from_job(self, job_offer):
+        """Extrait les mots-clés importants de l'offre"""
+        text = job_offer.search_text if isinstance(job_offer, JobOffer) else f"{job_offer['title']} {job_offer['description']}"
+        with self._cache_lock:
+            keywords = self._job_keywords.get(text)
+            if keywords is not None:
+                self._job_keywords.move_to_end(text)
+                return keywords
+        
+        found = get_job_keyword_matcher().find(text)
+        
+        # Ordre fixe : mots-clés techniques puis savoir-être
+        found_keywords = [keyword for keyword in TECHNICAL_JOB_KEYWORDS + SOFT_JOB_KEYWORDS if keyword in found]
+        
+        keywords = found_keywords[:5]  # Top 5 mots-clés
+        with self._cache_lock:
+            self._job_keywords[text] = keywords
+            if len(self._job_keywords) > self.KEYWORD_CACHE_SIZE:
+                self._job_keywords.popitem(last=False)
+        return keywords
@@ -0,0 +1,111 @@
+"""Couche HTTP partagée par les sources d'offres"""
+import random
+import time
+from datetime import datetime
+from email.utils import parsedate_to_datetime
+
+from .config import get_setting, process_singleton
+
+
+# Couche HTTP partagée par les sources d'offres
+class PooledHttpClient:
+    """Session HTTP poolée avec keep-alive et reprises exponentielles sur 429/5xx"""
+
+    RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+    def __init__(self, pool_connections=10, pool_maxsize=32, max_retries=3,
+                 backoff_base=0.5, backoff_max=8.0, max_retry_after=30.0):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_after = max_retry_after
+
+        # requests n'est chargé qu'à la création du client, pas à l'import du cœur
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        # Les reprises sont gérées ici, pas par urllib3, pour respecter Retry-After
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers.update({
+            'Connection': 'keep-alive',
+            'User-Agent': 'SafeJobHubAI/1.0'
+        })
+
+    def get(self, url, params=None, timeout=5, deadline=None):
+        """GET avec reprises sur erreurs réseau et réponses 429/5xx
+
+        `deadline` (instant `time.monotonic()`) borne l'ensemble des tentatives : le délai de
+        chaque requête est réduit au temps restant, et une reprise dont l'attente dépasserait
+        l'échéance n'a pas lieu (l'erreur ou la réponse en échec est rendue à l'appelant).
+        """
+        import requests
+
+        attempt = 0
+        while True:
+            request_timeout = timeout
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise requests.Timeout(f"Échéance dépassée avant la requête {url}")
+                request_timeout = min(timeout, remaining)
+            try:
+                response = self.session.get(url, params=params, timeout=request_timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff_delay(attempt)
+                if self._past_deadline(delay, deadline):
+                    raise
+            else:
+                if response.status_code not in self.RETRY_STATUSES or attempt >= self.max_retries:
+                    return response
+                delay = self._retry_after_delay(response)
+                if delay is None:
+                    delay = self._backoff_delay(attempt)
+                elif delay > self.max_retry_after:
+                    # Attente imposée trop longue : on rend la réponse à l'appelant
+                    return response
+                if self._past_deadline(delay, deadline):
+                    return response
+                response.close()
+
+            attempt += 1
+            time.sleep(delay)
+
+    @staticmethod
+    def _past_deadline(delay, deadline):
+        """Vrai si attendre `delay` secondes mènerait au-delà de l'échéance"""
+        return deadline is not None and time.monotonic() + delay >= deadline
+
+    def _backoff_delay(self, attempt):
+        """Backoff exponentiel avec gigue complète"""
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+    def _retry_after_delay(self, response):
+        """Délai demandé par l'en-tête Retry-After (secondes ou date HTTP)"""
+        value = response.headers.get('Retry-After')
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if retry_at.tzinfo is None:
+            return None
+        return max(0.0, (retry_at - datetime.now(retry_at.tzinfo)).total_seconds())
+
+
+@process_singleton
+def get_http_client():
+    """Client HTTP partagé par toutes les sources et toutes les sessions du processus"""
+    return PooledHttpClient(
+        pool_maxsize=int(get_setting("HTTP_POOL_MAXSIZE", 32)),
+        max_retries=int(get_setting("HTTP_MAX_RETRIES", 3))
+    )
@@ -0,0 +1,98 @@
+"""Vocabulaires métier et recherche multi-motifs précompilée"""
+import re
+
+from .config import process_singleton
+
+
+# Vocabulaires utilisés pour le profilage et le scoring
+SKILLS_KEYWORDS = {
+    'commercial': ['vente', 'commercial', 'négociation', 'client', 'prospection'],
+    'informatique': ['python', 'java', 'javascript', 'développement', 'programmation'],
+    'marketing': ['marketing', 'communication', 'digital', 'réseaux sociaux', 'seo'],
+    'finance': ['comptabilité', 'finance', 'gestion', 'budget', 'analyse'],
+    'rh': ['ressources humaines', 'recrutement', 'formation', 'paie', 'social']
+}
+
+JUNIOR_PROFILE_WORDS = ['débutant', 'junior', 'stage', 'première']
+SENIOR_PROFILE_WORDS = ['senior', 'expert', 'manager', 'chef']
+JUNIOR_OFFER_WORDS = ['junior', 'débutant', 'stage']
+SENIOR_OFFER_WORDS = ['senior', 'expert', 'manager']
+# Mots qui privent une offre du bonus « confirmé » (« manager » n'en fait pas partie)
+LEVELLED_OFFER_WORDS = ['junior', 'débutant', 'stage', 'senior', 'expert']
+
+# Mots-clés mis en avant dans les candidatures, dans leur ordre de priorité
+TECHNICAL_JOB_KEYWORDS = ['python', 'java', 'javascript', 'sql', 'excel', 'crm', 'erp', 'sap']
+SOFT_JOB_KEYWORDS = ['équipe', 'autonomie', 'communication', 'organisation', 'rigueur']
+
+
+# Recherche multi-motifs précompilée
+class KeywordMatcher:
+    """Trouve en une seule passe toutes les occurrences de plusieurs vocabulaires"""
+
+    def __init__(self, vocabularies):
+        # mot-clé -> catégories (un même mot peut appartenir à plusieurs vocabulaires)
+        self.categories = {}
+        for category, keywords in vocabularies.items():
+            for keyword in keywords:
+                self.categories.setdefault(keyword.lower(), set()).add(category)
+
+        # Alternatives les plus longues d'abord : « formation payante » avant « formation »
+        keywords = sorted(self.categories, key=len, reverse=True)
+        alternation = '|'.join(self._keyword_pattern(keyword) for keyword in keywords)
+        # Lookahead : chaque début de mot est testé, y compris à l'intérieur d'un motif déjà trouvé ;
+        # le pluriel en -s/-x est accepté, les mots plus longs (« javascript » pour « java ») non
+        self._pattern = re.compile(rf'(?<!\w)(?=({alternation})[sx]?(?!\w))', re.IGNORECASE)
+
+        # Mots-clés contenus dans un mot-clé plus long qui commence au même endroit
+        self._implied = {}
+        for keyword in keywords:
+            implied = {
+                other for other in keywords
+                if other != keyword and re.match(rf'{self._keyword_pattern(other)}(?!\w)', keyword)
+            }
+            if implied:
+                self._implied[keyword] = implied
+
+    @staticmethod
+    def _keyword_pattern(keyword):
+        return r'\s+'.join(re.escape(part) for part in keyword.lower().split())
+
+    def knows(self, keyword):
+        return keyword.lower() in self.categories
+
+    def find(self, text):
+        """Ensemble des mots-clés présents dans le texte, en une passe"""
+        found = set()
+        # Chaque forme distincte n'est normalisée qu'une fois, même si elle apparaît souvent
+        for match in set(self._pattern.findall(text or '')):
+            keyword = ' '.join(match.lower().split())
+            found.add(keyword)
+            found.update(self._implied.get(keyword, ()))
+        return found
+
+    def count_by_category(self, found):
+        """Nombre de mots-clés trouvés par catégorie"""
+        counts = {}
+        for keyword in found:
+            for category in self.categories.get(keyword, ()):
+                counts[category] = counts.get(category, 0) + 1
+        return counts
+
+
+@process_singleton
+def get_job_keyword_matcher():
+    """Matcher des mots-clés mis en avant dans les candidatures générées"""
+    return KeywordMatcher({'technical': TECHNICAL_JOB_KEYWORDS, 'soft': SOFT_JOB_KEYWORDS})
+
+
+@process_singleton
+def get_keyword_matcher():
+    """Matcher compilé une seule fois pour tout le processus"""
+    vocabularies = {f'domain:{domain}': keywords for domain, keywords in SKILLS_KEYWORDS.items()}
+    vocabularies.update({
+        'profile:junior': JUNIOR_PROFILE_WORDS,
+        'profile:senior': SENIOR_PROFILE_WORDS,
+        'offer:junior': JUNIOR_OFFER_WORDS,
+        'offer:senior': SENIOR_OFFER_WORDS
+    })
+    return KeywordMatcher(vocabularies)
@@ -0,0 +1,67 @@
+"""Rapports et recommandations"""
+from .applicant import history_offers
+
+
+# Système de Notifications (classe séparée)
+class NotificationSystemAI:
+    def __init__(self):
+        self.notifications = []
+    
+    def generate_daily_report(self, applications_sent, jobs_analyzed, stats=None):
+        """Génère un rapport quotidien"""
+        import datetime
+        today = datetime.datetime.now().strftime("%d/%m/%Y")
+        offers = history_offers(applications_sent)
+        
+        if stats is not None:
+            # Agrégats tenus à jour à chaque candidature : rien à recalculer sur l'historique
+            return {
+                'date': today,
+                'jobs_analyzed': len(jobs_analyzed),
+                'applications_sent': stats['daily'].get(datetime.date.today().isoformat(), 0),
+                'avg_compatibility': stats['avg_score'],
+                'top_companies': [company for company, _ in stats['top_companies']],
+                'recommendations': self._generate_recommendations(applications_sent, jobs_analyzed, offers)
+            }
+        
+        report = {
+            'date': today,
+            'jobs_analyzed': len(jobs_analyzed),
+            'applications_sent': len(applications_sent),
+            'avg_compatibility': sum(app['ai_score'] for app in applications_sent) / len(applications_sent) if applications_sent else 0,
+            'top_companies': list(set([offers[app['offer_id']]['company'] for app in applications_sent if app['offer_id'] in offers]))[:5],
+            'recommendations': self._generate_recommendations(applications_sent, jobs_analyzed, offers)
+        }
+        
+        return report
+    
+    def _generate_recommendations(self, applications_sent, jobs_analyzed, offers=None):
+        """Génère des recommandations basées sur l'activité"""
+        recommendations = []
+        
+        if len(applications_sent) == 0:
+            recommendations.append("🔄 Aucune candidature envoyée aujourd'hui. Activez la candidature automatique.")
+        elif len(applications_sent) < 3:
+            recommendations.append("📈 Augmentez votre limite quotidienne pour plus de candidatures.")
+        
+        return recommendations
+
+    
+    def _generate_recommendations(self, applications_sent, jobs_analyzed, offers=None):
+        """Génère des recommandations personnalisées"""
+        recommendations = []
+        
+        if len(applications_sent) < 5:
+            recommendations.append("💡 Élargissez vos critères de recherche pour plus d'opportunités")
+        
+        if applications_sent:
+            avg_score = sum(app['ai_score'] for app in applications_sent) / len(applications_sent)
+            if avg_score < 0.7:
+                recommendations.append("🎯 Optimisez votre profil pour améliorer la compatibilité")
+        
+        offers = offers if offers is not None else history_offers(applications_sent)
+        remote_jobs = sum(1 for app in applications_sent if offers.get(app['offer_id'], {}).get('is_remote'))
+        if remote_jobs > len(applications_sent) * 0.5:
+            recommendations.append("🏠 Vous postulez beaucoup en télétravail, pensez aux postes en présentiel")
+        
+        return recommendations
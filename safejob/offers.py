@@ -0,0 +1,159 @@
+"""Représentation compacte des offres d'emploi"""
+import sys
+
+
+_MISSING = object()
+
+
+# Offre d'emploi compacte
+class JobOffer:
+    """Offre à attributs fixes (__slots__), utilisable comme un dict
+
+    Les chaînes très répétées (source, type, lieu, entreprise) sont internées et le texte de
+    recherche en minuscules n'est calculé qu'à la première demande.
+    """
+
+    FIELDS = ('offer_id', 'title', 'company', 'location', 'description', 'url', 'date',
+              'salary', 'type', 'source', 'is_remote', 'ai_score', 'relevance_score',
+              'risk_score', 'risk_level', 'risk_reasons', 'scam_probability', 'reputation')
+    INTERNED_FIELDS = frozenset(('company', 'location', 'type', 'source'))
+
+    __slots__ = FIELDS + ('_search_text', '_extra')
+
+    def __init__(self, **fields):
+        self._search_text = None
+        self._extra = None
+        for key, value in fields.items():
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, cls):
+            return data
+        return cls(**data)
+
+    def to_dict(self):
+        return dict(self.items())
+
+    def copy(self):
+        offer = JobOffer.__new__(JobOffer)
+        for field in self.FIELDS:
+            value = getattr(self, field, _MISSING)
+            if value is not _MISSING:
+                object.__setattr__(offer, field, value)
+        offer._search_text = self._search_text
+        offer._extra = dict(self._extra) if self._extra else None
+        return offer
+
+    @property
+    def search_text(self):
+        """Titre et description en minuscules, calculés une seule fois"""
+        if self._search_text is None:
+            self._search_text = f"{self.get('title') or ''} {self.get('description') or ''}".lower()
+        return self._search_text
+
+    # --- Interface dict ---
+
+    def __getitem__(self, key):
+        if key in self.__slots__ and not key.startswith('_'):
+            value = getattr(self, key, _MISSING)
+        else:
+            value = self._extra.get(key, _MISSING) if self._extra else _MISSING
+        if value is _MISSING:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self.FIELDS:
+            if key in self.INTERNED_FIELDS and type(value) is str:
+                value = sys.intern(value)
+            elif key in ('title', 'description'):
+                self._search_text = None
+            object.__setattr__(self, key, value)
+        else:
+            if self._extra is None:
+                self._extra = {}
+            self._extra[key] = value
+
+    def __delitem__(self, key):
+        if key in self.FIELDS:
+            if getattr(self, key, _MISSING) is _MISSING:
+                raise KeyError(key)
+            object.__delattr__(self, key)
+        elif self._extra and key in self._extra:
+            del self._extra[key]
+        else:
+            raise KeyError(key)
+
+    def __contains__(self, key):
+        try:
+            self[key]
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self):
+        for field in self.FIELDS:
+            if getattr(self, field, _MISSING) is not _MISSING:
+                yield field
+        if self._extra:
+            yield from self._extra
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __eq__(self, other):
+        if isinstance(other, (JobOffer, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self):
+        return f"JobOffer({self.to_dict()!r})"
+
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        self._search_text = None
+        self._extra = None
+        for key, value in state.items():
+            self[key] = value
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def setdefault(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            self[key] = default
+            return default
+
+    def update(self, other=(), **fields):
+        items = other.items() if hasattr(other, 'items') else other
+        for key, value in items:
+            self[key] = value
+        for key, value in fields.items():
+            self[key] = value
+
+    def pop(self, key, default=_MISSING):
+        try:
+            value = self[key]
+        except KeyError:
+            if default is _MISSING:
+                raise
+            return default
+        del self[key]
+        return value
+
+    def keys(self):
+        return list(self)
+
+    def values(self):
+        return [self[key] for key in self]
+
+    def items(self):
+        return [(key, self[key]) for key in self]
@@ -0,0 +1,48 @@
+"""Profilage automatique des utilisateurs"""
+from .matching import (
+    SKILLS_KEYWORDS, JUNIOR_PROFILE_WORDS, SENIOR_PROFILE_WORDS, get_keyword_matcher
+)
+
+
+# Classe IA de Profilage Utilisateur
+class UserProfileAI:
+    def __init__(self):
+        self.skills_keywords = SKILLS_KEYWORDS
+    
+    def analyze_user_profile(self, experience, skills, preferences):
+        """Analyse automatique du profil utilisateur"""
+        # Analyse des compétences : une seule passe sur le texte pour tous les domaines
+        user_text = f"{experience} {' '.join(skills)}"
+        matcher = get_keyword_matcher()
+        found = matcher.find(user_text)
+        category_counts = matcher.count_by_category(found)
+        
+        profile_score = {
+            domain: category_counts.get(f'domain:{domain}', 0)
+            for domain in self.skills_keywords
+        }
+        
+        # Domaine principal
+        main_domain = max(profile_score, key=profile_score.get) if profile_score else 'général'
+        
+        # Génération des critères de recherche automatiques
+        search_criteria = {
+            'main_domain': main_domain,
+            'profile_text': user_text,
+            'keywords': self.skills_keywords.get(main_domain, ['emploi']),
+            'experience_level': self._assess_experience_level(experience),
+            'compatibility_threshold': 0.6
+        }
+        
+        return search_criteria
+    
+    def _assess_experience_level(self, experience_text):
+        """Évalue le niveau d'expérience (d'après l'expérience seule, pas les compétences)"""
+        found = get_keyword_matcher().find(experience_text)
+        
+        if found.intersection(JUNIOR_PROFILE_WORDS):
+            return 'junior'
+        elif found.intersection(SENIOR_PROFILE_WORDS):
+            return 'senior'
+        else:
+            return 'confirmé'
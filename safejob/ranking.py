@@ -0,0 +1,158 @@
+"""Classement par pertinence BM25"""
+import threading
+from collections import OrderedDict
+
+from .config import get_setting, process_singleton
+from .dedup import JobDeduplicator
+from .scoring import BatchJobScorer
+
+
+# Index de pertinence BM25 sur les offres récupérées
+class BM25Index:
+    """Index inversé incrémental avec classement BM25 par postings creux
+
+    L'index garde au plus `max_documents` documents : au-delà, les moins récemment indexés ou
+    classés sont retirés et les postings reconstruits, ce qui borne la mémoire et les statistiques
+    IDF d'un serveur qui tourne longtemps.
+    """
+
+    STOPWORDS = {
+        'de', 'la', 'le', 'les', 'des', 'du', 'un', 'une', 'et', 'en', 'au', 'aux', 'a', 'pour',
+        'par', 'sur', 'dans', 'avec', 'vous', 'nous', 'votre', 'notre', 'vos', 'nos', 'est', 'sont',
+        'qui', 'que', 'ou', 'ce', 'cette', 'ces', 'son', 'sa', 'ses', 'se', 'il', 'elle', 'ne', 'pas',
+        'plus', 'h', 'f', 'hf', 'd', 'l'
+    }
+
+    # Part de l'index libérée à chaque éviction, pour ne pas reconstruire à chaque ajout
+    EVICTION_FRACTION = 0.1
+
+    def __init__(self, k1=1.5, b=0.75, max_documents=None):
+        self.k1 = k1
+        self.b = b
+        self.max_documents = max_documents
+        self.doc_ids = OrderedDict()  # clé du document -> indice, du moins au plus récemment utilisé
+        self.doc_lengths = []
+        self._doc_terms = []  # fréquences des termes de chaque document, pour reconstruire les postings
+        self.evictions = 0
+        self._postings = {}  # terme -> ([indices], [fréquences])
+        self._arrays = {}  # terme -> (np.array indices, np.array fréquences), compactés à la demande
+        self._lengths_array = None
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    @classmethod
+    def tokenize(cls, text):
+        return [token for token in JobDeduplicator.normalize_text(text).split() if token not in cls.STOPWORDS]
+
+    def add_documents(self, documents):
+        """Indexe les documents (clé, texte) qui ne le sont pas encore"""
+        import numpy as np
+
+        added = touched = 0
+        with self._lock:
+            for key, text in documents:
+                touched += 1
+                if key in self.doc_ids:
+                    self.doc_ids.move_to_end(key)
+                    continue
+                frequencies = {}
+                for token in self.tokenize(text):
+                    frequencies[token] = frequencies.get(token, 0) + 1
+                self._index_document(key, frequencies)
+                added += 1
+            if self.max_documents and len(self.doc_ids) > self.max_documents:
+                # Les documents du lot courant restent indexés : ils vont être classés
+                self._evict(max(int(self.max_documents * (1 - self.EVICTION_FRACTION)), touched))
+            elif added:
+                self._lengths_array = np.asarray(self.doc_lengths, dtype=np.float64)
+        return added
+
+    def _index_document(self, key, frequencies):
+        index = len(self.doc_lengths)
+        self.doc_ids[key] = index
+        self.doc_lengths.append(sum(frequencies.values()))
+        self._doc_terms.append(frequencies)
+        for token, frequency in frequencies.items():
+            doc_list, tf_list = self._postings.setdefault(token, ([], []))
+            doc_list.append(index)
+            tf_list.append(frequency)
+            self._arrays.pop(token, None)
+
+    def _evict(self, keep):
+        """Ne garde que les `keep` documents les plus récemment utilisés, postings reconstruits"""
+        import numpy as np
+
+        kept = list(self.doc_ids.items())[len(self.doc_ids) - keep:]
+        self.evictions += len(self.doc_ids) - len(kept)
+        doc_terms = self._doc_terms
+        self.doc_ids = OrderedDict()
+        self.doc_lengths = []
+        self._doc_terms = []
+        self._postings = {}
+        self._arrays = {}
+        for key, index in kept:
+            self._index_document(key, doc_terms[index])
+        self._lengths_array = np.asarray(self.doc_lengths, dtype=np.float64)
+
+    def _term_arrays(self, term):
+        import numpy as np
+
+        arrays = self._arrays.get(term)
+        if arrays is None:
+            doc_list, tf_list = self._postings[term]
+            arrays = (np.asarray(doc_list, dtype=np.int64), np.asarray(tf_list, dtype=np.float64))
+            self._arrays[term] = arrays
+        return arrays
+
+    def score(self, query, indexes=None):
+        """Scores BM25 pour la requête, de tous les documents indexés ou des seuls `indexes`"""
+        with self._lock:
+            return self._score(query, indexes)
+
+    def _score(self, query, indexes=None):
+        import numpy as np
+
+        n_docs = len(self.doc_lengths)
+        if indexes is None:
+            indexes = np.arange(n_docs)
+        else:
+            indexes = np.asarray(indexes, dtype=np.int64)
+        scores = np.zeros(len(indexes), dtype=np.float64)
+        if n_docs == 0 or not len(indexes):
+            return scores
+        # Rang de chaque document parmi ceux demandés (-1 : non demandé)
+        positions = np.full(n_docs, -1, dtype=np.int64)
+        positions[indexes] = np.arange(len(indexes))
+        lengths = self._lengths_array
+        mean_length = max(lengths.mean(), 1.0)
+        for term in set(self.tokenize(query)):
+            if term not in self._postings:
+                continue
+            docs, tfs = self._term_arrays(term)
+            idf = np.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+            wanted = positions[docs] >= 0
+            docs, tfs = docs[wanted], tfs[wanted]
+            norms = self.k1 * (1 - self.b + self.b * lengths[docs] / mean_length)
+            # Chaque document n'apparaît qu'une fois par posting : l'addition indexée est sûre
+            scores[positions[docs]] += idf * tfs * (self.k1 + 1) / (tfs + norms)
+        return scores
+
+    def rank(self, query, keys, top_k=None):
+        """Classe les documents demandés par pertinence décroissante, renvoie [(clé, score)]"""
+        with self._lock:
+            keys = [key for key in dict.fromkeys(keys) if key in self.doc_ids]
+            if not keys:
+                return []
+            for key in keys:
+                self.doc_ids.move_to_end(key)
+            scores = self._score(query, [self.doc_ids[key] for key in keys])
+        order = BatchJobScorer.top_k(scores, top_k)
+        return [(keys[index], float(scores[index])) for index in order]
+
+
+@process_singleton
+def get_relevance_index():
+    """Index BM25 partagé, alimenté au fil des recherches de toutes les sessions (taille bornée)"""
+    return BM25Index(max_documents=int(get_setting("RELEVANCE_INDEX_SIZE", 50000)))
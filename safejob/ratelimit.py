@@ -0,0 +1,25 @@
+"""Limitation de débit partagée par les sources d'offres et la file d'envoi"""
+import threading
+import time
+
+
+class TokenBucket:
+    """Seau à jetons : `rate` jetons par seconde avec une rafale de `capacity`"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Réserve un jeton et renvoie le délai à attendre avant de l'utiliser"""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+            self.updated_at = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.rate
@@ -0,0 +1,274 @@
+"""Index de réputation des employeurs et des domaines (listes noires et blanches)"""
+import hashlib
+import logging
+import os
+import threading
+import time
+
+from .config import get_setting, process_singleton
+from .dedup import JobDeduplicator
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIST_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rules', 'reputation.txt')
+
+
+# Ensemble de clés hachées
+class HashedKeySet:
+    """Empreintes 64 bits triées, précédées d'un filtre de Bloom
+
+    Le filtre (quelques bits par clé) écarte en O(1) la quasi-totalité des clés absentes ;
+    seules ses réponses positives sont confirmées par recherche dichotomique dans le
+    tableau trié. Aucune chaîne n'est conservée : 8 octets par clé plus le filtre.
+    """
+
+    BITS_PER_KEY = 10  # ≈ 1 % de faux positifs du filtre avant confirmation
+    HASH_COUNT = 7
+
+    def __init__(self):
+        import numpy as np
+
+        self.hashes = np.zeros(0, dtype=np.uint64)
+        # (nombre de bits, octets) remplacés d'un bloc : une lecture concurrente reste cohérente
+        self._filter = (8, np.zeros(1, dtype=np.uint8))
+
+    def __len__(self):
+        return len(self.hashes)
+
+    def _positions(self, hashes, bit_count):
+        """Positions des bits de chaque empreinte (double hachage), forme (n, HASH_COUNT)"""
+        import numpy as np
+
+        low = hashes & np.uint64(0xFFFFFFFF)
+        high = (hashes >> np.uint64(32)) | np.uint64(1)
+        steps = np.arange(self.HASH_COUNT, dtype=np.uint64)
+        return (low[:, None] + steps[None, :] * high[:, None]) % np.uint64(bit_count)
+
+    def _set_bits(self, bits, bit_count, hashes):
+        import numpy as np
+
+        positions = self._positions(hashes, bit_count).ravel()
+        np.bitwise_or.at(bits, positions >> np.uint64(3), (1 << (positions & np.uint64(7))).astype(np.uint8))
+
+    def add(self, hashes):
+        """Ajoute des empreintes ; le filtre n'est reconstruit que s'il devient trop petit"""
+        import numpy as np
+
+        hashes = np.unique(np.asarray(hashes, dtype=np.uint64))
+        new_hashes = np.setdiff1d(hashes, self.hashes, assume_unique=True)
+        if not len(new_hashes):
+            return 0
+        hashes = np.union1d(self.hashes, new_hashes)
+        bit_count, bits = self._filter
+        if len(hashes) * self.BITS_PER_KEY > bit_count:
+            # Capacité dépassée : filtre doublé, reconstruit à partir du tableau trié
+            bit_count = 2 * len(hashes) * self.BITS_PER_KEY
+            bits = np.zeros((bit_count + 7) // 8, dtype=np.uint8)
+            self._set_bits(bits, bit_count, hashes)
+            self._filter = (bit_count, bits)
+        else:
+            self._set_bits(bits, bit_count, new_hashes)
+        self.hashes = hashes
+        return len(new_hashes)
+
+    def contains(self, hashes):
+        """Appartenance de chaque empreinte, pour tout un lot"""
+        import numpy as np
+
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        known = self.hashes
+        bit_count, bits = self._filter
+        result = np.zeros(len(hashes), dtype=bool)
+        if not len(hashes) or not len(known):
+            return result
+        positions = self._positions(hashes, bit_count)
+        maybe = ((bits[positions >> np.uint64(3)] >> (positions & np.uint64(7)).astype(np.uint8)) & 1).all(axis=1)
+        candidates = np.flatnonzero(maybe)
+        if len(candidates):
+            slots = np.minimum(np.searchsorted(known, hashes[candidates]), len(known) - 1)
+            result[candidates] = known[slots] == hashes[candidates]
+        return result
+
+
+# Index de réputation
+class ReputationIndex:
+    """Employeurs et domaines bloqués ou de confiance, lus depuis un fichier de listes
+
+    Une ligne par entrée : `block company Nom de l'entreprise`, `block domain exemple.com`,
+    `allow company ...` ou `allow domain ...` (les lignes vides et `#` sont ignorées). La liste
+    blanche l'emporte sur la liste noire ; un domaine couvre aussi ses sous-domaines.
+
+    Le fichier est suivi par position : les lignes ajoutées en fin de fichier sont intégrées
+    sans relire le reste. Un fichier raccourci ou remplacé est relu entièrement.
+    """
+
+    BLOCKED = 'blocked'
+    TRUSTED = 'trusted'
+    TAIL_SIZE = 64
+
+    def __init__(self, path=None, reload_interval=5.0):
+        self.path = path
+        self.reload_interval = reload_interval
+        self.blocked = HashedKeySet()
+        self.allowed = HashedKeySet()
+        self._offset = 0
+        # Premiers et derniers octets lus, pour détecter une réécriture du fichier
+        self._head = b''
+        self._tail = b''
+        self._file_id = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+        if path:
+            self.refresh()
+
+    @staticmethod
+    def key_hash(kind, value):
+        digest = hashlib.blake2b(f"{kind}:{value}".encode('utf-8'), digest_size=8).digest()
+        return int.from_bytes(digest, 'little')
+
+    @staticmethod
+    def normalize_company(company):
+        return JobDeduplicator.normalize_text(company)
+
+    @staticmethod
+    def normalize_domain(domain):
+        domain = (domain or '').strip().lower().rstrip('.')
+        if '://' in domain:
+            domain = domain.split('://', 1)[1]
+        domain = domain.split('/', 1)[0].split('?', 1)[0].split(':', 1)[0]
+        return domain[4:] if domain.startswith('www.') else domain
+
+    def entry_hash(self, kind, value):
+        value = self.normalize_company(value) if kind == 'company' else self.normalize_domain(value)
+        return self.key_hash(kind, value) if value else None
+
+    def add_entries(self, entries, blocked=None, allowed=None):
+        """Ajoute des entrées (liste, type, valeur) ; renvoie le nombre de nouvelles clés"""
+        blocked_keys, allowed_keys = [], []
+        for list_name, kind, value in entries:
+            key = self.entry_hash(kind, value)
+            if key is not None:
+                (blocked_keys if list_name == 'block' else allowed_keys).append(key)
+        blocked = blocked if blocked is not None else self.blocked
+        allowed = allowed if allowed is not None else self.allowed
+        return blocked.add(blocked_keys) + allowed.add(allowed_keys)
+
+    @staticmethod
+    def parse_line(line):
+        """(liste, type, valeur) d'une ligne du fichier, ou None"""
+        line = line.strip()
+        if not line or line.startswith('#'):
+            return None
+        parts = line.split(None, 2)
+        if len(parts) != 3 or parts[0] not in ('block', 'allow') or parts[1] not in ('company', 'domain'):
+            return None
+        return tuple(parts)
+
+    def _read_entries(self, handle):
+        """Entrées des lignes complètes à partir de la position courante"""
+        entries, invalid = [], 0
+        handle.seek(self._offset)
+        for raw_line in handle:
+            if not raw_line.endswith(b'\n'):
+                break  # ligne en cours d'écriture : reprise au prochain rafraîchissement
+            self._offset += len(raw_line)
+            if len(self._head) < self.TAIL_SIZE:
+                self._head = (self._head + raw_line)[:self.TAIL_SIZE]
+            self._tail = (self._tail + raw_line)[-self.TAIL_SIZE:]
+            line = raw_line.decode('utf-8', errors='replace')
+            entry = self.parse_line(line)
+            if entry is not None:
+                entries.append(entry)
+            elif line.strip() and not line.lstrip().startswith('#'):
+                invalid += 1
+        if invalid:
+            logger.warning("Réputation : %s lignes ignorées dans %s", invalid, self.path)
+        return entries
+
+    def _appended_only(self, handle, file_id, size):
+        """Vrai si le fichier n'a fait que grandir depuis la dernière lecture"""
+        if file_id != self._file_id or size < self._offset:
+            return False
+        if handle.read(len(self._head)) != self._head:
+            return False
+        handle.seek(self._offset - len(self._tail))
+        return handle.read(len(self._tail)) == self._tail
+
+    def refresh(self):
+        """Intègre les lignes ajoutées depuis la dernière lecture ; renvoie le nombre de nouvelles clés
+
+        Un fichier remplacé, tronqué ou modifié avant la dernière position lue est relu en
+        entier dans de nouveaux ensembles, substitués aux anciens une fois complets.
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            try:
+                stat = os.stat(self.path)
+                handle = open(self.path, 'rb')
+            except OSError:
+                return 0
+            with handle:
+                file_id = (stat.st_dev, stat.st_ino)
+                if self._appended_only(handle, file_id, stat.st_size):
+                    if stat.st_size == self._offset:
+                        return 0
+                    added = self.add_entries(self._read_entries(handle))
+                else:
+                    self._offset, self._head, self._tail, self._file_id = 0, b'', b'', file_id
+                    blocked, allowed = HashedKeySet(), HashedKeySet()
+                    added = self.add_entries(self._read_entries(handle), blocked, allowed)
+                    self.blocked, self.allowed = blocked, allowed
+        if added:
+            logger.info("Réputation : %s nouvelles clés (%s bloquées, %s de confiance)",
+                        added, len(self.blocked), len(self.allowed))
+        return added
+
+    def refresh_if_changed(self):
+        if self.path and (self._checked_at is None or time.monotonic() - self._checked_at >= self.reload_interval):
+            self.refresh()
+
+    def _offer_keys(self, offer):
+        """Empreintes de l'entreprise et des domaines (et domaines parents) de l'offre"""
+        keys = []
+        company = self.normalize_company(offer.get('company'))
+        if company:
+            keys.append(self.key_hash('company', company))
+        labels = self.normalize_domain(offer.get('url')).split('.')
+        for index in range(len(labels) - 1):
+            keys.append(self.key_hash('domain', '.'.join(labels[index:])))
+        return keys
+
+    def classify_batch(self, offers):
+        """'blocked', 'trusted' ou None pour chaque offre, en deux recherches vectorisées"""
+        import numpy as np
+
+        self.refresh_if_changed()
+        if not offers:
+            return []
+        if not len(self.blocked) and not len(self.allowed):
+            return [None] * len(offers)
+
+        keys, owners = [], []
+        for index, offer in enumerate(offers):
+            offer_keys = self._offer_keys(offer)
+            keys.extend(offer_keys)
+            owners.extend([index] * len(offer_keys))
+        owners = np.asarray(owners, dtype=np.int64)
+        blocked = np.zeros(len(offers), dtype=bool)
+        trusted = np.zeros(len(offers), dtype=bool)
+        blocked[owners[self.blocked.contains(keys)]] = True
+        trusted[owners[self.allowed.contains(keys)]] = True
+
+        return [
+            self.TRUSTED if is_trusted else self.BLOCKED if is_blocked else None
+            for is_blocked, is_trusted in zip(blocked.tolist(), trusted.tolist())
+        ]
+
+    def classify(self, offer):
+        return self.classify_batch([offer])[0]
+
+
+@process_singleton
+def get_reputation_index():
+    """Index partagé par le processus, alimenté par le fichier REPUTATION_LIST_PATH"""
+    return ReputationIndex(get_setting("REPUTATION_LIST_PATH", DEFAULT_LIST_PATH))
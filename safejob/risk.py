@@ -0,0 +1,217 @@
+"""Détection des offres frauduleuses par règles versionnées"""
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+
+from .config import get_setting, process_singleton
+from .offers import JobOffer
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_RULES_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'rules', 'scam_rules.json')
+
+# Résultat de l'évaluation d'une offre : score dans [0, 1], niveau low/medium/high et motifs
+RiskAssessment = namedtuple('RiskAssessment', ['score', 'level', 'reasons', 'version'])
+
+
+# Jeu de règles compilé
+class RiskRuleSet:
+    """Règles d'un fichier JSON, compilées pour n'analyser le texte d'une offre qu'une fois
+
+    Tous les motifs sont réunis dans une seule expression régulière, appliquée au texte en
+    minuscules (les motifs s'écrivent donc en minuscules) ; chaque règle ne compte qu'une fois
+    par offre. Adresses e-mail et liens ne sont cherchés que si le texte contient « @ » ou une URL.
+    """
+
+    LOW = 'low'
+    MEDIUM = 'medium'
+    HIGH = 'high'
+
+    _SALARY_AMOUNT = re.compile(r'\d+(?:[.,]\d+)?')
+    _CONTACTS = re.compile(r'@(?P<email_domain>[\w-]+(?:\.[\w-]+)+)|(?:https?://|www\.)(?P<link_domain>[\w-]+(?:\.[\w-]+)+)')
+
+    def __init__(self, rules):
+        self.version = str(rules['version'])
+        thresholds = rules.get('thresholds', {})
+        self.medium_threshold = float(thresholds.get('medium', 0.3))
+        self.high_threshold = float(thresholds.get('high', 0.6))
+
+        # nom du groupe -> (identifiant, libellé, poids)
+        self.pattern_rules = {}
+        alternatives = []
+        for index, rule in enumerate(rules.get('patterns', [])):
+            try:
+                re.compile(rule['pattern'])
+            except re.error as error:
+                raise ValueError(f"Règle {rule.get('id', index)} invalide : {error}") from error
+            group = f'rule{index}'
+            self.pattern_rules[group] = (rule['id'], rule.get('label', rule['id']), float(rule['weight']))
+            alternatives.append(rf"(?P<{group}>{rule['pattern']})(?!\w)")
+        # Le test de début de mot est factorisé : l'intérieur des mots est écarté immédiatement
+        # (sans motif, l'expression vide trouverait une correspondance partout)
+        self._pattern = re.compile(rf"(?<!\w)(?:{'|'.join(alternatives)})") if alternatives else None
+
+        salary = rules.get('salary', {})
+        self.max_annual_salary = float(salary.get('max_annual', 0)) or None
+        self.max_salary_ratio = float(salary.get('max_range_ratio', 0)) or None
+        self.salary_weight = float(salary.get('weight', 0.3))
+        self.salary_periods = {period.lower(): float(factor) for period, factor in salary.get('periods', {}).items()}
+
+        free_mail = rules.get('free_mail', {})
+        self.free_mail_domains = frozenset(domain.lower() for domain in free_mail.get('domains', []))
+        self.free_mail_weight = float(free_mail.get('weight', 0.3))
+
+        domains = rules.get('domains', {})
+        self.blocked_domains = frozenset(domain.lower() for domain in domains.get('blocked', []))
+        self.suspicious_domains = frozenset(domain.lower() for domain in domains.get('suspicious', []))
+        self.trusted_domains = frozenset(domain.lower() for domain in domains.get('trusted', []))
+        self.blocked_weight = float(domains.get('blocked_weight', 0.7))
+        self.suspicious_weight = float(domains.get('suspicious_weight', 0.3))
+
+    def level(self, score):
+        if score >= self.high_threshold:
+            return self.HIGH
+        if score >= self.medium_threshold:
+            return self.MEDIUM
+        return self.LOW
+
+    def assess(self, offer):
+        """Évalue une offre (JobOffer ou dict)"""
+        if isinstance(offer, JobOffer):
+            text = offer.search_text
+        else:
+            text = f"{offer.get('title') or ''} {offer.get('description') or ''}".lower()
+
+        reasons = {}  # identifiant -> (libellé, poids)
+        if self._pattern is not None:
+            for match in self._pattern.finditer(text):
+                rule_id, label, weight = self.pattern_rules[match.lastgroup]
+                reasons[rule_id] = (label, weight)
+
+        if '@' in text or '://' in text or 'www.' in text:
+            for match in self._CONTACTS.finditer(text):
+                domain = match.group('email_domain')
+                if domain is None:
+                    self._check_domain(match.group('link_domain'), reasons)
+                elif domain in self.free_mail_domains:
+                    reasons['free_mail'] = (f"Contact via une messagerie gratuite ({domain})", self.free_mail_weight)
+                else:
+                    self._check_domain(domain, reasons)
+
+        url = offer.get('url')
+        if url:
+            self._check_domain(self._url_domain(url), reasons)
+        self._check_salary(offer.get('salary'), reasons)
+
+        score = min(1.0, round(sum((weight for _, weight in reasons.values()), 0.0), 6))
+        return RiskAssessment(score, self.level(score), [label for label, _ in reasons.values()], self.version)
+
+    @staticmethod
+    def _url_domain(url):
+        url = url.strip().lower()
+        if '://' in url:
+            url = url.split('://', 1)[1]
+        return url.split('/', 1)[0].split('?', 1)[0].split(':', 1)[0]
+
+    def _check_domain(self, domain, reasons):
+        """Domaine bloqué ou suspect (le domaine lui-même ou l'un de ses parents)"""
+        labels = domain.lower().rstrip('.').split('.')
+        candidates = {'.'.join(labels[index:]) for index in range(len(labels) - 1)}
+        if not candidates.isdisjoint(self.trusted_domains):
+            return
+        if not candidates.isdisjoint(self.blocked_domains):
+            reasons['blocked_domain'] = (f"Domaine signalé ({domain})", self.blocked_weight)
+        elif not candidates.isdisjoint(self.suspicious_domains):
+            reasons['suspicious_domain'] = (f"Lien masqué ou messagerie ({domain})", self.suspicious_weight)
+
+    def _check_salary(self, salary, reasons):
+        """Salaire annuel irréaliste ou fourchette incohérente"""
+        if not isinstance(salary, str):
+            return
+        lowered = salary.lower()
+        amounts = [
+            float(amount.replace(',', '.'))
+            for amount in self._SALARY_AMOUNT.findall(re.sub(r'\s', '', lowered))
+        ]
+        amounts = [amount for amount in amounts if amount > 0]
+        if not amounts:
+            return
+        factor = next((factor for period, factor in self.salary_periods.items() if period in lowered), 1.0)
+        if self.max_annual_salary and max(amounts) * factor > self.max_annual_salary:
+            reasons['salary_too_high'] = ("Salaire anormalement élevé", self.salary_weight)
+        elif self.max_salary_ratio and len(amounts) > 1 and max(amounts) / min(amounts) > self.max_salary_ratio:
+            reasons['salary_range'] = ("Fourchette de salaire incohérente", self.salary_weight)
+
+
+# Moteur d'évaluation du risque d'arnaque
+class ScamRiskEngine:
+    """Évalue des lots d'offres et recharge le fichier de règles dès qu'il est modifié
+
+    La date de modification est vérifiée au plus toutes les `reload_interval` secondes. Un
+    fichier invalide est ignoré : la version précédente des règles reste en service.
+    """
+
+    def __init__(self, path=None, reload_interval=2.0):
+        self.path = path or DEFAULT_RULES_PATH
+        self.reload_interval = reload_interval
+        self._lock = threading.Lock()
+        self._mtime = None
+        self._checked_at = time.monotonic()
+        self.rules = self._load()
+
+    def _load(self):
+        mtime = os.stat(self.path).st_mtime_ns
+        with open(self.path, encoding='utf-8') as handle:
+            rules = RiskRuleSet(json.load(handle))
+        self._mtime = mtime
+        return rules
+
+    @property
+    def version(self):
+        return self.rules.version
+
+    def reload_if_changed(self):
+        """Recharge les règles si le fichier a changé ; renvoie True après un rechargement"""
+        now = time.monotonic()
+        if now - self._checked_at < self.reload_interval:
+            return False
+        with self._lock:
+            if now - self._checked_at < self.reload_interval:
+                return False
+            self._checked_at = now
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+            except OSError as error:
+                logger.warning("Règles anti-arnaque inaccessibles (%s) : %s", self.path, error)
+                return False
+            if mtime == self._mtime:
+                return False
+            previous = self.rules.version
+            try:
+                self.rules = self._load()
+            except (OSError, ValueError, KeyError, TypeError) as error:
+                # Pas de nouvel essai avant la prochaine modification du fichier
+                self._mtime = mtime
+                logger.error("Règles anti-arnaque invalides, version %s conservée : %s", previous, error)
+                return False
+        logger.info("Règles anti-arnaque rechargées : version %s -> %s", previous, self.rules.version)
+        return True
+
+    def assess(self, offer):
+        return self.assess_batch([offer])[0]
+
+    def assess_batch(self, offers):
+        """Évaluations d'un lot d'offres, toutes faites avec la même version des règles"""
+        self.reload_if_changed()
+        rules = self.rules
+        return [rules.assess(offer) for offer in offers]
+
+
+@process_singleton
+def get_risk_engine():
+    """Moteur partagé par toutes les sessions du processus"""
+    return ScamRiskEngine(get_setting("SCAM_RULES_PATH", DEFAULT_RULES_PATH))
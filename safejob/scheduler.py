@@ -0,0 +1,198 @@
+"""Planification des recherches automatiques"""
+import hashlib
+import json
+import logging
+import threading
+from datetime import datetime, timedelta
+
+from .applicant import AutoApplicantAI, migrate_applications_history
+from .config import get_setting, process_singleton
+from .profile import UserProfileAI
+from .search import AutoJobSearchAI
+from .storage import get_job_store
+
+logger = logging.getLogger(__name__)
+
+
+# Planificateur de la recherche automatique quotidienne
+class AutoSearchScheduler:
+    """Exécute en arrière-plan les recherches (et candidatures) automatiques des utilisateurs"""
+
+    FREQUENCY_DAYS = {'Quotidienne': 1, 'Tous les 2 jours': 2, 'Hebdomadaire': 7}
+    DEFAULT_SEARCH_TIME = "09:00"
+
+    def __init__(self, store, tick_seconds=60, max_results=200, archive_after_days=None, search_factory=None):
+        self.store = store
+        # Fabrique du moteur de recherche de chaque lot (sources et caches partagés par défaut)
+        self.search_factory = search_factory or AutoJobSearchAI
+        self.tick_seconds = tick_seconds
+        self.max_results = max_results
+        if archive_after_days is None:
+            archive_after_days = int(get_setting("HISTORY_ARCHIVE_DAYS", 90))
+        self.archive_after_days = archive_after_days
+        self._last_archive_date = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """Démarre le thread de planification (une seule fois)"""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='auto-search-scheduler', daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                self.run_due()
+                self.archive_history()
+            except Exception:
+                logger.exception("Échec du cycle de recherche automatique")
+            self._stop.wait(self.tick_seconds)
+
+    def archive_history(self, now=None):
+        """Compacte une fois par jour les candidatures plus anciennes que `archive_after_days`"""
+        now = now or datetime.now()
+        if self._last_archive_date == now.date():
+            return 0
+        self._last_archive_date = now.date()
+        archived = self.store.archive_applications((now - timedelta(days=self.archive_after_days)).isoformat())
+        if archived:
+            logger.info("%s candidatures archivées", archived)
+        return archived
+
+    def is_due(self, ai_settings, last_run, now):
+        """Indique si la recherche d'un utilisateur doit être lancée maintenant"""
+        try:
+            slot = datetime.strptime(ai_settings.get('search_time') or self.DEFAULT_SEARCH_TIME, "%H:%M").time()
+        except ValueError:
+            slot = datetime.strptime(self.DEFAULT_SEARCH_TIME, "%H:%M").time()
+        if now.time() < slot:
+            return False
+        if not last_run:
+            return True
+        frequency = self.FREQUENCY_DAYS.get(ai_settings.get('search_frequency'), 1)
+        return (now.date() - datetime.fromisoformat(last_run).date()).days >= frequency
+
+    def due_users_by_slot(self, now=None):
+        """Utilisateurs à traiter, regroupés par créneau horaire"""
+        now = now or datetime.now()
+        slots = {}
+        for email, user_data, last_run in self.store.iter_auto_search_users():
+            ai_settings = user_data.get('ai_settings', {})
+            if self.is_due(ai_settings, last_run, now):
+                slot = ai_settings.get('search_time') or self.DEFAULT_SEARCH_TIME
+                slots.setdefault(slot, []).append((email, user_data))
+        return slots
+
+    def run_due(self, now=None):
+        """Traite tous les utilisateurs dont le créneau est atteint, renvoie le nombre traité"""
+        now = now or datetime.now()
+        processed = 0
+        for slot, users in sorted(self.due_users_by_slot(now).items()):
+            processed += self.run_batch(users, now)
+        return processed
+
+    def run_batch(self, users, now=None):
+        """Recherche groupée : chaque mot-clé n'est récupéré qu'une fois pour tout le lot"""
+        profile_ai = UserProfileAI()
+        search_ai = self.search_factory()
+        run_at = (now or datetime.now()).isoformat()
+
+        criteria_by_user = {}
+        for email, user_data in users:
+            criteria_by_user[email] = profile_ai.analyze_user_profile(
+                user_data.get('experience', ''),
+                user_data.get('skills', []),
+                user_data.get('ai_settings', {})
+            )
+
+        keywords = [keyword for criteria in criteria_by_user.values() for keyword in criteria['keywords'][:3]]
+        # Seules les offres publiées depuis le dernier passage sont téléchargées ; elles sont datées
+        # de `run_at`, sur la même échelle que les derniers passages des utilisateurs
+        jobs_by_keyword = search_ai.fetch_new_jobs_by_keyword(keywords, self.store, seen_at=run_at)
+
+        processed = 0
+        for email, user_data in users:
+            try:
+                ai_settings = user_data.get('ai_settings', {})
+                criteria = criteria_by_user[email]
+                if migrate_applications_history(user_data, email, self.store):
+                    self.store.update_user(email, lambda data: data.pop('applications_history', None))
+                search_ai.ranking_mode = ai_settings.get('ranking_mode', 'compatibility')
+                stats = user_data.setdefault('ai_stats', {})
+                fingerprint = self.criteria_fingerprint(criteria)
+                # Profil inchangé : seules les offres apparues depuis le dernier passage de cet
+                # utilisateur sont scorées, puis fusionnées avec son classement précédent (le
+                # classement BM25, relatif au lot, est toujours recalculé)
+                last_run = self.store.get_last_auto_search(email)
+                incremental = (
+                    search_ai.ranking_mode == 'compatibility'
+                    and last_run is not None
+                    and stats.get('criteria_fingerprint') == fingerprint
+                )
+                if incremental:
+                    delta = search_ai.known_jobs_by_keyword(criteria['keywords'][:3], self.store, seen_after=last_run)
+                    user_jobs = [job for jobs in delta.values() for job in jobs]
+                else:
+                    # Copies : chaque utilisateur a ses propres scores
+                    user_jobs = [
+                        job.copy() for keyword in criteria['keywords'][:3]
+                        for job in jobs_by_keyword.get(keyword, ([], []))[1]
+                    ]
+                results = search_ai.select_jobs(user_jobs, criteria, self.max_results)
+                if incremental:
+                    results = self.merge_results(self.store.get_search_results(email), results)
+                stats['criteria_fingerprint'] = fingerprint
+                self.store.save_search_results(email, results, run_at)
+
+                if ai_settings.get('auto_apply_enabled') and results:
+                    AutoApplicantAI().enqueue_applications(
+                        results, user_data, criteria, email,
+                        ai_settings.get('daily_application_limit', 5),
+                        on_status=self._application_status_callback(email)
+                    )
+                stats['total_jobs_analyzed'] = len(results)
+                stats['last_activity_date'] = run_at
+                # `user_data` date du début du lot : seules les statistiques sont réécrites
+                self.store.update_user_stats(email, {
+                    key: stats[key] for key in ('criteria_fingerprint', 'total_jobs_analyzed', 'last_activity_date')
+                })
+                processed += 1
+            except Exception:
+                logger.exception("Échec de la recherche automatique pour %s", email)
+        return processed
+
+    @staticmethod
+    def criteria_fingerprint(criteria):
+        """Empreinte des critères de recherche d'un profil"""
+        basis = json.dumps(criteria, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha1(basis.encode('utf-8')).hexdigest()
+
+    def merge_results(self, previous, new_results):
+        """Classement précédent complété par les nouvelles offres, par score décroissant"""
+        merged = {job['offer_id']: job for job in previous}
+        for job in new_results:
+            merged[job['offer_id']] = job
+        # Tri stable : à score égal, les offres déjà classées gardent leur rang
+        return sorted(merged.values(), key=lambda job: job['ai_score'], reverse=True)[:self.max_results]
+
+
+    def _application_status_callback(self, email):
+        """Met à jour le compteur de candidatures de l'utilisateur à chaque envoi"""
+        def on_status(ticket):
+            if ticket['status'] == 'sent':
+                self.store.update_user_stats(email, {
+                    'total_applications_sent': self.store.count_applications(email, include_archived=True)
+                })
+        return on_status
+
+
+@process_singleton
+def get_auto_search_scheduler():
+    """Planificateur unique du processus, démarré au premier appel"""
+    return AutoSearchScheduler(get_job_store()).start()
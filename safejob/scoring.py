@@ -0,0 +1,180 @@
+"""Scoring vectorisé des offres d'emploi"""
+import heapq
+import itertools
+
+from .matching import JUNIOR_OFFER_WORDS, LEVELLED_OFFER_WORDS, SENIOR_OFFER_WORDS, get_keyword_matcher
+from .offers import JobOffer
+from .risk import RiskRuleSet, get_risk_engine
+
+
+# Scoring vectorisé des offres
+class BatchJobScorer:
+    """Calcule les scores de compatibilité d'un lot d'offres en une somme pondérée vectorisée"""
+
+    BASE_SCORE = 0.5
+    KEYWORD_BONUS = 0.1
+    LEVEL_BONUS = 0.2
+    CONFIRMED_BONUS = 0.1
+    # Pénalité proportionnelle au score de risque d'arnaque (chaque signal classique y pèse 0.3)
+    SCAM_PENALTY = 1.0
+
+    LEVEL_FEATURES = ['offer_junior', 'offer_senior', 'no_level', 'scam_risk']
+
+    def __init__(self, matcher=None, risk_engine=None):
+        self.matcher = matcher or get_keyword_matcher()
+        self._risk_engine = risk_engine
+
+    @property
+    def risk_engine(self):
+        if self._risk_engine is None:
+            self._risk_engine = get_risk_engine()
+        return self._risk_engine
+
+    def _as_frame(self, offers):
+        """Accepte un DataFrame, un dict de colonnes ou une liste d'offres"""
+        import pandas as pd
+
+        if isinstance(offers, pd.DataFrame):
+            return offers
+        if isinstance(offers, dict):
+            return pd.DataFrame(offers)
+        return pd.DataFrame.from_records(list(offers), columns=['title', 'description'])
+
+    def _texts(self, offers):
+        """Texte (titre + description) de chaque offre"""
+        if isinstance(offers, (list, tuple)):
+            # Les JobOffer gardent leur texte de recherche en cache d'un scoring à l'autre
+            return [
+                offer.search_text if isinstance(offer, JobOffer)
+                else f"{offer.get('title') or ''} {offer.get('description') or ''}"
+                for offer in offers
+            ]
+        frame = self._as_frame(offers)
+        return (frame['title'].fillna('').astype(str) + ' ' + frame['description'].fillna('').astype(str)).tolist()
+
+    def assess_risks(self, offers):
+        """Évaluations du moteur anti-arnaque pour chaque offre"""
+        if not isinstance(offers, (list, tuple)):
+            offers = self._as_frame(offers).to_dict('records')
+        return self.risk_engine.assess_batch(offers)
+
+    def feature_matrix(self, offers, user_criteria, risks=None):
+        """Matrice documents × caractéristiques (mots-clés, niveau, risque d'arnaque)"""
+        import numpy as np
+        import pandas as pd
+
+        texts = self._texts(offers)
+        keywords = [keyword.lower() for keyword in user_criteria['keywords']]
+        feature_names = keywords + self.LEVEL_FEATURES
+        matrix = np.zeros((len(texts), len(feature_names)), dtype=np.float64)
+        if not texts:
+            return matrix, feature_names
+
+        keyword_columns = {keyword: index for index, keyword in enumerate(keywords) if self.matcher.knows(keyword)}
+        junior_words = set(JUNIOR_OFFER_WORDS)
+        senior_words = set(SENIOR_OFFER_WORDS)
+        levelled_words = set(LEVELLED_OFFER_WORDS)
+        base = len(keywords)
+
+        rows, columns = [], []
+        for row, text in enumerate(texts):
+            found = self.matcher.find(text)
+            for keyword in found:
+                column = keyword_columns.get(keyword)
+                if column is not None:
+                    rows.append(row)
+                    columns.append(column)
+            matrix[row, base] = not junior_words.isdisjoint(found)
+            matrix[row, base + 1] = not senior_words.isdisjoint(found)
+            matrix[row, base + 2] = levelled_words.isdisjoint(found)
+        matrix[rows, columns] = 1.0
+        if risks is None:
+            risks = self.assess_risks(offers)
+        matrix[:, base + 3] = [risk.score for risk in risks]
+
+        # Mots-clés hors vocabulaire : recherche par sous-chaîne vectorisée
+        lowered = None
+        for index, keyword in enumerate(keywords):
+            if keyword not in keyword_columns:
+                if lowered is None:
+                    lowered = pd.Series(texts).str.lower()
+                matrix[:, index] = lowered.str.contains(keyword, regex=False).to_numpy()
+
+        return matrix, feature_names
+
+    def weights(self, user_criteria, n_keywords):
+        """Poids de chaque caractéristique selon le niveau d'expérience du profil"""
+        import numpy as np
+
+        weights = np.zeros(n_keywords + len(self.LEVEL_FEATURES), dtype=np.float64)
+        weights[:n_keywords] = self.KEYWORD_BONUS
+        experience_level = user_criteria['experience_level']
+        if experience_level == 'junior':
+            weights[n_keywords] = self.LEVEL_BONUS
+        elif experience_level == 'senior':
+            weights[n_keywords + 1] = self.LEVEL_BONUS
+        elif experience_level == 'confirmé':
+            weights[n_keywords + 2] = self.CONFIRMED_BONUS
+        weights[n_keywords + 3] = -self.SCAM_PENALTY
+        return weights
+
+    def score_batch(self, offers, user_criteria, risks=None):
+        """Scores de compatibilité de tout le lot, bornés à [0, 1]
+
+        `risks` réutilise des évaluations anti-arnaque déjà faites ; les offres à risque élevé
+        reçoivent un score nul et ne passent donc aucun seuil.
+        """
+        import numpy as np
+
+        if risks is None:
+            risks = self.assess_risks(offers)
+        matrix, _ = self.feature_matrix(offers, user_criteria, risks)
+        weights = self.weights(user_criteria, len(user_criteria['keywords']))
+        scores = np.clip(self.BASE_SCORE + matrix @ weights, 0.0, 1.0)
+        scores[[risk.level == RiskRuleSet.HIGH for risk in risks]] = 0.0
+        # Arrondi : l'ordre des additions du produit matriciel ne doit pas décaler les seuils (0.6, 0.8)
+        return np.round(scores, 6)
+
+    @staticmethod
+    def top_k(scores, k=None, threshold=None):
+        """Indices des k meilleurs scores (au-dessus du seuil), par score décroissant"""
+        import numpy as np
+
+        candidates = np.arange(len(scores))
+        if threshold is not None:
+            candidates = candidates[scores >= threshold]
+        if k is not None and k < len(candidates):
+            # Sélection partielle en O(n) du k-ième score, puis tri des seuls k retenus
+            values = scores[candidates]
+            kth_score = values[np.argpartition(-values, k - 1)[k - 1]]
+            above = candidates[values > kth_score]
+            ties = candidates[values == kth_score][:k - len(above)]
+            candidates = np.sort(np.concatenate([above, ties]))
+        # Tri stable : à score égal, l'ordre d'arrivée des offres est conservé
+        order = np.argsort(-scores[candidates], kind='stable')
+        return candidates[order]
+
+
+class StreamingTopK:
+    """Meilleures offres d'un flux, maintenues dans un tas min de taille k"""
+
+    def __init__(self, k=None):
+        self.k = k
+        self._heap = []
+        self._sequence = itertools.count()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def push(self, score, item):
+        """Ajoute un élément ; au-delà de k, le moins bon est écarté en O(log k)"""
+        # À score égal, l'élément arrivé le premier l'emporte (comme le tri stable de top_k)
+        entry = (score, -next(self._sequence), item)
+        if self.k is None or len(self._heap) < self.k:
+            heapq.heappush(self._heap, entry)
+        elif entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
+
+    def items(self):
+        """Éléments retenus, par score décroissant"""
+        return [item for _, _, item in sorted(self._heap, key=lambda entry: entry[:2], reverse=True)]
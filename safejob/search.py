@@ -0,0 +1,479 @@
+"""Recherche automatique intelligente des offres"""
+from collections import namedtuple
+
+from .cache import get_search_cache
+from .classifier import get_scam_classifier
+from .dedup import JobDeduplicator
+from .fetch import FetchTask, get_fetch_engine
+from .ranking import get_relevance_index
+from .reputation import ReputationIndex, get_reputation_index
+from .risk import RiskRuleSet, get_risk_engine
+from .scoring import BatchJobScorer, StreamingTopK
+from .sources import get_source_registry
+
+
+# État d'une recherche progressive : dernière page traitée, classement courant, avancement par source
+SearchUpdate = namedtuple('SearchUpdate', ['task', 'top_jobs', 'progress', 'done'])
+
+
+# Classe de Recherche Automatique Intelligente
+class AutoJobSearchAI:
+    RANKING_MODES = ('compatibility', 'bm25')
+    
+    def __init__(self, fetch_engine=None, sources=None, search_cache=None, ranking_mode='compatibility',
+                 risk_engine=None, scam_classifier=None, reputation_index=None):
+        self.daily_search_count = 0
+        self.last_search_date = None
+        self.fetch_engine = fetch_engine or get_fetch_engine()
+        self.sources = sources if sources is not None else get_source_registry()
+        for adapter in self.sources:
+            self.fetch_engine.set_source_limit(adapter.name, adapter.capabilities.max_concurrency)
+        self.search_cache = search_cache if search_cache is not None else get_search_cache()
+        self.near_duplicate_dedup = False  # SimHash pour les offres republiées sur plusieurs sources
+        self.risk_engine = risk_engine or get_risk_engine()
+        self.scorer = BatchJobScorer(risk_engine=self.risk_engine)
+        # Modèle local optionnel : sans fichier de modèle, seules les règles s'appliquent
+        self.scam_classifier = scam_classifier if scam_classifier is not None else get_scam_classifier()
+        self.reputation_index = reputation_index if reputation_index is not None else get_reputation_index()
+        self.ranking_mode = ranking_mode if ranking_mode in self.RANKING_MODES else 'compatibility'
+        self.last_fetch_report = None
+        
+    def intelligent_job_search(self, user_criteria, location="", top_k=None, needed=None):
+        """Recherche intelligente basée sur le profil utilisateur
+        
+        Avec `needed`, la pagination est pilotée par la demande : la première page de chaque
+        mot-clé est récupérée, et les pages suivantes seulement tant qu'il manque des offres compatibles.
+        """
+        keywords = user_criteria['keywords'][:3]  # Top 3 mots-clés
+        if needed is None:
+            # Toutes les combinaisons mot-clé × source × page partent en même temps
+            all_jobs = self._run_fetch_tasks(self._initial_tasks(keywords, location))
+            return self.select_jobs(all_jobs, user_criteria, top_k)
+        
+        tasks = self._initial_tasks(keywords, location, first_page_only=True)
+        deduplicator = JobDeduplicator(near_duplicates=self.near_duplicate_dedup)
+        report = self.fetch_engine.new_report()
+        report.update(cache_hits=0, rounds=0, blocked_offers=0)
+        # Offres dédupliquées, filtrées et scorées vague par vague : la sélection finale les réutilise
+        scored_jobs = []
+        score_batches = []
+        compatible = 0
+        while tasks:
+            page_results = self._fetch_pages(tasks)
+            self._add_report(report, self.last_fetch_report)
+            
+            new_jobs = self._screen_jobs(deduplicator.deduplicate(self._merge_pages(tasks, page_results)), report)
+            if new_jobs:
+                scores = self._score_jobs(new_jobs, user_criteria)
+                scored_jobs.extend(new_jobs)
+                score_batches.append(scores)
+                compatible += int((scores >= user_criteria['compatibility_threshold']).sum())
+            if compatible >= needed:
+                break
+            
+            full_pages = [
+                task for index, task in enumerate(tasks)
+                if index in page_results and not self.sources.get(task.source).is_last_page(page_results[index])
+            ]
+            tasks = self._following_pages(full_pages, location)
+        
+        report['duplicates_dropped'] = deduplicator.duplicates_dropped
+        self.last_fetch_report = report
+        scores = [score for batch in score_batches for score in batch.tolist()]
+        if self.ranking_mode == 'bm25':
+            return self._rank_jobs_by_relevance(scored_jobs, user_criteria, top_k, scores)
+        return self._filter_jobs_by_compatibility(scored_jobs, user_criteria, top_k, scores)
+    
+    def stream_job_search(self, user_criteria, location="", top_k=None, needed=None):
+        """Recherche progressive : produit un SearchUpdate à chaque page reçue, puis le classement final"""
+        tasks = self._initial_tasks(user_criteria['keywords'][:3], location, first_page_only=needed is not None)
+        
+        progress = {}
+        deduplicator = JobDeduplicator(near_duplicates=self.near_duplicate_dedup)
+        ranking = StreamingTopK(top_k)
+        compatible_jobs = []
+        short_pages = {}
+        
+        def accept(task, page_jobs):
+            """Score une page ; renvoie True si la source peut avoir une page suivante"""
+            progress[task.source]['done'] += 1
+            # Une page incomplète signifie que les pages suivantes sont vides
+            key = (task.source, task.keyword)
+            if task.page > short_pages.get(key, task.page):
+                return False
+            last_page = self.sources.get(task.source).is_last_page(page_jobs)
+            if last_page:
+                short_pages[key] = min(task.page, short_pages.get(key, task.page))
+            
+            # Copies : le scoring modifie les offres, pas les entrées du cache
+            jobs = self._screen_jobs(deduplicator.deduplicate([job.copy() for job in page_jobs]), report)
+            if jobs:
+                scores = self._score_jobs(jobs, user_criteria).tolist()
+                for job, score in zip(jobs, scores):
+                    job['ai_score'] = score
+                    if score >= user_criteria['compatibility_threshold']:
+                        compatible_jobs.append(job)
+                        ranking.push(score, job)
+            return not last_page
+        
+        report = self.fetch_engine.new_report()
+        report.update(cache_hits=0, rounds=0, skipped_sources=self._skipped_sources())
+        self.last_fetch_report = report
+        while tasks:
+            report['rounds'] += 1
+            for task in tasks:
+                progress.setdefault(task.source, {'done': 0, 'failed': 0, 'total': 0})['total'] += 1
+            full_pages = []
+            
+            # Les pages déjà en cache s'affichent avant même le premier appel réseau
+            pending = []
+            for task in tasks:
+                cached = self.search_cache.get(self._cache_key(task))
+                if cached is None:
+                    pending.append(task)
+                    continue
+                report['cache_hits'] += 1
+                if accept(task, cached):
+                    full_pages.append(task)
+                yield SearchUpdate(task, ranking.items(), progress, False)
+            
+            for task, page_jobs, error in self.fetch_engine.stream(pending, report=report):
+                if error is not None:
+                    progress[task.source]['failed'] += 1
+                    yield SearchUpdate(task, ranking.items(), progress, False)
+                    continue
+                page_jobs = tuple(page_jobs)
+                self.search_cache.set(self._cache_key(task), page_jobs)
+                if accept(task, page_jobs):
+                    full_pages.append(task)
+                yield SearchUpdate(task, ranking.items(), progress, False)
+            
+            # Pages suivantes uniquement s'il manque encore des offres compatibles
+            tasks = []
+            if needed is not None and len(compatible_jobs) < needed:
+                tasks = self._following_pages(full_pages, location)
+        
+        report['duplicates_dropped'] = deduplicator.duplicates_dropped
+        if self.ranking_mode == 'bm25':
+            top_jobs = self._rank_jobs_by_relevance(
+                compatible_jobs, user_criteria, top_k, [job['ai_score'] for job in compatible_jobs]
+            )
+        else:
+            top_jobs = ranking.items()
+        yield SearchUpdate(None, top_jobs, progress, True)
+    
+    def fetch_jobs_by_keyword(self, keywords, location=""):
+        """Récupère en un seul lot parallèle les offres de plusieurs mots-clés, regroupées par mot-clé"""
+        tasks = []
+        for keyword in dict.fromkeys(keywords):
+            tasks.extend(self._build_fetch_tasks(keyword, location))
+        
+        page_results = self._fetch_pages(tasks)
+        
+        jobs_by_keyword = {}
+        for keyword in dict.fromkeys(keywords):
+            indexes = [index for index, task in enumerate(tasks) if task.keyword == keyword]
+            jobs_by_keyword[keyword] = self._merge_pages(
+                [tasks[index] for index in indexes],
+                {position: page_results[index] for position, index in enumerate(indexes) if index in page_results}
+            )
+        return jobs_by_keyword
+    
+    def fetch_new_jobs_by_keyword(self, keywords, store, location="", seen_at=None):
+        """Récupération incrémentale : seules les offres publiées depuis le dernier passage sont téléchargées
+        
+        Pour chaque (source, mot-clé, lieu), le store garde la date la plus récente déjà vue et les
+        offres connues, datées de leur première apparition (`seen_at`). Sur une source triée par
+        date, la pagination s'arrête à la première offre déjà vue. Renvoie {mot-clé: (nouvelles
+        offres, offres connues de la requête)}, les offres connues incluant les nouvelles.
+        
+        Le point de reprise est commun à tous les utilisateurs : les nouveautés propres à chacun
+        s'obtiennent avec `known_jobs_by_keyword(..., seen_after=son dernier passage)`.
+        """
+        keywords = list(dict.fromkeys(keywords))
+        tasks = self._initial_tasks(keywords, location, first_page_only=True)
+        new_jobs_by_query = {}
+        report = self.fetch_engine.new_report()
+        report.update(cache_hits=0, rounds=0)
+        while tasks:
+            page_results = self._fetch_pages(tasks)
+            self._add_report(report, self.last_fetch_report)
+            continuing = []
+            for index, task in enumerate(tasks):
+                if index not in page_results:
+                    continue
+                page_jobs = [job.copy() for job in page_results[index]]
+                fresh_jobs = self._unseen_jobs(store, task, location, page_jobs)
+                new_jobs_by_query.setdefault((task.source, task.keyword), []).extend(fresh_jobs)
+                adapter = self.sources.get(task.source)
+                # Triée par date, une page contenant une offre déjà vue clôt la requête
+                if adapter.is_last_page(page_results[index]):
+                    continue
+                if adapter.capabilities.date_sorted and len(fresh_jobs) < len(page_jobs):
+                    continue
+                continuing.append(task)
+            tasks = self._following_pages(continuing, location)
+        
+        results = {}
+        for keyword in keywords:
+            new_jobs = []
+            for adapter in self.sources:
+                query = self._query_key(adapter.name, keyword, location)
+                fresh_jobs = new_jobs_by_query.get((adapter.name, keyword), [])
+                if fresh_jobs:
+                    dates = [job['date'] for job in fresh_jobs if self._is_iso_date(job.get('date'))]
+                    store.merge_query_offers(*query, fresh_jobs, newest_date=max(dates, default=None), seen_at=seen_at)
+                new_jobs.extend(fresh_jobs)
+            results[keyword] = new_jobs
+        
+        known_jobs = self.known_jobs_by_keyword(keywords, store, location)
+        report['new_offers'] = sum(len(new_jobs) for new_jobs in results.values())
+        self.last_fetch_report = report
+        return {keyword: (new_jobs, known_jobs[keyword]) for keyword, new_jobs in results.items()}
+    
+    def known_jobs_by_keyword(self, keywords, store, location="", seen_after=None):
+        """Offres enregistrées de chaque mot-clé, toutes sources confondues
+        
+        Sans `seen_after`, autant d'offres qu'une récupération complète en aurait rapporté ; avec,
+        toutes celles apparues après cette date.
+        """
+        results = {}
+        for keyword in dict.fromkeys(keywords):
+            jobs = []
+            for adapter in self.sources:
+                limit = None if seen_after else self._max_pages(adapter) * adapter.capabilities.page_size
+                jobs.extend(store.get_query_offers(
+                    *self._query_key(adapter.name, keyword, location), limit=limit, seen_after=seen_after
+                ))
+            results[keyword] = jobs
+        return results
+    
+    def select_jobs(self, all_jobs, user_criteria, top_k=None):
+        """Déduplique, score et classe des offres déjà récupérées"""
+        # Les doublons sont écartés avant le scoring et l'affichage
+        deduplicator = JobDeduplicator(near_duplicates=self.near_duplicate_dedup)
+        all_jobs = deduplicator.deduplicate(all_jobs)
+        if self.last_fetch_report is not None:
+            self.last_fetch_report['duplicates_dropped'] = deduplicator.duplicates_dropped
+        
+        # Employeurs et domaines bloqués : écartés avant tout calcul de score
+        all_jobs = self._screen_jobs(all_jobs, self.last_fetch_report)
+        
+        # Filtrage intelligent des offres
+        if self.ranking_mode == 'bm25':
+            return self._rank_jobs_by_relevance(all_jobs, user_criteria, top_k)
+        
+        filtered_jobs = self._filter_jobs_by_compatibility(all_jobs, user_criteria, top_k)
+        
+        return filtered_jobs
+    
+    def _search_jobs_for_keyword(self, keyword, location):
+        """Recherche pour un mot-clé spécifique"""
+        return self._run_fetch_tasks(self._build_fetch_tasks(keyword, location))
+    
+    def _build_fetch_tasks(self, keyword, location, first_page_only=False):
+        """Prépare les appels à effectuer pour un mot-clé sur toutes les sources disponibles"""
+        # Une source dont le disjoncteur est ouvert n'est pas interrogée
+        return [
+            self._fetch_task(adapter.name, keyword, location, page)
+            for adapter in self.sources.available()
+            for page in range(1, (1 if first_page_only else self._max_pages(adapter)) + 1)
+        ]
+    
+    def _initial_tasks(self, keywords, location, first_page_only=False):
+        """Appels de départ pour une liste de mots-clés"""
+        tasks = []
+        for keyword in keywords:
+            tasks.extend(self._build_fetch_tasks(keyword, location, first_page_only))
+        return tasks
+    
+    def _following_pages(self, tasks, location):
+        """Page suivante de chaque appel dont la page était complète, dans la limite de la source"""
+        available = {adapter.name for adapter in self.sources.available()}
+        return [
+            self._fetch_task(task.source, task.keyword, location, task.page + 1)
+            for task in tasks
+            if task.source in available and task.page < self._max_pages(self.sources.get(task.source))
+        ]
+    
+    def _fetch_task(self, source, keyword, location, page):
+        # Clé normalisée : les sessions qui demandent la même page au même moment partagent l'appel
+        key = self._query_key(source, keyword, location) + (page,)
+        return FetchTask(source, keyword, page, self.sources.fetch, (source, keyword, location, page), key)
+    
+    @staticmethod
+    def _max_pages(adapter):
+        return adapter.capabilities.max_pages if adapter.capabilities.paging else 1
+    
+    @staticmethod
+    def _add_report(total, report):
+        """Cumule le rapport d'une vague de récupération"""
+        for key in ('completed', 'failed', 'timed_out', 'cache_hits'):
+            total[key] += report.get(key, 0)
+        total['errors'].extend(report['errors'])
+        total['skipped_sources'] = report.get('skipped_sources', [])
+        total['rounds'] += 1
+    
+    def _skipped_sources(self):
+        """Sources écartées par leur disjoncteur"""
+        available = {adapter.name for adapter in self.sources.available()}
+        return [adapter.name for adapter in self.sources if adapter.name not in available]
+    
+    def _run_fetch_tasks(self, tasks):
+        """Exécute les appels en parallèle et fusionne les résultats dans l'ordre des tâches"""
+        return self._merge_pages(tasks, self._fetch_pages(tasks))
+    
+    def _fetch_pages(self, tasks):
+        """Pages obtenues (cache ou réseau), indexées par position de tâche"""
+        # Les pages déjà en cache ne repassent pas par le réseau
+        page_results = {}
+        pending = []
+        for index, task in enumerate(tasks):
+            cached = self.search_cache.get(self._cache_key(task))
+            if cached is None:
+                pending.append((index, task))
+            else:
+                page_results[index] = cached
+        
+        results, report = self.fetch_engine.run([task for _, task in pending])
+        self.last_fetch_report = report
+        report['cache_hits'] = len(page_results)
+        report['skipped_sources'] = self._skipped_sources()
+        
+        fetched = {id(task): page_jobs for task, page_jobs in results}
+        for index, task in pending:
+            if id(task) in fetched:
+                page_jobs = tuple(fetched[id(task)])
+                self.search_cache.set(self._cache_key(task), page_jobs)
+                page_results[index] = page_jobs
+        
+        return page_results
+    
+    def _merge_pages(self, tasks, page_results):
+        """Concatène les pages dans l'ordre des tâches"""
+        jobs = []
+        short_pages = set()
+        for index, task in enumerate(tasks):
+            if index not in page_results:
+                continue
+            # Une page incomplète signifie que les pages suivantes sont vides
+            if (task.source, task.keyword) in short_pages:
+                continue
+            page_jobs = page_results[index]
+            # Copies : le scoring modifie les offres, pas les entrées du cache
+            jobs.extend(job.copy() for job in page_jobs)
+            if self.sources.get(task.source).is_last_page(page_jobs):
+                short_pages.add((task.source, task.keyword))
+        
+        return jobs
+    
+    @staticmethod
+    def _query_key(source, keyword, location):
+        """Requête (source, mot-clé, localisation) normalisée"""
+        return (source, keyword.strip().lower(), (location or '').strip().lower())
+    
+    def _cache_key(self, task):
+        """Clé de cache (source, mot-clé, localisation, page) normalisée"""
+        return self._query_key(task.source, task.keyword, task.args[2]) + (task.page,)
+    
+    @staticmethod
+    def _is_iso_date(value):
+        return isinstance(value, str) and value[:4].isdigit()
+    
+    def _unseen_jobs(self, store, task, location, page_jobs):
+        """Offres de la page absentes du store pour cette requête et pas plus anciennes que son point de reprise"""
+        query = self._query_key(task.source, task.keyword, location)
+        for job in page_jobs:
+            job.setdefault('offer_id', JobDeduplicator.offer_id(job))
+        known = store.known_query_offers(*query, (job['offer_id'] for job in page_jobs))
+        watermark = store.get_query_watermark(*query) if self.sources.get(task.source).capabilities.date_sorted else None
+        return [
+            job for job in page_jobs
+            if job['offer_id'] not in known
+            and not (watermark and self._is_iso_date(job.get('date')) and job['date'] < watermark)
+        ]
+    
+    def _filter_jobs_by_compatibility(self, jobs, user_criteria, top_k=None, scores=None):
+        """Filtre les offres par compatibilité avec le profil
+        
+        `scores` réutilise les scores déjà calculés pour ces offres (dans le même ordre).
+        """
+        if not jobs:
+            return []
+        
+        import numpy as np
+        
+        # Calcul vectorisé des scores de compatibilité de tout le lot
+        scores = self._score_jobs(jobs, user_criteria) if scores is None else np.asarray(scores, dtype=np.float64)
+        for job, score in zip(jobs, scores.tolist()):
+            job['ai_score'] = score
+        
+        # Filtre par seuil puis tri par score décroissant (top-k partiel si demandé)
+        selected = self.scorer.top_k(scores, top_k, user_criteria['compatibility_threshold'])
+        
+        return [jobs[index] for index in selected]
+    
+    def _screen_jobs(self, jobs, report=None):
+        """Écarte les offres d'employeurs ou de domaines bloqués, marque celles de confiance"""
+        if not jobs:
+            return jobs
+        screened = []
+        for job, reputation in zip(jobs, self.reputation_index.classify_batch(jobs)):
+            if reputation == ReputationIndex.BLOCKED:
+                continue
+            if reputation is not None:
+                job['reputation'] = reputation
+            screened.append(job)
+        if report is not None:
+            report['blocked_offers'] = report.get('blocked_offers', 0) + len(jobs) - len(screened)
+        return screened
+    
+    def _score_jobs(self, jobs, user_criteria):
+        """Évalue le risque d'arnaque de chaque offre, puis les scores de compatibilité du lot
+        
+        Une offre jugée frauduleuse par le modèle local passe en risque élevé : son score est nul
+        et elle n'atteint jamais la sélection ni l'envoi de candidatures.
+        """
+        risks = self.risk_engine.assess_batch(jobs)
+        if self.scam_classifier is not None and jobs:
+            probabilities = self.scam_classifier.predict_proba(jobs).tolist()
+            for index, (job, probability) in enumerate(zip(jobs, probabilities)):
+                job['scam_probability'] = probability
+                if probability >= self.scam_classifier.threshold:
+                    risks[index] = risks[index]._replace(
+                        level=RiskRuleSet.HIGH,
+                        reasons=risks[index].reasons + [f"Modèle anti-arnaque : probabilité {probability:.0%}"]
+                    )
+        for job, risk in zip(jobs, risks):
+            job['risk_score'] = risk.score
+            job['risk_level'] = risk.level
+            job['risk_reasons'] = risk.reasons
+        return self.scorer.score_batch(jobs, user_criteria, risks)
+    
+    def _rank_jobs_by_relevance(self, jobs, user_criteria, top_k=None, scores=None):
+        """Classement BM25 des offres compatibles selon l'expérience et les compétences"""
+        compatible_jobs = self._filter_jobs_by_compatibility(jobs, user_criteria, scores=scores)
+        if not compatible_jobs:
+            return []
+        
+        for job in compatible_jobs:
+            job.setdefault('offer_id', JobDeduplicator.offer_id(job))
+        index = get_relevance_index()
+        index.add_documents((job['offer_id'], f"{job['title']} {job['description']}") for job in compatible_jobs)
+        
+        query = user_criteria.get('profile_text') or ' '.join(user_criteria['keywords'])
+        ranking = index.rank(query, [job['offer_id'] for job in compatible_jobs], top_k)
+        best_score = ranking[0][1] if ranking and ranking[0][1] > 0 else 1.0
+        
+        jobs_by_id = {job['offer_id']: job for job in compatible_jobs}
+        ranked_jobs = []
+        for offer_id, relevance in ranking:
+            job = jobs_by_id[offer_id]
+            job['relevance_score'] = relevance / best_score
+            ranked_jobs.append(job)
+        
+        return ranked_jobs
+    
+    def _calculate_compatibility_score(self, job, user_criteria):
+        """Calcule le score de compatibilité entre l'offre et le profil"""
+        return float(self.scorer.score_batch([job], user_criteria)[0])
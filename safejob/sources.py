@@ -0,0 +1,306 @@
+"""Sources d'offres : adaptateurs, registre et état de santé"""
+import logging
+import random
+import threading
+import time
+from collections import deque, namedtuple
+
+from .config import get_setting, process_singleton
+from .fetch import current_task_deadline
+from .http import get_http_client
+from .offers import JobOffer
+from .ratelimit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+
+# Capacités déclarées par chaque source ; `date_sorted` : résultats du plus récent au plus ancien
+SourceCapabilities = namedtuple(
+    'SourceCapabilities',
+    ['paging', 'max_pages', 'page_size', 'max_concurrency', 'rate_per_second', 'burst', 'date_sorted'],
+    defaults=(False,)
+)
+
+
+class JobSourceAdapter:
+    """Interface d'une source d'offres : une page de résultats par appel"""
+
+    name = None
+    capabilities = SourceCapabilities(
+        paging=False, max_pages=1, page_size=50, max_concurrency=4, rate_per_second=None, burst=1
+    )
+
+    def fetch_page(self, keyword, location, page):
+        """Offres normalisées de la page demandée ; lève une exception en cas d'échec"""
+        raise NotImplementedError
+
+    def is_last_page(self, page_jobs):
+        """Une page incomplète signifie que les pages suivantes sont vides"""
+        return not self.capabilities.paging or len(page_jobs) < self.capabilities.page_size
+
+
+class AdzunaSource(JobSourceAdapter):
+    """API Adzuna"""
+
+    name = 'Adzuna'
+    capabilities = SourceCapabilities(
+        paging=True, max_pages=3, page_size=50, max_concurrency=6, rate_per_second=5.0, burst=6,
+        date_sorted=True
+    )
+
+    def __init__(self, http_client=None):
+        self.http_client = http_client or get_http_client()
+        self.app_id = get_setting("ADZUNA_APP_ID", "DEMO_ID")
+        self.app_key = get_setting("ADZUNA_APP_KEY", "DEMO_KEY")
+
+    def fetch_page(self, keyword, location, page):
+        """Récupère une page de résultats Adzuna"""
+        url = f"https://api.adzuna.com/v1/api/jobs/fr/search/{page}"
+
+        params = {
+            'app_id': self.app_id,
+            'app_key': self.app_key,
+            'results_per_page': self.capabilities.page_size,
+            'what': keyword,
+            'where': location or '',
+            'sort_by': 'date'
+        }
+
+        # Les reprises s'arrêtent à l'échéance de la recherche : le créneau de la source est libéré
+        response = self.http_client.get(url, params=params, timeout=5, deadline=current_task_deadline())
+        # Les erreurs remontent au moteur de récupération au lieu d'être ignorées
+        response.raise_for_status()
+
+        return self.parse_results(response.json(), location)
+
+    def parse_results(self, data, location):
+        """Convertit la réponse Adzuna en offres normalisées"""
+        jobs = []
+
+        for job in data.get('results', []):
+            try:
+                description = job.get('description', '') or ''
+                if len(description) > 500:
+                    description = description[:500] + '...'
+
+                lowered = description.lower()
+                jobs.append(JobOffer(
+                    title=job.get('title', '') or 'Titre non disponible',
+                    company=job.get('company', {}).get('display_name', '') or 'Entreprise non spécifiée',
+                    location=job.get('location', {}).get('display_name', '') or location or 'France',
+                    description=description,
+                    url=job.get('redirect_url', '') or '',
+                    date=job.get('created', '') or 'Date non spécifiée',
+                    salary=f"{job.get('salary_min', 0)}-{job.get('salary_max', 0)}€" if job.get('salary_min') else 'Salaire non spécifié',
+                    type='CDI',
+                    source=self.name,
+                    is_remote='remote' in lowered or 'télétravail' in lowered,
+                    ai_score=0  # Score de compatibilité à calculer
+                ))
+            except (AttributeError, TypeError):
+                continue
+
+        return jobs
+
+
+class HelloWorkSource(JobSourceAdapter):
+    """API HelloWork (simulée)"""
+
+    name = 'HelloWork'
+    capabilities = SourceCapabilities(
+        paging=False, max_pages=1, page_size=30, max_concurrency=4, rate_per_second=None, burst=1
+    )
+
+    def fetch_page(self, keyword, location, page):
+        """Simulation d'API HelloWork avec scoring IA"""
+        return [
+            JobOffer(
+                title=f"Poste {keyword} - Entreprise {i}",
+                company=f"Entreprise {keyword} {i}",
+                location=location or "France",
+                description=f"Recherche {keyword} expérimenté. Excellente opportunité dans une entreprise dynamique.",
+                url=f"https://hellowork.com/job/{keyword}-{i}",
+                date="2025-06-09",
+                salary="Selon profil",
+                type="CDI",
+                source=self.name,
+                is_remote=random.choice([True, False]),
+                ai_score=random.uniform(0.5, 0.9)
+            ) for i in range(1, self.capabilities.page_size + 1)
+        ]
+
+
+# Disjoncteur par source
+class CircuitBreaker:
+    """Ouvert après `failure_threshold` échecs consécutifs, puis un essai après `cooldown` secondes"""
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, cooldown=30.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self._lock:
+            return self._state(time.monotonic())
+
+    def _state(self, now):
+        if self.opened_at is None:
+            return self.CLOSED
+        if now - self.opened_at >= self.cooldown:
+            return self.HALF_OPEN
+        return self.OPEN
+
+    def allow(self):
+        """Indique si un appel peut partir ; en semi-ouvert, un seul appel d'essai à la fois"""
+        with self._lock:
+            state = self._state(time.monotonic())
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.consecutive_failures = 0
+            self.opened_at = None
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            self._trial_running = False
+            if self.opened_at is not None or self.consecutive_failures >= self.failure_threshold:
+                # Échec de l'essai ou seuil atteint : la source est écartée pour un nouveau délai
+                self.opened_at = time.monotonic()
+
+
+class SourceHealth:
+    """Latence et taux d'erreur d'une source sur ses `window` derniers appels"""
+
+    def __init__(self, window=50):
+        self.calls = 0
+        self.failures = 0
+        self._recent = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency, ok):
+        with self._lock:
+            self.calls += 1
+            if not ok:
+                self.failures += 1
+            self._recent.append((latency, ok))
+
+    def stats(self):
+        with self._lock:
+            recent = list(self._recent)
+        latencies = sorted(latency for latency, _ in recent)
+        return {
+            'calls': self.calls,
+            'failures': self.failures,
+            'error_rate': sum(1 for _, ok in recent if not ok) / len(recent) if recent else 0.0,
+            'latency_avg': sum(latencies) / len(latencies) if latencies else 0.0,
+            'latency_p95': latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))] if latencies else 0.0,
+        }
+
+
+# Registre des sources
+class SourceRegistry:
+    """Sources enregistrées, avec limitation de débit, suivi de santé et disjoncteur par source"""
+
+    def __init__(self, slow_call_seconds=5.0, failure_threshold=5, cooldown=30.0):
+        self.slow_call_seconds = slow_call_seconds
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._adapters = {}
+        self._health = {}
+        self._breakers = {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def register(self, adapter):
+        """Ajoute (ou remplace) une source"""
+        capabilities = adapter.capabilities
+        with self._lock:
+            self._adapters[adapter.name] = adapter
+            self._health[adapter.name] = SourceHealth()
+            self._breakers[adapter.name] = CircuitBreaker(self.failure_threshold, self.cooldown)
+            self._buckets[adapter.name] = (
+                TokenBucket(capabilities.rate_per_second, capabilities.burst)
+                if capabilities.rate_per_second else None
+            )
+        return adapter
+
+    def unregister(self, name):
+        with self._lock:
+            self._adapters.pop(name, None)
+
+    def get(self, name):
+        return self._adapters[name]
+
+    def __iter__(self):
+        with self._lock:
+            return iter(list(self._adapters.values()))
+
+    def available(self):
+        """Sources dont le disjoncteur laisse passer les appels"""
+        return [adapter for adapter in self if self._breakers[adapter.name].state != CircuitBreaker.OPEN]
+
+    def fetch(self, name, keyword, location, page):
+        """Appelle une source en respectant son débit et met à jour sa santé"""
+        adapter = self._adapters[name]
+        breaker = self._breakers[name]
+        if not breaker.allow():
+            raise ConnectionError(f"Source {name} temporairement désactivée (disjoncteur ouvert)")
+
+        bucket = self._buckets[name]
+        if bucket is not None:
+            wait = bucket.reserve()
+            if wait > 0:
+                time.sleep(wait)
+
+        started = time.monotonic()
+        try:
+            page_jobs = adapter.fetch_page(keyword, location, page)
+        except Exception:
+            self._health[name].record(time.monotonic() - started, False)
+            breaker.record_failure()
+            raise
+
+        latency = time.monotonic() - started
+        # Un appel trop lent compte comme un échec : il retarde toutes les recherches
+        ok = latency <= self.slow_call_seconds
+        self._health[name].record(latency, ok)
+        if ok:
+            breaker.record_success()
+        else:
+            logger.warning("Source %s lente : %.1f s pour la page %s", name, latency, page)
+            breaker.record_failure()
+        return page_jobs
+
+    def health(self):
+        """Statistiques et état du disjoncteur de chaque source"""
+        report = {}
+        for adapter in self:
+            stats = self._health[adapter.name].stats()
+            stats['circuit'] = self._breakers[adapter.name].state
+            report[adapter.name] = stats
+        return report
+
+
+@process_singleton
+def get_source_registry():
+    """Registre des sources partagé par toutes les sessions du processus"""
+    registry = SourceRegistry()
+    registry.register(AdzunaSource())
+    registry.register(HelloWorkSource())
+    return registry
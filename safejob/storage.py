@@ -0,0 +1,814 @@
+"""Stockage persistant SQLite des offres et des utilisateurs"""
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from datetime import datetime, timedelta
+
+from .config import get_setting, process_singleton
+from .dedup import JobDeduplicator
+from .offers import JobOffer
+
+
+# Stockage persistant des offres et des utilisateurs
+class JobStore:
+    """Base SQLite (mode WAL) des offres et des comptes utilisateurs"""
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS offers (
+            offer_id TEXT PRIMARY KEY,
+            source TEXT NOT NULL,
+            title TEXT NOT NULL,
+            company TEXT NOT NULL,
+            location TEXT NOT NULL,
+            description TEXT,
+            url TEXT,
+            date TEXT,
+            salary TEXT,
+            type TEXT,
+            is_remote INTEGER NOT NULL DEFAULT 0,
+            first_seen TEXT NOT NULL,
+            last_seen TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_offers_source ON offers(source);
+        CREATE INDEX IF NOT EXISTS idx_offers_date ON offers(date);
+        CREATE INDEX IF NOT EXISTS idx_offers_company ON offers(company);
+        CREATE INDEX IF NOT EXISTS idx_offers_location ON offers(location);
+
+        CREATE TABLE IF NOT EXISTS users (
+            email TEXT PRIMARY KEY,
+            password_hash TEXT NOT NULL,
+            data TEXT NOT NULL,
+            updated_at TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS search_results (
+            email TEXT NOT NULL,
+            offer_id TEXT NOT NULL,
+            ai_score REAL NOT NULL,
+            rank INTEGER NOT NULL,
+            run_at TEXT NOT NULL,
+            risk_score REAL NOT NULL DEFAULT 0,
+            risk_level TEXT NOT NULL DEFAULT 'low',
+            risk_reasons TEXT NOT NULL DEFAULT '[]',
+            PRIMARY KEY (email, offer_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_search_results_rank ON search_results(email, rank);
+
+        CREATE TABLE IF NOT EXISTS auto_search_runs (
+            email TEXT PRIMARY KEY,
+            last_run TEXT NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS query_offers (
+            source TEXT NOT NULL,
+            keyword TEXT NOT NULL,
+            location TEXT NOT NULL,
+            offer_id TEXT NOT NULL,
+            date TEXT NOT NULL DEFAULT '',
+            first_seen TEXT NOT NULL,
+            PRIMARY KEY (source, keyword, location, offer_id)
+        );
+        CREATE INDEX IF NOT EXISTS idx_query_offers_recent ON query_offers(source, keyword, location, date, first_seen);
+
+        CREATE TABLE IF NOT EXISTS query_watermarks (
+            source TEXT NOT NULL,
+            keyword TEXT NOT NULL,
+            location TEXT NOT NULL,
+            newest_date TEXT NOT NULL,
+            updated_at TEXT NOT NULL,
+            PRIMARY KEY (source, keyword, location)
+        );
+
+        CREATE TABLE IF NOT EXISTS applications (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            email TEXT NOT NULL,
+            offer_id TEXT NOT NULL,
+            company TEXT NOT NULL DEFAULT '',
+            ai_score REAL NOT NULL DEFAULT 0,
+            sent_date TEXT NOT NULL,
+            status TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_applications_email ON applications(email, id);
+        CREATE INDEX IF NOT EXISTS idx_applications_company ON applications(email, company, id);
+        CREATE INDEX IF NOT EXISTS idx_applications_score ON applications(email, ai_score);
+        CREATE INDEX IF NOT EXISTS idx_applications_date ON applications(email, sent_date);
+        CREATE INDEX IF NOT EXISTS idx_applications_offer ON applications(email, offer_id);
+
+        CREATE TABLE IF NOT EXISTS applied_offers (
+            email TEXT NOT NULL,
+            offer_id TEXT NOT NULL,
+            PRIMARY KEY (email, offer_id)
+        ) WITHOUT ROWID;
+
+        CREATE TABLE IF NOT EXISTS application_documents (
+            application_id INTEGER PRIMARY KEY,
+            data BLOB NOT NULL
+        );
+
+        CREATE TABLE IF NOT EXISTS application_stats (
+            email TEXT NOT NULL,
+            dimension TEXT NOT NULL,
+            key TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            score_sum REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (email, dimension, key)
+        );
+        CREATE INDEX IF NOT EXISTS idx_application_stats_count ON application_stats(email, dimension, count);
+
+        CREATE TABLE IF NOT EXISTS application_archive (
+            email TEXT NOT NULL,
+            period TEXT NOT NULL,
+            count INTEGER NOT NULL,
+            data BLOB NOT NULL,
+            PRIMARY KEY (email, period)
+        );
+    """
+
+    APPLICATION_COLUMNS = ('id', 'offer_id', 'company', 'ai_score', 'sent_date', 'status')
+
+    # Tranches de score des statistiques (mêmes bornes que l'affichage)
+    SCORE_BANDS = (('low', 0.6), ('medium', 0.8), ('high', None))
+    OUTCOMES = ('response', 'interview')
+
+    # Données communes à tous les utilisateurs : les scores personnels restent dans
+    # search_results et applications
+    OFFER_COLUMNS = ('offer_id', 'source', 'title', 'company', 'location', 'description',
+                     'url', 'date', 'salary', 'type', 'is_remote')
+
+    # Colonnes ajoutées après la création des premières bases
+    MIGRATED_COLUMNS = {
+        'search_results': (
+            ('risk_score', "REAL NOT NULL DEFAULT 0"),
+            ('risk_level', "TEXT NOT NULL DEFAULT 'low'"),
+            ('risk_reasons', "TEXT NOT NULL DEFAULT '[]'")
+        )
+    }
+
+    ORDERINGS = {
+        'date': 'date DESC',
+        'company': 'company ASC',
+        'last_seen': 'last_seen DESC'
+    }
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        with self._connection() as conn:
+            created = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'applied_offers'"
+            ).fetchone() is None
+            for table, columns in self.MIGRATED_COLUMNS.items():
+                existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+                if existing:
+                    for column, definition in columns:
+                        if column not in existing:
+                            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+            conn.executescript(self.SCHEMA)
+            if created:
+                # Base antérieure à la table : reprise des candidatures non archivées
+                conn.execute("INSERT OR IGNORE INTO applied_offers SELECT DISTINCT email, offer_id FROM applications")
+
+    def _connection(self):
+        """Connexion propre au thread courant (sqlite3 ne partage pas ses connexions)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # --- Offres ---
+
+    def upsert_offers(self, jobs):
+        """Insère ou met à jour un lot d'offres, renvoie le nombre de lignes traitées"""
+        now = datetime.now().isoformat()
+        rows = []
+        for job in jobs:
+            rows.append((
+                job.get('offer_id') or JobDeduplicator.offer_id(job),
+                job.get('source', ''),
+                job.get('title', ''),
+                job.get('company', ''),
+                job.get('location', ''),
+                job.get('description', ''),
+                job.get('url', ''),
+                job.get('date', ''),
+                job.get('salary', ''),
+                job.get('type', ''),
+                1 if job.get('is_remote') else 0,
+                now,
+                now
+            ))
+        if not rows:
+            return 0
+        with self._connection() as conn:
+            conn.executemany("""
+                INSERT INTO offers (offer_id, source, title, company, location, description, url,
+                                    date, salary, type, is_remote, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(offer_id) DO UPDATE SET
+                    title = excluded.title,
+                    company = excluded.company,
+                    location = excluded.location,
+                    description = excluded.description,
+                    url = excluded.url,
+                    date = excluded.date,
+                    salary = excluded.salary,
+                    type = excluded.type,
+                    is_remote = excluded.is_remote,
+                    last_seen = excluded.last_seen
+            """, rows)
+        return len(rows)
+
+    def get_offer(self, offer_id):
+        row = self._connection().execute(
+            "SELECT * FROM offers WHERE offer_id = ?", (offer_id,)
+        ).fetchone()
+        return self._offer_from_row(row) if row else None
+
+    def get_offers(self, offer_ids, chunk_size=500):
+        """Offres demandées, indexées par offer_id (les identifiants inconnus sont ignorés)"""
+        offer_ids = list(offer_ids)
+        offers = {}
+        conn = self._connection()
+        for start in range(0, len(offer_ids), chunk_size):
+            chunk = offer_ids[start:start + chunk_size]
+            placeholders = ', '.join('?' * len(chunk))
+            for row in conn.execute(f"SELECT * FROM offers WHERE offer_id IN ({placeholders})", chunk):
+                offers[row['offer_id']] = self._offer_from_row(row)
+        return offers
+
+    def iter_offers(self, source=None, company=None, location=None, since=None,
+                    order_by='date', limit=None, batch_size=500):
+        """Parcourt les offres filtrées par lots, sans tout charger en mémoire"""
+        where, params = self._offer_filters(source, company, location, since)
+        query = f"SELECT * FROM offers{where} ORDER BY {self.ORDERINGS.get(order_by, self.ORDERINGS['date'])}"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        cursor = self._connection().execute(query, params)
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield self._offer_from_row(row)
+
+    def count_offers(self, source=None, company=None, location=None, since=None):
+        where, params = self._offer_filters(source, company, location, since)
+        return self._connection().execute(f"SELECT COUNT(*) FROM offers{where}", params).fetchone()[0]
+
+    def count_offers_by(self, column, limit=10, **filters):
+        """Décompte des offres par source, entreprise ou lieu"""
+        if column not in ('source', 'company', 'location'):
+            raise ValueError(f"Colonne de regroupement non indexée : {column}")
+        where, params = self._offer_filters(**filters)
+        rows = self._connection().execute(
+            f"SELECT {column}, COUNT(*) AS n FROM offers{where} GROUP BY {column} ORDER BY n DESC LIMIT ?",
+            params + [int(limit)]
+        ).fetchall()
+        return [(row[0], row[1]) for row in rows]
+
+    def _offer_filters(self, source=None, company=None, location=None, since=None):
+        clauses, params = [], []
+        if source:
+            clauses.append("source = ?")
+            params.append(source)
+        if company:
+            clauses.append("company = ?")
+            params.append(company)
+        if location:
+            clauses.append("location = ?")
+            params.append(location)
+        if since:
+            clauses.append("date >= ?")
+            params.append(since)
+        where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+        return where, params
+
+    def _offer_from_row(self, row):
+        # Offre non scorée, comme à la sortie des sources
+        job = JobOffer(**{column: row[column] for column in self.OFFER_COLUMNS}, ai_score=0)
+        job['is_remote'] = bool(job['is_remote'])
+        return job
+
+    # --- Utilisateurs ---
+
+    @staticmethod
+    def _hash_password(password, salt=None):
+        """Hash PBKDF2 salé : les mots de passe ne sont jamais écrits en clair sur le disque"""
+        salt = salt or os.urandom(16).hex()
+        digest = hashlib.pbkdf2_hmac('sha256', password.encode('utf-8'), bytes.fromhex(salt), 100_000)
+        return f"{salt}${digest.hex()}"
+
+    def create_user(self, email, password, user_data):
+        """Crée un compte, renvoie False si l'email existe déjà"""
+        data = {key: value for key, value in user_data.items() if key != 'password'}
+        try:
+            with self._connection() as conn:
+                conn.execute(
+                    "INSERT INTO users (email, password_hash, data, updated_at) VALUES (?, ?, ?, ?)",
+                    (email, self._hash_password(password), json.dumps(data, default=str), datetime.now().isoformat())
+                )
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def save_user(self, email, user_data):
+        """Met à jour les données d'un compte existant"""
+        data = {key: value for key, value in user_data.items() if key != 'password'}
+        with self._connection() as conn:
+            conn.execute(
+                "UPDATE users SET data = ?, updated_at = ? WHERE email = ?",
+                (json.dumps(data, default=str), datetime.now().isoformat(), email)
+            )
+
+    def update_user(self, email, change):
+        """Applique `change(data)` aux données du compte relues en base, sous verrou d'écriture
+
+        À utiliser depuis les threads de fond : les champs que `change` ne touche pas gardent
+        les valeurs enregistrées entre-temps (par l'interface, par exemple). Renvoie False si
+        le compte n'existe pas.
+        """
+        conn = self._connection()
+        with conn:
+            # Verrou pris dès la lecture : deux mises à jour concurrentes ne s'écrasent pas
+            conn.execute("BEGIN IMMEDIATE")
+            row = conn.execute("SELECT data FROM users WHERE email = ?", (email,)).fetchone()
+            if row is None:
+                return False
+            data = json.loads(row['data'])
+            change(data)
+            data.pop('password', None)
+            conn.execute(
+                "UPDATE users SET data = ?, updated_at = ? WHERE email = ?",
+                (json.dumps(data, default=str), datetime.now().isoformat(), email)
+            )
+        return True
+
+    def update_user_stats(self, email, stats):
+        """Fusionne `stats` dans les statistiques (`ai_stats`) d'un compte, sans toucher au reste"""
+        return self.update_user(email, lambda data: data.setdefault('ai_stats', {}).update(stats))
+
+    def authenticate(self, email, password):
+        """Renvoie les données du compte si le mot de passe est correct"""
+        row = self._connection().execute(
+            "SELECT password_hash, data FROM users WHERE email = ?", (email,)
+        ).fetchone()
+        if row is None:
+            return None
+        salt = row['password_hash'].split('$', 1)[0]
+        if self._hash_password(password, salt) != row['password_hash']:
+            return None
+        user_data = json.loads(row['data'])
+        user_data['password'] = password
+        return user_data
+
+    def user_exists(self, email):
+        return self._connection().execute(
+            "SELECT 1 FROM users WHERE email = ?", (email,)
+        ).fetchone() is not None
+
+    def get_user(self, email):
+        row = self._connection().execute("SELECT data FROM users WHERE email = ?", (email,)).fetchone()
+        return json.loads(row['data']) if row else None
+
+    def iter_users(self, batch_size=200):
+        """Parcourt les comptes par lots"""
+        cursor = self._connection().execute("SELECT email, data FROM users ORDER BY email")
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row['email'], json.loads(row['data'])
+
+    def delete_user(self, email):
+        with self._connection() as conn:
+            conn.execute("DELETE FROM users WHERE email = ?", (email,))
+            conn.execute("DELETE FROM search_results WHERE email = ?", (email,))
+            conn.execute("DELETE FROM auto_search_runs WHERE email = ?", (email,))
+        self.delete_applications(email)
+
+    # --- Historique des candidatures ---
+
+    @staticmethod
+    def _pack(data):
+        return zlib.compress(json.dumps(data, ensure_ascii=False, default=str).encode('utf-8'), 6)
+
+    @staticmethod
+    def _unpack(blob):
+        return json.loads(zlib.decompress(blob).decode('utf-8'))
+
+    def add_application(self, email, job, ai_score, application, sent_date, status='sent'):
+        """Enregistre une candidature ; le CV et la lettre sont stockés compressés, à part"""
+        offer_id = job.get('offer_id') or JobDeduplicator.offer_id(job)
+        with self._connection() as conn:
+            cursor = conn.execute("""
+                INSERT INTO applications (email, offer_id, company, ai_score, sent_date, status)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (email, offer_id, job.get('company', '') or '', float(ai_score or 0), sent_date, status))
+            conn.execute("INSERT OR IGNORE INTO applied_offers (email, offer_id) VALUES (?, ?)", (email, offer_id))
+            conn.execute(
+                "INSERT INTO application_documents (application_id, data) VALUES (?, ?)",
+                (cursor.lastrowid, self._pack(application or {}))
+            )
+            self._bump_application_stats(conn, email, [
+                ('total', ''),
+                ('day', str(sent_date)[:10]),
+                ('score_band', self.score_band(ai_score)),
+                ('company', job.get('company', '') or ''),
+                ('source', job.get('source', '') or '')
+            ], float(ai_score or 0))
+        return cursor.lastrowid
+
+    @classmethod
+    def score_band(cls, score):
+        score = float(score or 0)
+        for band, upper in cls.SCORE_BANDS:
+            if upper is None or score < upper:
+                return band
+
+    @staticmethod
+    def _bump_application_stats(conn, email, keys, score, count=1):
+        """Met à jour les compteurs agrégés (une ligne par dimension, en O(1))"""
+        conn.executemany("""
+            INSERT INTO application_stats (email, dimension, key, count, score_sum) VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(email, dimension, key) DO UPDATE SET
+                count = count + excluded.count,
+                score_sum = score_sum + excluded.score_sum
+        """, [(email, dimension, key, count, score * count) for dimension, key in keys])
+
+    def record_application_outcome(self, application_id, outcome):
+        """Enregistre une réponse ou un entretien ; un entretien compte aussi comme réponse"""
+        if outcome not in self.OUTCOMES:
+            raise ValueError(f"Issue inconnue : {outcome}")
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT email, ai_score, status FROM applications WHERE id = ?", (application_id,)
+            ).fetchone()
+            if row is None or row['status'] == outcome or row['status'] == 'interview':
+                return False
+            keys = [('outcome', outcome)]
+            if outcome == 'interview' and row['status'] != 'response':
+                keys.append(('outcome', 'response'))
+            conn.execute("UPDATE applications SET status = ? WHERE id = ?", (outcome, application_id))
+            self._bump_application_stats(conn, row['email'], keys, row['ai_score'])
+        return True
+
+    def get_application_stats(self, email, days=7, top=5):
+        """Agrégats de l'historique : totaux, jours récents, tranches de score, entreprises, sources, issues"""
+        conn = self._connection()
+        rows = conn.execute("""
+            SELECT dimension, key, count, score_sum FROM application_stats
+            WHERE email = ? AND dimension IN ('total', 'score_band', 'source', 'outcome')
+        """, (email,)).fetchall()
+        if not rows and conn.execute("""
+            SELECT 1 FROM applications WHERE email = ? UNION ALL SELECT 1 FROM application_archive WHERE email = ? LIMIT 1
+        """, (email, email)).fetchone():
+            # Historique antérieur aux agrégats : reconstruction unique
+            self.rebuild_application_stats(email)
+            return self.get_application_stats(email, days, top)
+
+        by_dimension = {}
+        for row in rows:
+            by_dimension.setdefault(row['dimension'], {})[row['key']] = (row['count'], row['score_sum'])
+        total, score_sum = by_dimension.get('total', {}).get('', (0, 0.0))
+        outcomes = {key: count for key, (count, _) in by_dimension.get('outcome', {}).items()}
+
+        first_day = (datetime.now().date() - timedelta(days=days - 1)).isoformat()
+        daily = dict(conn.execute("""
+            SELECT key, count FROM application_stats WHERE email = ? AND dimension = 'day' AND key >= ?
+        """, (email, first_day)).fetchall())
+        companies = conn.execute("""
+            SELECT key, count FROM application_stats WHERE email = ? AND dimension = 'company'
+            ORDER BY count DESC, key LIMIT ?
+        """, (email, top)).fetchall()
+
+        return {
+            'total': total,
+            'avg_score': score_sum / total if total else 0.0,
+            'daily': daily,
+            'score_bands': {band: by_dimension.get('score_band', {}).get(band, (0, 0))[0] for band, _ in self.SCORE_BANDS},
+            'top_companies': [(row['key'], row['count']) for row in companies],
+            'sources': {key: count for key, (count, _) in by_dimension.get('source', {}).items()},
+            'responses': outcomes.get('response', 0),
+            'interviews': outcomes.get('interview', 0),
+            'response_rate': outcomes.get('response', 0) / total if total else 0.0,
+            'interview_rate': outcomes.get('interview', 0) / total if total else 0.0,
+        }
+
+    def rebuild_application_stats(self, email):
+        """Recalcule entièrement les agrégats d'un utilisateur (historique actif et archivé)"""
+        records = [dict(row) for row in self._connection().execute("""
+            SELECT applications.ai_score, applications.sent_date, applications.company,
+                   applications.status, COALESCE(offers.source, '') AS source
+            FROM applications LEFT JOIN offers ON offers.offer_id = applications.offer_id
+            WHERE applications.email = ?
+        """, (email,))]
+        archived = list(self.iter_archived_applications(email))
+        sources = self.get_offers({record['offer_id'] for record in archived})
+        for record in archived:
+            record['source'] = sources[record['offer_id']]['source'] if record['offer_id'] in sources else ''
+        records.extend(archived)
+
+        with self._connection() as conn:
+            conn.execute("DELETE FROM application_stats WHERE email = ?", (email,))
+            for record in records:
+                keys = [
+                    ('total', ''),
+                    ('day', str(record['sent_date'])[:10]),
+                    ('score_band', self.score_band(record['ai_score'])),
+                    ('company', record['company'] or ''),
+                    ('source', record['source'] or '')
+                ]
+                if record['status'] in self.OUTCOMES:
+                    keys.append(('outcome', record['status']))
+                if record['status'] == 'interview':
+                    keys.append(('outcome', 'response'))
+                self._bump_application_stats(conn, email, keys, float(record['ai_score'] or 0))
+        return len(records)
+
+    def _application_filters(self, email, company=None, min_score=None, max_score=None, since=None):
+        clauses, params = ["email = ?"], [email]
+        if company:
+            clauses.append("company = ?")
+            params.append(company)
+        if min_score is not None:
+            clauses.append("ai_score >= ?")
+            params.append(float(min_score))
+        if max_score is not None:
+            clauses.append("ai_score < ?")
+            params.append(float(max_score))
+        if since:
+            clauses.append("sent_date >= ?")
+            params.append(since)
+        return clauses, params
+
+    def page_applications(self, email, cursor=None, limit=20, **filters):
+        """Page de l'historique (la plus récente d'abord) et curseur de la page suivante (None en fin)"""
+        clauses, params = self._application_filters(email, **filters)
+        if cursor is not None:
+            clauses.append("id < ?")
+            params.append(int(cursor))
+        rows = self._connection().execute(f"""
+            SELECT {', '.join(self.APPLICATION_COLUMNS)} FROM applications
+            WHERE {' AND '.join(clauses)} ORDER BY id DESC LIMIT ?
+        """, params + [int(limit) + 1]).fetchall()
+        records = [dict(row) for row in rows[:limit]]
+        next_cursor = records[-1]['id'] if len(rows) > limit else None
+        return records, next_cursor
+
+    def count_applications(self, email, include_archived=False, **filters):
+        clauses, params = self._application_filters(email, **filters)
+        conn = self._connection()
+        count = conn.execute(f"SELECT COUNT(*) FROM applications WHERE {' AND '.join(clauses)}", params).fetchone()[0]
+        if include_archived:
+            count += conn.execute(
+                "SELECT COALESCE(SUM(count), 0) FROM application_archive WHERE email = ?", (email,)
+            ).fetchone()[0]
+        return count
+
+    def application_companies(self, email):
+        """Entreprises présentes dans l'historique (parcours de l'index)"""
+        return [row[0] for row in self._connection().execute(
+            "SELECT DISTINCT company FROM applications WHERE email = ? ORDER BY company", (email,)
+        )]
+
+    def applied_offer_ids(self, email, offer_ids):
+        """Parmi les offres données, celles qui ont déjà fait l'objet d'une candidature, même archivée"""
+        offer_ids = [offer_id for offer_id in offer_ids if offer_id]
+        applied = set()
+        conn = self._connection()
+        for start in range(0, len(offer_ids), 500):
+            chunk = offer_ids[start:start + 500]
+            placeholders = ', '.join('?' * len(chunk))
+            applied.update(row[0] for row in conn.execute(
+                f"SELECT offer_id FROM applied_offers WHERE email = ? AND offer_id IN ({placeholders})",
+                [email] + chunk
+            ))
+        return applied
+
+    def get_application_documents(self, application_id):
+        """CV et lettre d'une candidature, décompressés à la demande"""
+        row = self._connection().execute(
+            "SELECT data FROM application_documents WHERE application_id = ?", (application_id,)
+        ).fetchone()
+        return self._unpack(row['data']) if row else None
+
+    def delete_applications(self, email):
+        with self._connection() as conn:
+            conn.execute("""
+                DELETE FROM application_documents
+                WHERE application_id IN (SELECT id FROM applications WHERE email = ?)
+            """, (email,))
+            conn.execute("DELETE FROM applications WHERE email = ?", (email,))
+            conn.execute("DELETE FROM applied_offers WHERE email = ?", (email,))
+            conn.execute("DELETE FROM application_archive WHERE email = ?", (email,))
+            conn.execute("DELETE FROM application_stats WHERE email = ?", (email,))
+
+    def archive_applications(self, before, email=None):
+        """Compacte les candidatures envoyées avant `before` en un bloc compressé par utilisateur et par mois
+
+        Les offres concernées restent dans `applied_offers` : elles ne seront pas candidatées à nouveau.
+        Renvoie le nombre de candidatures archivées.
+        """
+        clauses, params = ["applications.sent_date < ?"], [before]
+        if email is not None:
+            clauses.append("applications.email = ?")
+            params.append(email)
+        with self._connection() as conn:
+            rows = conn.execute(f"""
+                SELECT applications.*, application_documents.data AS documents
+                FROM applications LEFT JOIN application_documents
+                    ON application_documents.application_id = applications.id
+                WHERE {' AND '.join(clauses)} ORDER BY applications.id
+            """, params).fetchall()
+            if not rows:
+                return 0
+
+            batches = {}
+            for row in rows:
+                record = {column: row[column] for column in self.APPLICATION_COLUMNS}
+                record['application'] = self._unpack(row['documents']) if row['documents'] else None
+                batches.setdefault((row['email'], row['sent_date'][:7]), []).append(record)
+
+            for (owner, period), records in batches.items():
+                existing = conn.execute(
+                    "SELECT data FROM application_archive WHERE email = ? AND period = ?", (owner, period)
+                ).fetchone()
+                if existing is not None:
+                    records = self._unpack(existing['data']) + records
+                conn.execute("""
+                    INSERT INTO application_archive (email, period, count, data) VALUES (?, ?, ?, ?)
+                    ON CONFLICT(email, period) DO UPDATE SET count = excluded.count, data = excluded.data
+                """, (owner, period, len(records), self._pack(records)))
+
+            ids = [(row['id'],) for row in rows]
+            conn.executemany("DELETE FROM application_documents WHERE application_id = ?", ids)
+            conn.executemany("DELETE FROM applications WHERE id = ?", ids)
+        return len(rows)
+
+    def iter_archived_applications(self, email):
+        """Candidatures archivées d'un utilisateur, mois par mois (du plus récent au plus ancien)"""
+        rows = self._connection().execute(
+            "SELECT period, data FROM application_archive WHERE email = ? ORDER BY period DESC", (email,)
+        )
+        for row in rows:
+            yield from reversed(self._unpack(row['data']))
+
+    # --- Recherches incrémentales ---
+
+    def get_query_watermark(self, source, keyword, location):
+        """Date de publication la plus récente déjà vue pour la requête, ou None"""
+        row = self._connection().execute(
+            "SELECT newest_date FROM query_watermarks WHERE source = ? AND keyword = ? AND location = ?",
+            (source, keyword, location)
+        ).fetchone()
+        return row[0] if row else None
+
+    def known_query_offers(self, source, keyword, location, offer_ids, chunk_size=500):
+        """Identifiants déjà enregistrés pour la requête, parmi ceux donnés"""
+        offer_ids = list(offer_ids)
+        known = set()
+        conn = self._connection()
+        for start in range(0, len(offer_ids), chunk_size):
+            chunk = offer_ids[start:start + chunk_size]
+            placeholders = ', '.join('?' * len(chunk))
+            known.update(row[0] for row in conn.execute(
+                f"SELECT offer_id FROM query_offers WHERE source = ? AND keyword = ? AND location = ? "
+                f"AND offer_id IN ({placeholders})",
+                [source, keyword, location] + chunk
+            ))
+        return known
+
+    def merge_query_offers(self, source, keyword, location, jobs, newest_date=None, keep=1000, seen_at=None):
+        """Ajoute les nouvelles offres d'une requête et avance son point de reprise
+
+        `seen_at` (par défaut maintenant) date la première apparition des offres : chaque utilisateur
+        en déduit celles arrivées depuis son propre dernier passage. Seules les `keep` offres les plus
+        récentes de la requête sont conservées.
+        """
+        self.upsert_offers(jobs)
+        now = seen_at or datetime.now().isoformat()
+        rows = [
+            (source, keyword, location, job.get('offer_id') or JobDeduplicator.offer_id(job), job.get('date') or '', now)
+            for job in jobs
+        ]
+        with self._connection() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO query_offers (source, keyword, location, offer_id, date, first_seen) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            if newest_date:
+                conn.execute("""
+                    INSERT INTO query_watermarks (source, keyword, location, newest_date, updated_at)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(source, keyword, location) DO UPDATE SET
+                        newest_date = MAX(newest_date, excluded.newest_date),
+                        updated_at = excluded.updated_at
+                """, (source, keyword, location, newest_date, now))
+            conn.execute("""
+                DELETE FROM query_offers WHERE rowid IN (
+                    SELECT rowid FROM query_offers WHERE source = ? AND keyword = ? AND location = ?
+                    ORDER BY date DESC, first_seen DESC LIMIT -1 OFFSET ?
+                )
+            """, (source, keyword, location, int(keep)))
+        return len(rows)
+
+    def get_query_offers(self, source, keyword, location, limit=None, seen_after=None):
+        """Offres enregistrées d'une requête, des plus récentes aux plus anciennes
+
+        Avec `seen_after`, seules les offres apparues après cette date sont renvoyées.
+        """
+        query = """
+            SELECT offers.* FROM query_offers JOIN offers ON offers.offer_id = query_offers.offer_id
+            WHERE query_offers.source = ? AND query_offers.keyword = ? AND query_offers.location = ?
+        """
+        params = [source, keyword, location]
+        if seen_after:
+            query += " AND query_offers.first_seen > ?"
+            params.append(seen_after)
+        query += " ORDER BY query_offers.date DESC, query_offers.first_seen DESC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        return [self._offer_from_row(row) for row in self._connection().execute(query, params)]
+
+    # --- Recherches automatiques ---
+
+    def iter_auto_search_users(self):
+        """Comptes ayant activé la recherche automatique, avec leur dernière exécution"""
+        cursor = self._connection().execute("""
+            SELECT users.email, users.data, auto_search_runs.last_run
+            FROM users LEFT JOIN auto_search_runs ON auto_search_runs.email = users.email
+            WHERE json_extract(users.data, '$.ai_settings.auto_search_enabled') = 1
+        """)
+        for row in cursor:
+            yield row['email'], json.loads(row['data']), row['last_run']
+
+    def get_last_auto_search(self, email):
+        """Date de la dernière recherche automatique d'un utilisateur, ou None"""
+        row = self._connection().execute(
+            "SELECT last_run FROM auto_search_runs WHERE email = ?", (email,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def save_search_results(self, email, jobs, run_at):
+        """Remplace les résultats précalculés d'un utilisateur, avec leur score et leur risque"""
+        self.upsert_offers(jobs)
+        rows = [
+            (
+                email, job.get('offer_id') or JobDeduplicator.offer_id(job), float(job.get('ai_score', 0) or 0),
+                rank, run_at, float(job.get('risk_score', 0) or 0), job.get('risk_level') or 'low',
+                json.dumps(list(job.get('risk_reasons') or []), ensure_ascii=False)
+            )
+            for rank, job in enumerate(jobs)
+        ]
+        with self._connection() as conn:
+            conn.execute("DELETE FROM search_results WHERE email = ?", (email,))
+            conn.executemany("""
+                INSERT OR REPLACE INTO search_results
+                    (email, offer_id, ai_score, rank, run_at, risk_score, risk_level, risk_reasons)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+            conn.execute(
+                "INSERT INTO auto_search_runs (email, last_run) VALUES (?, ?) "
+                "ON CONFLICT(email) DO UPDATE SET last_run = excluded.last_run",
+                (email, run_at)
+            )
+
+    def get_search_results(self, email, limit=None):
+        """Résultats précalculés d'un utilisateur, dans l'ordre du classement"""
+        query = """
+            SELECT offers.*, search_results.ai_score AS user_score, search_results.run_at,
+                   search_results.risk_score, search_results.risk_level, search_results.risk_reasons
+            FROM search_results JOIN offers ON offers.offer_id = search_results.offer_id
+            WHERE search_results.email = ? ORDER BY search_results.rank
+        """
+        params = [email]
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(int(limit))
+        jobs = []
+        for row in self._connection().execute(query, params):
+            job = self._offer_from_row(row)
+            job['ai_score'] = row['user_score']
+            job['risk_score'] = row['risk_score']
+            job['risk_level'] = row['risk_level']
+            job['risk_reasons'] = json.loads(row['risk_reasons'])
+            job['run_at'] = row['run_at']
+            jobs.append(job)
+        return jobs
+
+
+@process_singleton
+def get_job_store():
+    """Base persistante partagée par toutes les sessions du processus"""
+    return JobStore(get_setting("SAFE_JOB_DB_PATH", "safe_job_hub.db"))
@@ -0,0 +1,45 @@
+"""Gabarits de documents précompilés"""
+from string import Formatter
+
+
+# Gabarit compilé
+class DocumentTemplate:
+    """Gabarit à champs `{nom}` découpé une seule fois en segments littéraux et champs
+
+    `bind` remplit une partie des champs (par exemple ceux du profil) et renvoie un gabarit
+    plus court, réutilisable pour chaque offre ; `render` ne fait plus qu'une concaténation.
+    """
+
+    __slots__ = ('segments', 'fields')
+
+    def __init__(self, text=None, segments=None):
+        if segments is None:
+            segments = []
+            for literal, field, _, _ in Formatter().parse(text):
+                if literal:
+                    segments.append((False, literal))
+                if field is not None:
+                    segments.append((True, field))
+        self.segments = self._merge(segments)
+        self.fields = frozenset(value for is_field, value in self.segments if is_field)
+
+    @staticmethod
+    def _merge(segments):
+        """Fusionne les littéraux consécutifs"""
+        merged = []
+        for is_field, value in segments:
+            if not is_field and merged and not merged[-1][0]:
+                merged[-1] = (False, merged[-1][1] + value)
+            else:
+                merged.append((is_field, value))
+        return tuple(merged)
+
+    def bind(self, **values):
+        """Gabarit partiel où les champs fournis sont remplacés par leur valeur"""
+        return DocumentTemplate(segments=[
+            (False, str(values[value])) if is_field and value in values else (is_field, value)
+            for is_field, value in self.segments
+        ])
+
+    def render(self, **values):
+        return ''.join(str(values[value]) if is_field else value for is_field, value in self.segments)
@@ -0,0 +1,87 @@
+"""Sources simulées et objets isolés partagés par les tests"""
+import threading
+import time
+
+import pytest
+
+from safejob.cache import TTLLRUCache
+from safejob.fetch import JobFetchEngine
+from safejob.offers import JobOffer
+from safejob.reputation import ReputationIndex
+from safejob.search import AutoJobSearchAI
+from safejob.sources import JobSourceAdapter, SourceCapabilities, SourceRegistry
+from safejob.storage import JobStore
+
+
+class FakeSource(JobSourceAdapter):
+    """Source en mémoire : `offers` est servie par pages, de la plus récente à la plus ancienne"""
+
+    def __init__(self, name='Fake', offers=None, page_size=10, max_pages=5, delay=0.0, error=None,
+                 date_sorted=True):
+        self.name = name
+        self.capabilities = SourceCapabilities(
+            paging=True, max_pages=max_pages, page_size=page_size, max_concurrency=4,
+            rate_per_second=None, burst=1, date_sorted=date_sorted
+        )
+        self.offers = list(offers or [])
+        self.delay = delay
+        self.error = error
+        self.calls = []
+        self._lock = threading.Lock()
+
+    def fetch_page(self, keyword, location, page):
+        with self._lock:
+            self.calls.append((keyword, location, page))
+        if self.delay:
+            time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        size = self.capabilities.page_size
+        return [offer.copy() for offer in self.offers[(page - 1) * size:page * size]]
+
+
+def make_offer(number, keyword='vente', source='Fake', date=None, **fields):
+    """Offre commerciale compatible avec un profil « vente » (score 0.9 pour un profil confirmé)"""
+    values = dict(
+        title=f"Commercial {keyword} {number}",
+        company=f"Entreprise {number}",
+        location="Paris",
+        description="Vente et prospection auprès des clients, négociation des contrats.",
+        url=f"https://emploi.example.fr/{keyword}/{number}",
+        date=date or f"2026-10-{1 + number // 10:02d}T{number % 10:02d}:00:00Z",
+        salary="35000-42000€",
+        type="CDI",
+        source=source,
+        is_remote=False,
+        ai_score=0
+    )
+    values.update(fields)
+    return JobOffer(**values)
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / 'jobs.db'))
+
+
+@pytest.fixture
+def make_search():
+    """Fabrique de moteurs de recherche isolés (moteur de récupération, cache et réputation propres)"""
+    engines = []
+
+    def factory(*sources, cache=None, engine=None, **options):
+        registry = SourceRegistry()
+        for source in sources:
+            registry.register(source)
+        if engine is None:
+            engine = JobFetchEngine(max_workers=8, deadline=5.0)
+            engines.append(engine)
+        options.setdefault('reputation_index', ReputationIndex())
+        return AutoJobSearchAI(
+            fetch_engine=engine, sources=registry,
+            search_cache=cache if cache is not None else TTLLRUCache(ttl=0), **options
+        )
+
+    yield factory
+    for engine in engines:
+        engine._executor.shutdown(wait=False)
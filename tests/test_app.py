@@ -0,0 +1,59 @@
+import os
+
+import pytest
+
+pytest.importorskip('streamlit')
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import safejob.scheduler
+import safejob.storage
+from conftest import make_offer
+from safejob.search import AutoJobSearchAI
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'app.py')
+
+
+@pytest.fixture
+def searches(store, monkeypatch):
+    """Recherches lancées par l'application, sans réseau ni planificateur"""
+    calls = []
+
+    def search(self, user_criteria, location="", top_k=None, needed=None):
+        calls.append(list(user_criteria['keywords']))
+        return [make_offer(n, ai_score=0.9) for n in range(3)]
+
+    monkeypatch.setattr(safejob.storage, 'get_job_store', lambda: store)
+    monkeypatch.setattr(safejob.scheduler, 'get_auto_search_scheduler', lambda: None)
+    monkeypatch.setattr(AutoJobSearchAI, 'intelligent_job_search', search)
+    st.cache_data.clear()
+    yield calls
+    st.cache_data.clear()
+
+
+def logged_in_app():
+    app = AppTest.from_file(APP_PATH, default_timeout=60)
+    app.run()
+    app.session_state.logged_in = True
+    app.session_state.current_user = "demo@example.com"
+    return app
+
+
+def test_reruns_reuse_the_search_until_the_profile_changes(searches, store):
+    app = logged_in_app()
+    app.run()
+    app.run()
+
+    assert not app.exception
+    assert len(searches) == 1
+    assert store.count_offers() == 3
+
+    app.session_state.users_db["demo@example.com"]["skills"].append("Python")
+    app.run()
+    assert len(searches) == 2
+
+    app.session_state.users_db["demo@example.com"]["ai_settings"]["ranking_mode"] = 'bm25'
+    app.run()
+    app.run()
+    assert len(searches) == 3
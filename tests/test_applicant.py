@@ -0,0 +1,142 @@
+import threading
+
+import pytest
+
+from safejob.applicant import ApplicationDispatchQueue, AutoApplicantAI
+
+from conftest import make_offer
+
+PROFILE = {'name': "Camille Martin", 'experience': "Trois ans de vente", 'skills': ['vente']}
+CRITERIA = {'keywords': ['vente'], 'experience_level': 'confirmé', 'compatibility_threshold': 0.6}
+
+
+class FakeApplicant(AutoApplicantAI):
+    """Envoi instantané, refusé pour les `failures` premières tentatives"""
+
+    def __init__(self, store, failures=0):
+        super().__init__(store=store)
+        self.failures = failures
+        self.sent = []
+
+    def _send_application(self, job, application):
+        if self.failures:
+            self.failures -= 1
+            return False
+        self.sent.append(job['offer_id'])
+        return True
+
+
+@pytest.fixture
+def make_queue(store):
+    def factory(applicant=None, **options):
+        options.setdefault('rate_per_destination', 1000.0)
+        options.setdefault('retry_backoff', 0.0)
+        return ApplicationDispatchQueue(applicant or FakeApplicant(store), workers=2, **options)
+    return factory
+
+
+def offers(count):
+    jobs = [make_offer(n) for n in range(count)]
+    for job in jobs:
+        job['offer_id'] = f"offre-{job['title']}"
+    return jobs
+
+
+def test_enqueue_is_idempotent_and_respects_the_daily_limit(store, make_queue):
+    dispatch = make_queue()
+    jobs = offers(5)
+
+    assert len(dispatch.enqueue(jobs, dict(PROFILE), CRITERIA, 'a@example.fr', daily_limit=3)) == 3
+    assert dispatch.enqueue(jobs, dict(PROFILE), CRITERIA, 'a@example.fr', daily_limit=3) == []
+    dispatch._queue.join()
+
+    assert sorted(dispatch.applicant.sent) == sorted(job['offer_id'] for job in jobs[:3])
+    assert store.count_applications('a@example.fr') == 3
+    assert {ticket['status'] for ticket in dispatch.status('a@example.fr')} == {'sent'}
+    # Avec une limite plus haute, seules les offres pas encore candidatées partent
+    assert len(dispatch.enqueue(jobs, dict(PROFILE), CRITERIA, 'a@example.fr', daily_limit=10)) == 2
+    dispatch._queue.join()
+    assert store.count_applications('a@example.fr') == 5
+
+
+def test_refused_sends_are_retried_then_marked_failed(store, make_queue):
+    dispatch = make_queue(FakeApplicant(store, failures=2), max_attempts=3)
+    dispatch.enqueue(offers(1), dict(PROFILE), CRITERIA, 'a@example.fr')
+    dispatch._queue.join()
+    [ticket] = dispatch.status()
+    assert (ticket['status'], ticket['attempts']) == ('sent', 3)
+
+    dispatch = make_queue(FakeApplicant(store, failures=5), max_attempts=2)
+    dispatch.enqueue(offers(2)[1:], dict(PROFILE), CRITERIA, 'b@example.fr')
+    dispatch._queue.join()
+    [ticket] = dispatch.status()
+    assert (ticket['status'], ticket['attempts'], ticket['error']) == ('failed', 2, "Envoi refusé")
+
+
+def test_history_write_does_not_block_the_queue(store, make_queue):
+    release = threading.Event()
+    recording = threading.Event()
+
+    class SlowRecorder(FakeApplicant):
+        def _record_application(self, *args):
+            recording.set()
+            assert release.wait(5)
+            return super()._record_application(*args)
+
+    dispatch = make_queue(SlowRecorder(store))
+    dispatch.enqueue(offers(1), dict(PROFILE), CRITERIA, 'a@example.fr')
+    assert recording.wait(5)
+    # Lecture de statut et nouvelle soumission pendant l'écriture en base
+    assert dispatch.status()[0]['status'] == 'sending'
+    assert len(dispatch.enqueue(offers(2)[1:], dict(PROFILE), CRITERIA, 'b@example.fr')) == 1
+    release.set()
+    dispatch._queue.join()
+    assert store.count_applications('a@example.fr') == 1
+
+
+def test_finished_tickets_are_pruned_after_their_ttl(store, make_queue):
+    dispatch = make_queue(ticket_ttl=0.0)
+    dispatch.enqueue(offers(2), dict(PROFILE), CRITERIA, 'a@example.fr')
+    dispatch._queue.join()
+
+    assert dispatch.status() == []
+    assert dispatch._tickets == {} and dispatch._buckets == {}
+    # L'idempotence repose alors sur l'historique en base
+    assert dispatch.enqueue(offers(2), dict(PROFILE), CRITERIA, 'a@example.fr') == []
+
+
+def test_archived_applications_are_not_sent_again(store, make_queue):
+    dispatch = make_queue(ticket_ttl=0.0)
+    dispatch.enqueue(offers(1), dict(PROFILE), CRITERIA, 'a@example.fr')
+    dispatch._queue.join()
+
+    assert store.archive_applications('2999-01-01') == 1
+    assert dispatch.enqueue(offers(1), dict(PROFILE), CRITERIA, 'a@example.fr') == []
+    dispatch._queue.join()
+    assert store.count_applications('a@example.fr', include_archived=True) == 1
+
+
+def test_destination_is_the_employer_before_the_host():
+    adzuna = "https://www.adzuna.fr/land/ad/{}"
+    first = make_offer(1, company="Boulangerie Dupont", url=adzuna.format(1))
+    second = make_offer(2, company="Garage Martin", url=adzuna.format(2))
+    same_employer = make_offer(3, company="boulangerie  DUPONT", url="https://dupont.fr/emploi")
+    anonymous = make_offer(4, company="", url=adzuna.format(4))
+
+    destination = ApplicationDispatchQueue.destination
+    assert destination(first) != destination(second)
+    assert destination(first) == destination(same_employer)
+    assert destination(anonymous) == "host:www.adzuna.fr"
+
+
+def test_auto_apply_requires_an_applicant_email(store):
+    applicant = FakeApplicant(store)
+    with pytest.raises(ValueError, match="e-mail"):
+        applicant.auto_apply_to_jobs(offers(2), dict(PROFILE), CRITERIA)
+    assert applicant.sent == []
+
+    records = applicant.auto_apply_to_jobs(offers(2), dict(PROFILE), CRITERIA, user_email='a@example.fr')
+    assert [record['status'] for record in records] == ['sent', 'sent']
+    records = applicant.auto_apply_to_jobs(offers(3)[2:], dict(PROFILE, email='b@example.fr'), CRITERIA)
+    assert store.count_applications('b@example.fr') == 1
+    assert store.get_application_documents(records[0]['id'])['company'] == "Entreprise 2"
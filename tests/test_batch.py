@@ -0,0 +1,81 @@
+import json
+
+import pytest
+
+from conftest import FakeSource, make_offer
+from safejob import batch
+from safejob.batch import BatchRunner, load_profiles, main
+
+PROFILES = [
+    {'email': 'a@example.fr', 'name': "Camille", 'experience': "Trois ans de vente", 'skills': ['vente', 'prospection']},
+    {'email': 'b@example.fr', 'name': "Alex", 'experience': "Deux ans de vente en boutique", 'skills': ['vente'],
+     'ai_settings': {'daily_application_limit': 2}},
+]
+
+
+@pytest.fixture
+def source(make_search, monkeypatch):
+    """Source simulée servie à toutes les recherches du module batch"""
+    source = FakeSource(offers=[make_offer(n) for n in range(6)], max_pages=1)
+    monkeypatch.setattr(batch, 'AutoJobSearchAI', lambda **options: make_search(source, **options))
+    return source
+
+
+def test_profiles_load_from_jsonl_and_csv(tmp_path):
+    jsonl = tmp_path / 'profils.jsonl'
+    jsonl.write_text(json.dumps(PROFILES[0]) + '\n\npas du json\n{"name": "Sans email"}\n', encoding='utf-8')
+    csv_path = tmp_path / 'profils.csv'
+    csv_path.write_text(
+        'email,name,experience,skills,ai_settings\n'
+        'b@example.fr,Alex,Deux ans de vente,"vente; négociation ,",'
+        '"{""ranking_mode"": ""bm25""}"\n',
+        encoding='utf-8'
+    )
+
+    assert load_profiles(str(jsonl)) == [PROFILES[0]]
+    [profile] = load_profiles(str(csv_path))
+    assert profile['skills'] == ['vente', 'négociation']
+    assert profile['ai_settings'] == {'ranking_mode': 'bm25'}
+
+
+def test_each_keyword_is_fetched_once_for_the_whole_batch(source, store):
+    records = {record['email']: record for record in BatchRunner(workers=2, store=store).run(PROFILES)}
+
+    # Les deux profils partagent leurs mots-clés : une page par mot-clé, pas par profil
+    assert len(source.calls) == len({keyword for keyword, _, _ in source.calls})
+    assert set(records) == {'a@example.fr', 'b@example.fr'}
+    assert all(len(record['jobs']) == 6 for record in records.values())
+    assert records['a@example.fr']['main_domain'] == 'commercial'
+    assert len(store.get_search_results('b@example.fr')) == 6
+
+
+def test_a_failing_profile_is_reported_without_stopping_the_batch(source, monkeypatch):
+    process = BatchRunner._process
+
+    def fail_for_a(self, profile, criteria, jobs_by_query):
+        if profile['email'] == 'a@example.fr':
+            raise ValueError("profil invalide")
+        return process(self, profile, criteria, jobs_by_query)
+
+    monkeypatch.setattr(BatchRunner, '_process', fail_for_a)
+
+    records = {record['email']: record for record in BatchRunner().run(PROFILES)}
+
+    assert records['a@example.fr'] == {'email': 'a@example.fr', 'error': "ValueError: profil invalide"}
+    assert len(records['b@example.fr']['jobs']) == 6
+
+
+def test_cli_writes_jsonl_with_generated_applications(source, tmp_path):
+    profiles = tmp_path / 'profils.jsonl'
+    profiles.write_text(''.join(json.dumps(profile) + '\n' for profile in PROFILES), encoding='utf-8')
+    output = tmp_path / 'resultats.jsonl'
+
+    assert main([str(profiles), '-o', str(output), '--generate', '--top-k', '3']) == 0
+
+    records = {record['email']: record for record in map(json.loads, output.read_text(encoding='utf-8').splitlines())}
+    assert [len(records[email]['jobs']) for email in ('a@example.fr', 'b@example.fr')] == [3, 3]
+    # Limite quotidienne par défaut (5) bornée par le top-k, puis limite du profil
+    assert [len(records[email]['applications']) for email in ('a@example.fr', 'b@example.fr')] == [3, 2]
+    application = records['b@example.fr']['applications'][0]
+    assert application['offer_id'] == records['b@example.fr']['jobs'][0]['offer_id']
+    assert "Commercial vente" in application['cv'] and application['cover_letter']
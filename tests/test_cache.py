@@ -0,0 +1,70 @@
+import threading
+
+from conftest import FakeSource, make_offer
+from safejob import cache as cache_module
+from safejob.cache import TTLLRUCache
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+def test_entries_expire_after_ttl(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_module.time, 'monotonic', clock.monotonic)
+    cache = TTLLRUCache(ttl=60)
+    cache.set('clé', 'page')
+
+    clock.now += 59
+    assert cache.get('clé') == 'page'
+    clock.now += 1
+    assert cache.get('clé', 'absent') == 'absent'
+    stats = cache.stats()
+    assert (stats['size'], stats['hits'], stats['misses'], stats['expirations']) == (0, 1, 1, 1)
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = TTLLRUCache(maxsize=2)
+    cache.set('a', 1)
+    cache.set('b', 2)
+    cache.get('a')
+    cache.set('c', 3)
+
+    assert (cache.get('a'), cache.get('b'), cache.get('c')) == (1, None, 3)
+    assert cache.stats()['evictions'] == 1
+
+
+def test_concurrent_writers_keep_the_bound():
+    cache = TTLLRUCache(maxsize=50)
+
+    def fill(offset):
+        for number in range(200):
+            cache.set((offset, number), number)
+            cache.get((offset, number - 1))
+
+    threads = [threading.Thread(target=fill, args=(offset,)) for offset in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats = cache.stats()
+    assert stats['size'] == 50
+    assert stats['evictions'] == 8 * 200 - 50
+
+
+def test_search_pages_are_served_from_cache_with_normalised_keys(make_search):
+    source = FakeSource(offers=[make_offer(n) for n in range(5)], max_pages=1)
+    search_ai = make_search(source, cache=TTLLRUCache())
+    criteria = {'keywords': ['Vente'], 'experience_level': 'confirmé', 'compatibility_threshold': 0.6}
+
+    first = search_ai.intelligent_job_search(criteria, location="Paris")
+    second = search_ai.intelligent_job_search(dict(criteria, keywords=[' vente ']), location=" paris")
+
+    assert len(source.calls) == 1
+    assert search_ai.last_fetch_report['cache_hits'] == 1
+    assert [job['offer_id'] for job in first] == [job['offer_id'] for job in second]
@@ -0,0 +1,105 @@
+import json
+
+import numpy as np
+
+from conftest import FakeSource, make_offer
+from safejob.classifier import (
+    SAMPLE_TRAINING_PATH, ScamClassifier, get_scam_classifier, holdout_split, load_labelled_offers, main
+)
+
+SCAM = {
+    'title': "Travail urgent à domicile",
+    'description': "Argent facile : réglez les frais d'inscription par Western Union pour recevoir votre contrat."
+}
+
+
+# Offres légitimes proches du vocabulaire des arnaques (domicile, télétravail, recrutement)
+LEGITIMATE = [
+    make_offer(1, title="Téléconseiller en télétravail",
+               description="Centre de relation client : traitement des appels entrants, vente et conseil. "
+                           "Télétravail après trois semaines de formation rémunérée.", is_remote=True),
+    make_offer(2, title="Agent de recrutement à domicile",
+               description="Cabinet de recrutement : sourcing et qualification de candidats, entretiens "
+                           "téléphoniques, vente de nos prestations aux clients. Travail à domicile."),
+    make_offer(3, title="Aide à domicile",
+               description="Accompagnement de personnes âgées : courses, repas, entretien du logement. "
+                           "Vente et conseil auprès des clients de l'agence, planning stable.", type="CDI"),
+]
+
+
+def test_classifier_is_off_without_a_configured_model(monkeypatch, make_search):
+    monkeypatch.delenv('SCAM_MODEL_PATH', raising=False)
+    classifier = get_scam_classifier.__wrapped__()
+    assert classifier is None
+
+    criteria = {'keywords': ['vente', 'client'], 'experience_level': 'confirmé', 'compatibility_threshold': 0.1}
+    jobs = make_search(FakeSource(offers=LEGITIMATE), scam_classifier=classifier).intelligent_job_search(criteria)
+
+    assert sorted(job['title'] for job in jobs) == sorted(offer['title'] for offer in LEGITIMATE)
+    assert all(job['ai_score'] > 0 and job['risk_level'] != 'high' for job in jobs)
+
+
+def test_model_without_holdout_evaluation_is_refused(tmp_path, monkeypatch):
+    path = str(tmp_path / 'model.npy')
+    offers, labels = load_labelled_offers(SAMPLE_TRAINING_PATH)
+    ScamClassifier.train(offers, labels, n_features=1024, epochs=50).save(path, training_accuracy=1.0)
+    monkeypatch.setenv('SCAM_MODEL_PATH', path)
+
+    assert get_scam_classifier.__wrapped__() is None
+
+
+def test_model_below_holdout_accuracy_is_refused(tmp_path, monkeypatch):
+    path = str(tmp_path / 'model.npy')
+    assert main([SAMPLE_TRAINING_PATH, '-o', path, '--features', '1024', '--epochs', '50']) == 0
+    monkeypatch.setenv('SCAM_MODEL_PATH', path)
+    accuracy = json.loads((tmp_path / 'model.json').read_text(encoding='utf-8'))['holdout_accuracy']
+
+    monkeypatch.setenv('SCAM_MODEL_MIN_ACCURACY', str(accuracy + 0.01))
+    assert get_scam_classifier.__wrapped__() is None
+    monkeypatch.setenv('SCAM_MODEL_MIN_ACCURACY', str(accuracy))
+    assert get_scam_classifier.__wrapped__().metadata['holdout_accuracy'] == accuracy
+
+
+def test_holdout_split_keeps_both_classes_out_of_training():
+    labels = [0] * 8 + [1] * 4
+    training, holdout = holdout_split(labels, 0.25, seed=3)
+
+    assert sorted(training + holdout) == list(range(12))
+    assert sorted(labels[index] for index in holdout) == [0, 0, 1]
+    assert holdout_split(labels, 0.25, seed=3) == (training, holdout)
+
+
+def test_memo_is_keyed_on_text_digest_and_bounded(monkeypatch):
+    classifier = ScamClassifier(np.zeros(65, dtype=np.float32))
+    monkeypatch.setattr(ScamClassifier, 'MEMO_SIZE', 3)
+    long_offer = dict(SCAM, description=SCAM['description'] * 200)
+
+    first = classifier.predict_proba([long_offer, make_offer(1)])
+    # Même texte sous un autre type (dict ou JobOffer) : même empreinte, pas de nouvelle entrée
+    again = classifier.predict_proba([dict(long_offer), make_offer(1).to_dict()])
+    assert first.tolist() == again.tolist() == [0.5, 0.5]
+    assert len(classifier._memo) == 2
+    assert all(isinstance(key, bytes) and len(key) == 20 for key in classifier._memo)
+
+    classifier.predict_proba([make_offer(number) for number in range(2, 6)])
+    assert len(classifier._memo) == 3
+
+
+def test_training_cli_round_trip(tmp_path):
+    output = tmp_path / 'model.npy'
+    assert main([SAMPLE_TRAINING_PATH, '-o', str(output), '--features', '1024', '--epochs', '50']) == 0
+
+    trained = ScamClassifier.load(str(output))
+    assert trained.vectorizer.n_features == 1024
+    assert trained.metadata['holdout_samples'] == 12
+    assert trained.metadata['samples'] == 36
+    assert isinstance(trained.weights, np.memmap)
+    assert trained.predict_proba([SCAM])[0] > trained.predict_proba([make_offer(1)])[0]
+
+
+def test_training_requires_both_classes(tmp_path):
+    training = tmp_path / 'offres.jsonl'
+    training.write_text('{"title": "Commercial", "description": "Vente", "is_scam": 0}\nnot json\n', encoding='utf-8')
+
+    assert main([str(training), '-o', str(tmp_path / 'model.npy')]) == 1
+    assert load_labelled_offers(str(training)) == ([{'title': 'Commercial', 'description': 'Vente', 'is_scam': 0}], [0])
@@ -0,0 +1,66 @@
+from conftest import make_offer
+from safejob.dedup import JobDeduplicator
+
+DESCRIPTION = (
+    "Vous développez un portefeuille de clients professionnels, assurez la prospection et la négociation "
+    "des contrats dans toute la région Île-de-France. CDI, véhicule de fonction, fixe et variable "
+    "attractifs, mutuelle et tickets restaurant."
+)
+
+
+def reposted(number, source, title, description=DESCRIPTION, location="Paris"):
+    """Annonce republiée sur une autre source : autre URL, lieu ou description légèrement différents"""
+    return make_offer(
+        number, source=source, title=title, company="Martin SA", location=location, description=description,
+        url=f"https://{source.lower()}.example.fr/offres/{number}"
+    )
+
+
+def test_urls_are_normalised_before_comparison():
+    assert JobDeduplicator.normalize_url(
+        "HTTPS://www.Emploi.example.fr/vente/12/?utm_source=mail&ref=x&b=2&a=1#apply"
+    ) == "https://emploi.example.fr/vente/12?a=1&b=2"
+
+    deduplicator = JobDeduplicator()
+    jobs = [
+        make_offer(1, url="https://emploi.example.fr/vente/1?utm_campaign=alerte"),
+        make_offer(1, title="Autre intitulé", url="https://www.emploi.example.fr/vente/1/"),
+    ]
+    assert len(deduplicator.deduplicate(jobs)) == 1
+    assert deduplicator.duplicates_dropped == 1
+
+
+def test_same_title_company_and_location_across_sources_is_a_duplicate():
+    jobs = [
+        make_offer(1, source='Adzuna', title="Commercial Terrain", url="https://adzuna.example.fr/1"),
+        make_offer(1, source='HelloWork', title="commercial terrain !", company="ENTREPRISE 1",
+                   url="https://hellowork.example.fr/9"),
+    ]
+
+    unique = JobDeduplicator().deduplicate(jobs)
+
+    assert [job['source'] for job in unique] == ['Adzuna']
+    assert unique[0]['offer_id'] == JobDeduplicator.offer_id(jobs[0])
+
+
+def test_near_duplicates_are_dropped_only_when_enabled():
+    jobs = [
+        reposted(1, 'Adzuna', "Commercial terrain"),
+        reposted(2, 'HelloWork', "Commercial terrain", DESCRIPTION + " Démarrage rapide.", location="Paris 8e"),
+        # Même employeur, autre poste : annonce distincte
+        reposted(3, 'HelloWork', "Commercial terrain",
+                 DESCRIPTION.replace("la région Île-de-France", "le secteur Rhône-Alpes"), location="Lyon"),
+    ]
+
+    assert len(JobDeduplicator().deduplicate([job.copy() for job in jobs])) == 3
+    deduplicator = JobDeduplicator(near_duplicates=True)
+    assert [job['source'] for job in deduplicator.deduplicate(jobs)] == ['Adzuna', 'HelloWork']
+    assert deduplicator.duplicates_dropped == 1
+
+
+def test_simhash_distance_reflects_text_similarity():
+    base = JobDeduplicator.simhash(DESCRIPTION)
+
+    assert JobDeduplicator.simhash(DESCRIPTION.upper()) == base
+    assert bin(base ^ JobDeduplicator.simhash(DESCRIPTION + " Démarrage rapide.")).count('1') <= 3
+    assert bin(base ^ JobDeduplicator.simhash("Développeur Python, services web et tests.")).count('1') > 10
@@ -0,0 +1,162 @@
+import threading
+import time
+
+import pytest
+
+from safejob.fetch import FetchTask, JobFetchEngine
+
+
+@pytest.fixture
+def engine():
+    engine = JobFetchEngine(max_workers=2, deadline=5.0)
+    yield engine
+    engine._executor.shutdown(wait=False)
+
+
+class Upstream:
+    """Appel simulé : compte les exécutions, peut être lent, bloqué ou en échec"""
+
+    def __init__(self, delay=0.0, error=None, gate=None):
+        self.delay = delay
+        self.error = error
+        self.gate = gate
+        self.calls = 0
+        self.running = 0
+        self.max_running = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, value):
+        with self._lock:
+            self.calls += 1
+            self.running += 1
+            self.max_running = max(self.max_running, self.running)
+        try:
+            if self.gate is not None:
+                assert self.gate.wait(5)
+            time.sleep(self.delay)
+            if self.error is not None:
+                raise self.error
+            return [value]
+        finally:
+            with self._lock:
+                self.running -= 1
+
+
+def task(fn, value='page', source='Fake', key=('Fake', 'vente', '', 1)):
+    return FetchTask(source, 'vente', 1, fn, (value,), key)
+
+
+def run_concurrently(count, target):
+    results = [None] * count
+
+    def call(index):
+        results[index] = target()
+
+    threads = [threading.Thread(target=call, args=(index,)) for index in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_identical_concurrent_calls_share_one_upstream_call(engine):
+    upstream = Upstream(delay=0.2)
+    outcomes = run_concurrently(8, lambda: engine.run([task(upstream)]))
+
+    assert upstream.calls == 1
+    assert all(results == [(results[0][0], ['page'])] and report['completed'] == 1 for results, report in outcomes)
+    stats = engine.single_flight.stats()
+    assert (stats['executed'], stats['shared'], stats['in_flight']) == (1, 7, 0)
+
+
+def test_errors_are_shared_with_waiting_callers(engine):
+    upstream = Upstream(delay=0.2, error=ConnectionError("source indisponible"))
+    outcomes = run_concurrently(5, lambda: engine.run([task(upstream)]))
+
+    assert upstream.calls == 1
+    assert all(results == [] and report['failed'] == 1 for results, report in outcomes)
+    assert all(report['errors'] == ["Fake 'vente' p1: ConnectionError"] for _, report in outcomes)
+    # Terminé, l'appel est oublié : une nouvelle demande repart vers la source
+    upstream.error = None
+    assert engine.run([task(upstream)])[0][0][1] == ['page']
+    assert upstream.calls == 2
+
+
+def test_waiting_callers_do_not_hold_pool_workers(engine):
+    gate = threading.Event()
+    shared = Upstream(gate=gate)
+    callers = [threading.Thread(target=engine.run, args=([task(shared)],)) for _ in range(6)]
+    for caller in callers:
+        caller.start()
+    while shared.calls == 0:
+        time.sleep(0.01)
+
+    # Deux threads dans le pool : l'appel partagé en occupe un, l'autre reste libre
+    unrelated = Upstream()
+    started = time.monotonic()
+    results, report = engine.run([task(unrelated, 'autre', key=None)], deadline=1.0)
+    assert results and report['completed'] == 1
+    assert time.monotonic() - started < 0.5
+
+    gate.set()
+    for caller in callers:
+        caller.join()
+    assert shared.calls == 1
+
+
+def test_abandoning_caller_does_not_cancel_a_shared_call(engine):
+    gate = threading.Event()
+    blockers = [Upstream(gate=gate) for _ in range(2)]
+    for index, blocker in enumerate(blockers):
+        engine._submit(task(blocker, key=('bloquant', index)), time.monotonic() + 5)
+
+    upstream = Upstream()
+    patient = []
+    follower = threading.Thread(target=lambda: patient.append(engine.run([task(upstream)], deadline=3.0)))
+    # Le premier appelant abandonne pendant que l'appel attend encore un thread du pool
+    impatient = engine.run([task(upstream)], deadline=0.1)
+    follower.start()
+    time.sleep(0.1)
+    gate.set()
+    follower.join()
+
+    assert impatient[1]['timed_out'] == 1
+    assert patient[0][0][0][1] == ['page']
+    assert upstream.calls == 1
+
+
+def test_last_caller_abandoning_cancels_a_queued_call(engine):
+    gate = threading.Event()
+    for index in range(2):
+        engine._submit(task(Upstream(gate=gate), key=('bloquant', index)), time.monotonic() + 5)
+    upstream = Upstream()
+
+    results, report = engine.run([task(upstream)], deadline=0.1)
+    gate.set()
+    time.sleep(0.1)
+
+    assert (results, report['timed_out']) == ([], 1)
+    assert upstream.calls == 0
+    assert engine.single_flight.stats()['in_flight'] == 0
+
+
+def test_source_limit_and_stream_order(engine):
+    engine.set_source_limit('Fake', 1)
+    upstream = Upstream(delay=0.05)
+    tasks = [task(upstream, value, key=None) for value in ('a', 'b', 'c')]
+
+    streamed = [(item.args[0], result, error) for item, result, error in engine.stream(tasks)]
+
+    assert upstream.max_running == 1
+    assert sorted(streamed) == [('a', ['a'], None), ('b', ['b'], None), ('c', ['c'], None)]
+
+
+def test_identical_tasks_in_one_stream_each_get_the_result(engine):
+    upstream = Upstream(delay=0.05)
+    report = engine.new_report()
+    streamed = list(engine.stream([task(upstream), task(upstream)], report=report))
+
+    assert upstream.calls == 1
+    assert [result for _, result, _ in streamed] == [['page'], ['page']]
+    assert report['completed'] == 2
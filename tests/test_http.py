@@ -0,0 +1,143 @@
+import time
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+
+import pytest
+import requests
+
+from safejob import http
+from safejob.fetch import FetchTask, JobFetchEngine
+from safejob.http import PooledHttpClient
+from safejob.sources import AdzunaSource
+
+
+class FakeResponse:
+    def __init__(self, status_code, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(f"{self.status_code}", response=self)
+
+
+class FakeSession:
+    """Session qui rejoue une suite de réponses (ou d'exceptions)"""
+
+    def __init__(self, outcomes):
+        self.outcomes = list(outcomes)
+        self.calls = 0
+        self.timeouts = []
+
+    def get(self, url, params=None, timeout=None):
+        self.calls += 1
+        self.timeouts.append(timeout)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    delays = []
+    monkeypatch.setattr(http.time, 'sleep', delays.append)
+    return delays
+
+
+def make_client(outcomes, **options):
+    client = PooledHttpClient(**options)
+    client.session = FakeSession(outcomes)
+    return client
+
+
+def test_session_is_pooled_and_kept_alive():
+    client = PooledHttpClient(pool_maxsize=7)
+
+    adapter = client.session.get_adapter('https://api.adzuna.com')
+    assert adapter is client.session.get_adapter('http://example.fr')
+    assert adapter._pool_maxsize == 7
+    assert client.session.headers['Connection'] == 'keep-alive'
+
+
+def test_retries_server_errors_with_bounded_exponential_backoff(sleeps):
+    failures = [FakeResponse(503) for _ in range(3)]
+    client = make_client(failures + [FakeResponse(200)], backoff_base=0.5)
+
+    assert client.get('https://api.example.fr').status_code == 200
+    assert all(response.closed for response in failures)
+    assert len(sleeps) == 3
+    assert all(0 <= delay <= 0.5 * 2 ** attempt for attempt, delay in enumerate(sleeps))
+
+
+def test_gives_up_after_max_retries(sleeps):
+    client = make_client([FakeResponse(500) for _ in range(3)], max_retries=2)
+    assert client.get('https://api.example.fr').status_code == 500
+    assert client.session.calls == 3
+
+    client = make_client([requests.ConnectionError("refusée")] * 3, max_retries=2)
+    with pytest.raises(requests.ConnectionError):
+        client.get('https://api.example.fr')
+
+
+def test_client_errors_are_not_retried(sleeps):
+    client = make_client([FakeResponse(404)])
+
+    assert client.get('https://api.example.fr').status_code == 404
+    assert sleeps == []
+
+
+def test_retry_after_is_honoured_in_seconds_and_http_dates(sleeps):
+    retry_at = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=20), usegmt=True)
+    client = make_client([
+        FakeResponse(429, {'Retry-After': '3'}),
+        FakeResponse(429, {'Retry-After': retry_at}),
+        requests.Timeout(),
+        FakeResponse(200),
+    ])
+
+    assert client.get('https://api.example.fr').status_code == 200
+    assert sleeps[0] == 3.0
+    assert 18 < sleeps[1] <= 20
+
+
+def test_too_long_retry_after_returns_the_response(sleeps):
+    client = make_client([FakeResponse(429, {'Retry-After': '3600'})], max_retry_after=30)
+
+    assert client.get('https://api.example.fr').status_code == 429
+    assert sleeps == []
+
+
+def test_retries_stop_at_the_deadline(sleeps):
+    deadline = time.monotonic() + 2
+    client = make_client([FakeResponse(429, {'Retry-After': '10'})])
+    assert client.get('https://api.example.fr', deadline=deadline).status_code == 429
+    assert client.session.timeouts == [pytest.approx(2, abs=0.5)]
+
+    client = make_client([requests.ConnectionError("refusée")] * 2)
+    client._backoff_delay = lambda attempt: 5.0
+    with pytest.raises(requests.ConnectionError):
+        client.get('https://api.example.fr', deadline=deadline)
+    assert client.session.calls == 1
+
+    client = make_client([FakeResponse(200)])
+    with pytest.raises(requests.Timeout):
+        client.get('https://api.example.fr', deadline=time.monotonic() - 1)
+    assert client.session.calls == 0 and sleeps == []
+
+
+def test_source_page_fails_instead_of_waiting_past_the_search_deadline(sleeps):
+    source = AdzunaSource(http_client=make_client([FakeResponse(503, {'Retry-After': '20'}), FakeResponse(200)]))
+    engine = JobFetchEngine(max_workers=2, deadline=2.0)
+    try:
+        results, report = engine.run([FetchTask('Adzuna', 'vente', 1, source.fetch_page, ('vente', 'Paris', 1))])
+    finally:
+        engine._executor.shutdown(wait=False)
+
+    assert results == [] and report['failed'] == 1
+    assert report['errors'] == ["Adzuna 'vente' p1: HTTPError"]
+    assert source.http_client.session.calls == 1 and sleeps == []
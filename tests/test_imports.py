@@ -0,0 +1,44 @@
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+
+import safejob
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('numpy', 'pandas', 'requests', 'streamlit', 'plotly')
+
+
+def loaded_modules(statement):
+    """Modules lourds et sous-modules safejob chargés par `statement` dans un interpréteur neuf"""
+    code = (
+        f"import json, sys\n{statement}\n"
+        f"print(json.dumps(sorted(name for name in sys.modules if name.split('.')[0] in {HEAVY_MODULES!r} + ('safejob',))))"
+    )
+    output = subprocess.run(
+        [sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def test_importing_the_package_loads_no_submodule():
+    assert loaded_modules('import safejob') == ['safejob']
+
+
+@pytest.mark.parametrize('module', ['safejob.search', 'safejob.batch', 'safejob.scheduler', 'safejob.classifier'])
+def test_core_modules_load_no_heavy_dependency(module):
+    loaded = loaded_modules(f'import {module}')
+
+    assert module in loaded
+    assert not [name for name in loaded if name.split('.')[0] in HEAVY_MODULES]
+
+
+def test_public_classes_resolve_on_first_access():
+    from safejob.search import AutoJobSearchAI
+
+    assert safejob.AutoJobSearchAI is AutoJobSearchAI
+    assert 'JobStore' in dir(safejob)
+    with pytest.raises(AttributeError):
+        safejob.Inexistant
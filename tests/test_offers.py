@@ -0,0 +1,73 @@
+import pickle
+
+import pytest
+
+from conftest import make_offer
+from safejob.applicant import history_offers, migrate_applications_history
+from safejob.dedup import JobDeduplicator
+from safejob.offers import JobOffer
+
+
+def test_offer_behaves_like_a_dict_without_per_instance_dict():
+    offer = make_offer(1)
+
+    assert not hasattr(offer, '__dict__')
+    assert offer['title'] == "Commercial vente 1"
+    assert offer.get('risk_level') is None and 'risk_level' not in offer
+    offer['risk_level'] = 'low'
+    offer['note'] = "champ libre"
+    assert offer.keys()[-2:] == ['risk_level', 'note']
+    assert offer == dict(offer.items()) == JobOffer.from_dict(offer.to_dict())
+    assert offer.pop('note') == "champ libre"
+    with pytest.raises(KeyError):
+        del offer['note']
+    with pytest.raises(KeyError):
+        offer['offer_id']
+
+
+def test_repeated_strings_are_interned():
+    company = ''.join(["Entreprise ", "Martin"])
+    first = JobOffer(company=company, source=''.join(["Adz", "una"]))
+    second = JobOffer(company="Entreprise Martin", source="Adzuna")
+
+    assert first['company'] is second['company']
+    assert first['source'] is second['source']
+
+
+def test_search_text_is_cached_and_refreshed_on_change():
+    offer = JobOffer(title="Commercial", description="Vente B2B")
+    assert offer.search_text == "commercial vente b2b"
+    assert offer.search_text is offer.search_text
+
+    offer['description'] = "Prospection"
+    assert offer.search_text == "commercial prospection"
+
+
+def test_copies_and_pickles_are_independent():
+    offer = make_offer(1, tags=['cdi'])
+    copy = offer.copy()
+    copy['ai_score'] = 0.9
+    copy['extra'] = True
+
+    assert offer['ai_score'] == 0 and 'extra' not in offer
+    restored = pickle.loads(pickle.dumps(copy))
+    assert restored == copy and isinstance(restored, JobOffer)
+
+
+def test_legacy_history_is_moved_to_the_store_by_offer_id(store):
+    legacy = make_offer(1).to_dict()
+    profile = {'applications_history': [
+        {'job': legacy, 'application': {'cv': "CV"}, 'sent_date': '2026-10-01T09:00:00', 'status': 'sent'},
+        {'job': dict(legacy), 'ai_score': 0.8, 'sent_date': '2026-10-02T09:00:00'},
+    ]}
+
+    assert migrate_applications_history(profile, 'a@example.fr', store) == 2
+
+    assert 'applications_history' not in profile
+    records, _ = store.page_applications('a@example.fr')
+    offer_id = JobDeduplicator.offer_id(legacy)
+    assert {record['offer_id'] for record in records} == {offer_id}
+    # L'offre n'est stockée qu'une fois, référencée par les deux candidatures
+    assert store.count_offers() == 1
+    assert history_offers(records, store)[offer_id]['title'] == legacy['title']
+    assert migrate_applications_history(profile, 'a@example.fr', store) == 0
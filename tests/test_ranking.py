@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from safejob.ranking import BM25Index
+
+DOCUMENTS = [
+    ('a', "Commercial terrain vente prospection"),
+    ('b', "Développeur Python backend"),
+    ('c', "Vente en magasin, conseil client"),
+    ('d', "Comptable confirmé"),
+    ('e', "Commercial sédentaire, vente par téléphone, vente additionnelle"),
+]
+
+
+def reference_scores(index, query):
+    """BM25 calculé directement à partir des textes, sans postings"""
+    documents = {key: BM25Index.tokenize(text) for key, text in DOCUMENTS if key in index.doc_ids}
+    mean_length = max(np.mean([len(tokens) for tokens in documents.values()]), 1.0)
+    scores = {}
+    for key, tokens in documents.items():
+        score = 0.0
+        for term in set(BM25Index.tokenize(query)):
+            df = sum(term in other for other in documents.values())
+            tf = tokens.count(term)
+            if tf:
+                idf = np.log(1 + (len(documents) - df + 0.5) / (df + 0.5))
+                score += idf * tf * (index.k1 + 1) / (tf + index.k1 * (1 - index.b + index.b * len(tokens) / mean_length))
+        scores[key] = score
+    return scores
+
+
+def test_rank_matches_reference_bm25_on_a_subset():
+    index = BM25Index()
+    assert index.add_documents(DOCUMENTS) == 5
+    assert index.add_documents(DOCUMENTS[:2]) == 0
+
+    ranking = index.rank("vente commercial", ['c', 'e', 'a', 'b'])
+    expected = reference_scores(index, "vente commercial")
+
+    assert [key for key, _ in ranking] == sorted('abce', key=lambda key: -expected[key])
+    assert ranking[-1] == ('b', 0.0)
+    assert dict(ranking) == pytest.approx({key: expected[key] for key in 'abce'})
+    assert index.rank("vente", ['a', 'inconnu'], top_k=1) == [('a', pytest.approx(reference_scores(index, "vente")['a']))]
+
+
+def test_subset_scores_equal_full_corpus_scores():
+    index = BM25Index()
+    index.add_documents(DOCUMENTS)
+    full = index.score("vente client python")
+    assert index.score("vente client python", [4, 1]).tolist() == [full[4], full[1]]
+
+
+def test_index_is_bounded_and_evicts_least_recently_used_documents():
+    index = BM25Index(max_documents=10)
+    index.add_documents((f"offre-{n}", f"vente offre {n}") for n in range(10))
+    # Un classement compte comme une utilisation : offre-0 est gardée
+    index.rank("vente", ['offre-0'])
+    index.add_documents([('offre-10', "vente offre 10")])
+
+    assert len(index) == 9
+    assert index.evictions == 2
+    assert 'offre-0' in index.doc_ids and 'offre-10' in index.doc_ids
+    assert 'offre-1' not in index.doc_ids and 'offre-2' not in index.doc_ids
+    # Les postings reconstruits ne gardent que les documents restants
+    assert sorted(key for key, _ in index.rank("vente", list(index.doc_ids))) == sorted(index.doc_ids)
+    assert index.score("1").sum() == 0.0
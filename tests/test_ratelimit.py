@@ -0,0 +1,26 @@
+import time
+
+from safejob.ratelimit import TokenBucket
+
+
+def test_burst_is_free_then_calls_are_spaced_by_rate():
+    bucket = TokenBucket(rate=10.0, capacity=3)
+
+    waits = [bucket.reserve() for _ in range(5)]
+
+    assert waits[:3] == [0.0, 0.0, 0.0]
+    # Les réservations au-delà de la rafale s'échelonnent à 1/rate
+    assert 0.09 <= waits[3] <= 0.1
+    assert 0.19 <= waits[4] <= 0.2
+
+
+def test_tokens_refill_over_time_up_to_capacity():
+    bucket = TokenBucket(rate=10.0, capacity=2)
+    bucket.reserve()
+    bucket.reserve()
+
+    bucket.updated_at = time.monotonic() - 60
+    assert bucket.reserve() == 0.0
+    # La rafale ne dépasse jamais la capacité, même après une longue pause
+    assert bucket.reserve() == 0.0
+    assert bucket.reserve() > 0
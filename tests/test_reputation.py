@@ -0,0 +1,107 @@
+import numpy as np
+
+from conftest import FakeSource, make_offer
+from safejob.reputation import HashedKeySet, ReputationIndex
+
+LISTS = """# Listes de test
+block company Société Arnaque
+block domain arnaque.example
+allow domain sure.arnaque.example
+allow company Martin SA
+ligne invalide
+"""
+
+
+def write(path, text):
+    with open(path, 'w', encoding='utf-8', newline='\n') as handle:
+        handle.write(text)
+
+
+def append(path, text):
+    with open(path, 'a', encoding='utf-8', newline='\n') as handle:
+        handle.write(text)
+
+
+def test_hashed_key_set_has_no_false_answers_and_grows():
+    rng = np.random.default_rng(7)
+    keys = rng.integers(0, 2 ** 63, size=20000, dtype=np.uint64)
+    others = rng.integers(0, 2 ** 63, size=20000, dtype=np.uint64)
+    key_set = HashedKeySet()
+
+    assert key_set.add(keys[:100]) == 100
+    first_filter = key_set._filter[0]
+    assert key_set.add(keys) == 19900
+    assert key_set.add(keys[:10]) == 0
+    assert key_set._filter[0] > first_filter
+
+    assert key_set.contains(keys).all()
+    # Les positifs du filtre de Bloom sont confirmés dans le tableau trié
+    assert not key_set.contains(np.setdiff1d(others, keys)).any()
+    assert len(key_set) == 20000
+
+
+def test_companies_and_domains_are_classified_with_allow_winning(tmp_path):
+    path = tmp_path / 'reputation.txt'
+    write(path, LISTS)
+    index = ReputationIndex(str(path))
+
+    assert index.classify_batch([
+        make_offer(1, company="SOCIETE arnaque !"),
+        make_offer(2, url="https://jobs.arnaque.example/offre/2"),
+        make_offer(3, url="https://sure.arnaque.example/offre/3"),
+        make_offer(4, company="Martin SA", url="https://www.arnaque.example/4"),
+        make_offer(5),
+    ]) == ['blocked', 'blocked', 'trusted', 'trusted', None]
+    assert (len(index.blocked), len(index.allowed)) == (2, 2)
+
+
+def test_appended_lines_are_read_from_the_last_position(tmp_path, monkeypatch):
+    path = tmp_path / 'reputation.txt'
+    write(path, LISTS)
+    index = ReputationIndex(str(path))
+    parsed = []
+    parse_line = ReputationIndex.parse_line
+    monkeypatch.setattr(ReputationIndex, 'parse_line', staticmethod(lambda line: parsed.append(line) or parse_line(line)))
+
+    assert index.refresh() == 0
+    append(path, "block company Nouvelle Arnaque\nblock domain en-cours")
+    assert index.refresh() == 1
+    assert parsed == ["block company Nouvelle Arnaque\n"]
+    assert index.classify(make_offer(6, url="https://en-cours/6")) is None
+
+    # La ligne incomplète est intégrée une fois terminée
+    append(path, ".example\n")
+    assert index.refresh() == 1
+    assert index.classify(make_offer(6, url="https://en-cours.example/6")) == 'blocked'
+
+
+def test_rewritten_or_truncated_files_are_reloaded(tmp_path):
+    path = tmp_path / 'reputation.txt'
+    write(path, LISTS)
+    index = ReputationIndex(str(path))
+    blocked = make_offer(1, company="Société Arnaque")
+    assert index.classify(blocked) == 'blocked'
+
+    # Même longueur, contenu modifié avant la dernière position lue
+    write(path, LISTS.replace("block company Société Arnaque", "allow company Société Arnaque"))
+    index.refresh()
+    assert index.classify(blocked) == 'trusted'
+
+    write(path, "block domain autre.example\n")
+    index.refresh()
+    assert index.classify(blocked) is None
+    assert (len(index.blocked), len(index.allowed)) == (1, 0)
+
+
+def test_search_drops_blocked_offers(make_search, tmp_path):
+    path = tmp_path / 'reputation.txt'
+    write(path, "block company Entreprise 1\n")
+    source = FakeSource(offers=[make_offer(n) for n in range(3)], max_pages=1)
+    search_ai = make_search(source, reputation_index=ReputationIndex(str(path)))
+
+    jobs = search_ai.intelligent_job_search(
+        {'keywords': ['vente'], 'experience_level': 'confirmé', 'compatibility_threshold': 0.6}
+    )
+
+    assert sorted(job['company'] for job in jobs) == ["Entreprise 0", "Entreprise 2"]
+    assert search_ai.last_fetch_report['blocked_offers'] == 1
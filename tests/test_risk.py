@@ -0,0 +1,91 @@
+import json
+import os
+
+import pytest
+
+from safejob.risk import DEFAULT_RULES_PATH, RiskRuleSet, ScamRiskEngine
+
+
+@pytest.fixture(scope='module')
+def rules():
+    with open(DEFAULT_RULES_PATH, encoding='utf-8') as handle:
+        return RiskRuleSet(json.load(handle))
+
+
+def offer(description, title="Commercial", **fields):
+    return dict(title=title, description=description, **fields)
+
+
+def test_patterns_match_whole_words_and_count_once(rules):
+    assessment = rules.assess(offer("Recrutement URGENT, très urgent : paiement par Western Union"))
+
+    assert assessment.reasons == ["Recrutement présenté comme urgent", "Paiement demandé au candidat", "Service de transfert d'argent"]
+    assert assessment.score == pytest.approx(1.0)
+    assert assessment.level == RiskRuleSet.HIGH
+    assert rules.assess(offer("Urgentiste en clinique, prépaiement des congés")).reasons == []
+
+
+def test_contacts_and_domains(rules):
+    assert rules.assess(offer("Écrivez à recrutement@gmail.com")).reasons == ["Contact via une messagerie gratuite (gmail.com)"]
+    assert rules.assess(offer("Postulez sur https://bit.ly/abc")).level == RiskRuleSet.MEDIUM
+    # Domaine de confiance : les sous-domaines le sont aussi
+    assert rules.assess(offer("Détails sur www.fr.indeed.com", url="https://fr.indeed.com/job/1")).reasons == []
+
+    blocking = RiskRuleSet({'version': 'test', 'domains': {'blocked': ['arnaque.example']}})
+    assessment = blocking.assess(offer("Voir www.jobs.arnaque.example"))
+    assert (assessment.reasons, assessment.level) == (["Domaine signalé (jobs.arnaque.example)"], RiskRuleSet.HIGH)
+
+
+@pytest.mark.parametrize('salary, reason', [
+    ("35000-42000€", None),
+    ("800 € par jour", "Salaire anormalement élevé"),
+    ("2 500 € par mois", None),
+    ("20000-90000€", "Fourchette de salaire incohérente"),
+    ("Selon profil", None),
+])
+def test_salary_checks(rules, salary, reason):
+    assert rules.assess(offer("Vente", salary=salary)).reasons == ([reason] if reason else [])
+
+
+def test_invalid_pattern_is_rejected():
+    with pytest.raises(ValueError, match="cassée"):
+        RiskRuleSet({'version': '1', 'patterns': [{'id': 'cassée', 'weight': 1, 'pattern': '(?P<'}]})
+
+
+def write_rules(path, version, patterns, mtime):
+    path.write_text(json.dumps({'version': version, 'patterns': patterns}), encoding='utf-8')
+    os.utime(path, ns=(mtime, mtime))
+
+
+def test_rules_are_hot_reloaded_and_invalid_versions_ignored(tmp_path):
+    path = tmp_path / 'rules.json'
+    write_rules(path, '1', [{'id': 'crypto', 'weight': 0.4, 'pattern': 'bitcoins?'}], 1_000_000_000)
+    engine = ScamRiskEngine(str(path), reload_interval=0)
+    jobs = [offer("Paiement en bitcoin"), offer("Formation offerte, kit fourni")]
+    assert [(risk.score, risk.version) for risk in engine.assess_batch(jobs)] == [(0.4, '1'), (0.0, '1')]
+
+    write_rules(path, '2', [
+        {'id': 'crypto', 'weight': 0.6, 'pattern': 'bitcoins?'},
+        {'id': 'kit', 'weight': 0.5, 'pattern': 'kit'},
+    ], 2_000_000_000)
+    assert [(risk.score, risk.version) for risk in engine.assess_batch(jobs)] == [(0.6, '2'), (0.5, '2')]
+
+    path.write_text('{"version": "3", "patterns": [', encoding='utf-8')
+    os.utime(path, ns=(3_000_000_000, 3_000_000_000))
+    assert not engine.reload_if_changed()
+    assert engine.version == '2'
+    assert not engine.reload_if_changed()
+
+    write_rules(path, '4', [], 4_000_000_000)
+    assert engine.reload_if_changed()
+    assert engine.assess(jobs[0]).score == 0.0
+
+
+def test_reload_checks_are_throttled(tmp_path):
+    path = tmp_path / 'rules.json'
+    write_rules(path, '1', [], 1_000_000_000)
+    engine = ScamRiskEngine(str(path), reload_interval=60)
+
+    write_rules(path, '2', [], 2_000_000_000)
+    assert not engine.reload_if_changed()
+    assert engine.version == '1'
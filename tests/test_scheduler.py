@@ -0,0 +1,185 @@
+import time
+from datetime import datetime
+
+import pytest
+
+from safejob.profile import UserProfileAI
+from safejob.scheduler import AutoSearchScheduler
+from safejob.search import AutoJobSearchAI
+
+from conftest import FakeSource, make_offer
+
+
+def add_user(store, email, search_time):
+    store.create_user(email, 'secret', {
+        'experience': "Trois ans de vente en boutique",
+        'skills': ['vente', 'prospection'],
+        'ai_settings': {'auto_search_enabled': True, 'search_time': search_time},
+    })
+
+
+def publish(source, *numbers):
+    """Ajoute des offres ; la source les sert de la plus récente à la plus ancienne"""
+    source.offers = sorted(source.offers + [make_offer(n) for n in numbers], key=lambda job: job['date'], reverse=True)
+
+
+def result_numbers(store, email):
+    return sorted(int(job['title'].rsplit(' ', 1)[1]) for job in store.get_search_results(email))
+
+
+def test_each_user_gets_offers_published_since_their_own_last_run(store, make_search, monkeypatch):
+    source = FakeSource()
+    scheduler = AutoSearchScheduler(store, search_factory=lambda: make_search(source))
+    add_user(store, 'matin@example.fr', '09:00')
+    add_user(store, 'soir@example.fr', '18:00')
+
+    scored = []
+    select_jobs = AutoJobSearchAI.select_jobs
+
+    def spy(self, jobs, criteria, top_k=None):
+        scored.append(len(jobs))
+        return select_jobs(self, jobs, criteria, top_k)
+
+    monkeypatch.setattr(AutoJobSearchAI, 'select_jobs', spy)
+
+    publish(source, 0, 1, 2)
+    assert scheduler.run_due(datetime(2026, 10, 1, 9, 30)) == 1
+    assert scheduler.run_due(datetime(2026, 10, 1, 18, 30)) == 1
+    assert result_numbers(store, 'matin@example.fr') == [0, 1, 2]
+    assert result_numbers(store, 'soir@example.fr') == [0, 1, 2]
+
+    # Le passage du matin enregistre les offres 10 à 12 pour la requête commune
+    publish(source, 10, 11, 12)
+    assert scheduler.run_due(datetime(2026, 10, 2, 9, 30)) == 1
+    assert result_numbers(store, 'matin@example.fr') == [0, 1, 2, 10, 11, 12]
+
+    # Le soir, elles ne sont plus nouvelles pour la requête, mais le sont pour cet utilisateur
+    publish(source, 20, 21)
+    assert scheduler.run_due(datetime(2026, 10, 2, 18, 30)) == 1
+    assert result_numbers(store, 'soir@example.fr') == [0, 1, 2, 10, 11, 12, 20, 21]
+    assert result_numbers(store, 'matin@example.fr') == [0, 1, 2, 10, 11, 12]
+
+    # Passages incrémentaux : seules les offres apparues depuis le passage de l'utilisateur sont
+    # scorées (la source simulée renvoie les mêmes offres pour chacun des trois mots-clés)
+    assert scored == [3 * 3, 3 * 3, 3 * 3, 3 * 5]
+
+
+def test_changed_profile_rescores_all_known_offers(store, make_search):
+    source = FakeSource()
+    scheduler = AutoSearchScheduler(store, search_factory=lambda: make_search(source))
+    add_user(store, 'matin@example.fr', '09:00')
+    publish(source, 0, 1, 2)
+    scheduler.run_due(datetime(2026, 10, 1, 9, 30))
+
+    user = store.get_user('matin@example.fr')
+    user['experience'] = "Commercial senior, dix ans de vente"
+    store.save_user('matin@example.fr', user)
+    publish(source, 10)
+    scheduler.run_due(datetime(2026, 10, 2, 9, 30))
+
+    assert result_numbers(store, 'matin@example.fr') == [0, 1, 2, 10]
+    criteria = UserProfileAI().analyze_user_profile(user['experience'], user['skills'], user['ai_settings'])
+    stats = store.get_user('matin@example.fr')['ai_stats']
+    assert stats['criteria_fingerprint'] == AutoSearchScheduler.criteria_fingerprint(criteria)
+
+
+def test_batch_keeps_account_changes_made_during_the_run(store, make_search):
+    source = FakeSource(offers=[make_offer(n) for n in range(3)])
+    scheduler = AutoSearchScheduler(store, search_factory=lambda: make_search(source))
+    add_user(store, 'matin@example.fr', '09:00')
+    snapshot = ('matin@example.fr', store.get_user('matin@example.fr'))
+
+    # Réglages modifiés dans l'interface après la constitution du lot
+    user = store.get_user('matin@example.fr')
+    user['ai_settings']['daily_application_limit'] = 2
+    store.save_user('matin@example.fr', user)
+    assert scheduler.run_batch([snapshot], datetime(2026, 10, 1, 9, 30)) == 1
+
+    saved = store.get_user('matin@example.fr')
+    assert saved['ai_settings']['daily_application_limit'] == 2
+    assert saved['ai_stats']['total_jobs_analyzed'] == 3
+    assert saved['ai_stats']['last_activity_date'] == '2026-10-01T09:30:00'
+
+
+def test_date_sorted_source_stops_at_first_known_offer(store, make_search):
+    source = FakeSource(page_size=5)
+    publish(source, *range(20))
+    search_ai = make_search(source)
+    search_ai.fetch_new_jobs_by_keyword(['vente'], store, seen_at='2026-10-01T09:00:00')
+    assert [page for _, _, page in source.calls] == [1, 2, 3, 4, 5]
+
+    source.calls.clear()
+    publish(source, 30, 31)
+    new_jobs, known_jobs = search_ai.fetch_new_jobs_by_keyword(['vente'], store, seen_at='2026-10-02T09:00:00')['vente']
+    assert [page for _, _, page in source.calls] == [1]
+    assert sorted(job['title'] for job in new_jobs) == ['Commercial vente 30', 'Commercial vente 31']
+    assert len(known_jobs) == 22
+
+    delta = search_ai.known_jobs_by_keyword(['vente'], store, seen_after='2026-10-01T09:00:00')['vente']
+    assert sorted(job['title'] for job in delta) == ['Commercial vente 30', 'Commercial vente 31']
+
+
+@pytest.mark.parametrize('settings, last_run, now, due', [
+    ({'search_time': '09:00'}, None, datetime(2026, 10, 18, 8, 59), False),
+    ({'search_time': '09:00'}, None, datetime(2026, 10, 18, 9, 0), True),
+    ({'search_time': '09:00'}, '2026-10-18T09:00:00', datetime(2026, 10, 18, 23, 0), False),
+    ({'search_time': '09:00'}, '2026-10-17T09:00:00', datetime(2026, 10, 18, 9, 5), True),
+    ({'search_time': '07:30', 'search_frequency': 'Hebdomadaire'}, '2026-10-12T07:30:00', datetime(2026, 10, 18, 8), False),
+    ({'search_time': '07:30', 'search_frequency': 'Hebdomadaire'}, '2026-10-11T07:30:00', datetime(2026, 10, 18, 8), True),
+    # Créneau illisible : créneau par défaut (09:00)
+    ({'search_time': 'midi'}, None, datetime(2026, 10, 18, 8), False),
+    ({'search_time': 'midi'}, None, datetime(2026, 10, 18, 9), True),
+])
+def test_is_due_follows_slot_and_frequency(store, settings, last_run, now, due):
+    assert AutoSearchScheduler(store).is_due(settings, last_run, now) is due
+
+
+def test_due_users_are_grouped_by_slot(store):
+    add_user(store, 'a@example.fr', '09:00')
+    add_user(store, 'b@example.fr', '09:00')
+    add_user(store, 'c@example.fr', '18:00')
+    store.create_user('manuel@example.fr', 'secret', {'ai_settings': {'auto_search_enabled': False}})
+
+    slots = AutoSearchScheduler(store).due_users_by_slot(datetime(2026, 10, 18, 12))
+
+    assert {slot: [email for email, _ in users] for slot, users in slots.items()} == {
+        '09:00': ['a@example.fr', 'b@example.fr']
+    }
+
+
+def test_background_thread_runs_due_searches(store, make_search):
+    source = FakeSource(offers=[make_offer(n) for n in range(3)])
+    add_user(store, 'a@example.fr', '00:00')
+    scheduler = AutoSearchScheduler(store, tick_seconds=0.05, search_factory=lambda: make_search(source))
+
+    scheduler.start()
+    try:
+        deadline = time.monotonic() + 5
+        while store.get_last_auto_search('a@example.fr') is None and time.monotonic() < deadline:
+            time.sleep(0.02)
+    finally:
+        scheduler.stop()
+        scheduler._thread.join(1)
+
+    assert result_numbers(store, 'a@example.fr') == [0, 1, 2]
+    assert not scheduler._thread.is_alive()
+    # Déjà traité aujourd'hui : le cycle suivant ne relance rien
+    assert scheduler.run_due() == 0
+
+
+def test_failing_user_does_not_stop_the_batch(store, make_search, monkeypatch):
+    source = FakeSource(offers=[make_offer(n) for n in range(3)])
+    add_user(store, 'a@example.fr', '09:00')
+    add_user(store, 'b@example.fr', '09:00')
+    scheduler = AutoSearchScheduler(store, search_factory=lambda: make_search(source))
+    save_results = store.save_search_results
+
+    def fail_for_a(email, jobs, run_at):
+        if email == 'a@example.fr':
+            raise RuntimeError("disque plein")
+        return save_results(email, jobs, run_at)
+
+    monkeypatch.setattr(store, 'save_search_results', fail_for_a)
+
+    assert scheduler.run_due(datetime(2026, 10, 18, 10)) == 1
+    assert result_numbers(store, 'b@example.fr') == [0, 1, 2]
@@ -0,0 +1,133 @@
+import numpy as np
+import pytest
+
+from safejob.offers import JobOffer
+from safejob.profile import UserProfileAI
+from safejob.scoring import BatchJobScorer, StreamingTopK
+
+
+def baseline_compatibility(job, user_criteria):
+    """Score de compatibilité d'origine (balayages par sous-chaîne), pour comparaison"""
+    score = 0.5
+    job_text = f"{job['title']} {job['description']}".lower()
+    score += sum(1 for keyword in user_criteria['keywords'] if keyword in job_text) * 0.1
+    experience_level = user_criteria['experience_level']
+    if experience_level == 'junior' and any(word in job_text for word in ['junior', 'débutant', 'stage']):
+        score += 0.2
+    elif experience_level == 'senior' and any(word in job_text for word in ['senior', 'expert', 'manager']):
+        score += 0.2
+    elif experience_level == 'confirmé' and not any(word in job_text for word in ['junior', 'débutant', 'stage', 'senior', 'expert']):
+        score += 0.1
+    scam_signals = ['urgent', 'paiement', 'formation payante', 'investissement']
+    score -= sum(1 for signal in scam_signals if signal in job_text) * 0.3
+    return min(1.0, max(0.0, score))
+
+
+OFFERS = [
+    ("Commercial junior", "Vente et prospection, stage possible."),
+    ("Manager commercial", "Encadrement d'une équipe de vente, négociation avec les clients."),
+    ("Commercial sédentaire", "Prospection téléphonique et suivi client."),
+    ("Développeur Python senior", "Programmation et développement d'API en Python et Java."),
+    ("Chargé de communication", "Marketing digital, réseaux sociaux et SEO."),
+    ("Comptable expert", "Comptabilité, gestion du budget et analyse financière."),
+    ("Assistant RH débutant", "Recrutement, formation et paie."),
+    ("Chef de rayon", "Manager une équipe, gestion des stocks."),
+    ("Poste polyvalent", ""),
+]
+
+PROFILES = [
+    (level, keywords)
+    for level in ('junior', 'confirmé', 'senior')
+    for keywords in (
+        ['vente', 'commercial', 'négociation', 'client', 'prospection'],
+        ['python', 'java', 'javascript', 'développement', 'programmation'],
+        ['marketing', 'communication', 'digital', 'réseaux sociaux', 'seo'],
+        ['comptabilité', 'finance', 'gestion', 'budget', 'analyse'],
+    )
+]
+
+
+@pytest.mark.parametrize('level, keywords', PROFILES)
+def test_batch_scores_match_the_original_compatibility_score(level, keywords):
+    criteria = {'keywords': keywords, 'experience_level': level, 'compatibility_threshold': 0.6}
+    offers = [JobOffer(title=title, description=description, url='') for title, description in OFFERS]
+
+    scores = BatchJobScorer().score_batch(offers, criteria)
+
+    expected = [baseline_compatibility(offer, criteria) for offer in offers]
+    assert scores.tolist() == pytest.approx(expected)
+
+
+def test_manager_offers_keep_the_confirmed_bonus():
+    criteria = {'keywords': ['vente'], 'experience_level': 'confirmé', 'compatibility_threshold': 0.6}
+    offers = [{'title': "Manager des ventes", 'description': "Vente"}, {'title': "Vendeur senior", 'description': "Vente"}]
+    assert BatchJobScorer().score_batch(offers, criteria).tolist() == [pytest.approx(0.7), pytest.approx(0.6)]
+
+
+def test_scam_signals_zero_the_score():
+    criteria = {'keywords': ['vente'], 'experience_level': 'confirmé', 'compatibility_threshold': 0.6}
+    offers = [{'title': "Vente urgent", 'description': "Paiement par western union, investissement requis"}]
+    scorer = BatchJobScorer()
+    assert scorer.assess_risks(offers)[0].level == 'high'
+    assert scorer.score_batch(offers, criteria).tolist() == [0.0]
+
+
+def test_frame_and_list_inputs_score_identically():
+    import pandas as pd
+
+    criteria = {'keywords': ['python', 'java'], 'experience_level': 'senior', 'compatibility_threshold': 0.6}
+    records = [{'title': title, 'description': description} for title, description in OFFERS]
+    scorer = BatchJobScorer()
+    assert scorer.score_batch(pd.DataFrame(records), criteria).tolist() == scorer.score_batch(records, criteria).tolist()
+
+
+def test_top_k_is_a_stable_thresholded_partial_sort():
+    scores = np.array([0.7, 0.9, 0.5, 0.9, 0.8, 0.6])
+    assert BatchJobScorer.top_k(scores).tolist() == [1, 3, 4, 0, 5, 2]
+    assert BatchJobScorer.top_k(scores, 3, threshold=0.6).tolist() == [1, 3, 4]
+    assert BatchJobScorer.top_k(scores, 2, threshold=0.95).tolist() == []
+
+
+def test_streaming_top_k_matches_batch_top_k():
+    scores = [0.7, 0.9, 0.5, 0.9, 0.8, 0.6, 0.8]
+    ranking = StreamingTopK(4)
+    for index, score in enumerate(scores):
+        ranking.push(score, index)
+    assert ranking.items() == BatchJobScorer.top_k(np.array(scores), 4).tolist()
+
+
+@pytest.mark.parametrize('experience, skills, level', [
+    ("Deux ans de vente en boutique", ['Stage', 'Chef de projet'], 'confirmé'),
+    ("Premier emploi après un stage", [], 'junior'),
+    ("Chef de projet depuis dix ans", ['vente'], 'senior'),
+])
+def test_experience_level_depends_on_experience_only(experience, skills, level):
+    criteria = UserProfileAI().analyze_user_profile(experience, skills, {})
+    assert criteria['experience_level'] == level
+
+
+def test_feature_matrix_columns_and_out_of_vocabulary_keywords():
+    criteria = {'keywords': ['vente', 'salesforce'], 'experience_level': 'junior', 'compatibility_threshold': 0.6}
+    offers = [
+        {'title': "Commercial junior", 'description': "Vente sur Salesforce"},
+        {'title': "Comptable senior", 'description': "Clôture annuelle"},
+    ]
+
+    matrix, names = BatchJobScorer().feature_matrix(offers, criteria)
+
+    assert names[:2] == ['vente', 'salesforce']
+    assert matrix[:, :4].tolist() == [[1, 1, 1, 0], [0, 0, 0, 1]]
+    assert BatchJobScorer().score_batch([], criteria).tolist() == []
+
+
+def test_large_batch_matches_offer_by_offer_scoring():
+    criteria = {'keywords': ['python', 'vente', 'client'], 'experience_level': 'confirmé', 'compatibility_threshold': 0.6}
+    offers = [
+        JobOffer(title=title, description=f"{description} Référence {number}.", url='')
+        for number in range(50) for title, description in OFFERS
+    ]
+    scorer = BatchJobScorer()
+
+    batch = scorer.score_batch(offers, criteria).tolist()
+
+    assert batch == [scorer.score_batch([offer], criteria)[0] for offer in offers]
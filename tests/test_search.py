@@ -0,0 +1,150 @@
+import time
+
+from safejob.cache import TTLLRUCache
+from safejob.fetch import JobFetchEngine
+from safejob.search import AutoJobSearchAI
+
+from conftest import FakeSource, make_offer
+
+CRITERIA = {
+    'keywords': ['vente', 'commercial', 'négociation', 'client', 'prospection'],
+    'experience_level': 'confirmé',
+    'compatibility_threshold': 0.6,
+}
+
+
+def mixed_offers(count):
+    """Une offre sur deux est compatible ; les autres (profil senior, hors domaine) ne le sont pas"""
+    return [
+        make_offer(n) if n % 2 == 0
+        else make_offer(n, title=f"Responsable senior {n}", description="Poste senior en logistique.")
+        for n in range(count)
+    ]
+
+
+def count_scored(monkeypatch):
+    scored = []
+    score_jobs = AutoJobSearchAI._score_jobs
+
+    def spy(self, jobs, criteria):
+        scored.append(len(jobs))
+        return score_jobs(self, jobs, criteria)
+
+    monkeypatch.setattr(AutoJobSearchAI, '_score_jobs', spy)
+    return scored
+
+
+def test_adaptive_pagination_stops_once_enough_offers_are_compatible(make_search, monkeypatch):
+    source = FakeSource(offers=mixed_offers(50), page_size=10, max_pages=5)
+    scored = count_scored(monkeypatch)
+
+    jobs = make_search(source).intelligent_job_search(CRITERIA, needed=12)
+
+    # Trois mots-clés : une page par mot-clé et par vague, 5 offres compatibles par page distincte
+    assert sorted({page for _, _, page in source.calls}) == [1, 2, 3]
+    assert len(jobs) == 15
+    assert all(job['ai_score'] >= 0.6 for job in jobs)
+    # Chaque offre distincte n'est scorée qu'une fois, sans nouveau passage pour la sélection finale
+    assert sum(scored) == 30
+
+
+def test_adaptive_selection_matches_full_selection(make_search):
+    source = FakeSource(offers=mixed_offers(50), page_size=10, max_pages=5)
+    adaptive = make_search(source).intelligent_job_search(CRITERIA, top_k=8, needed=100)
+    complete = make_search(source).intelligent_job_search(CRITERIA, top_k=8)
+
+    assert [job['offer_id'] for job in adaptive] == [job['offer_id'] for job in complete]
+    assert [job['ai_score'] for job in adaptive] == [job['ai_score'] for job in complete]
+
+
+def test_adaptive_search_reports_duplicates_and_leaves_cache_untouched(make_search):
+    cache = TTLLRUCache()
+    source = FakeSource(offers=mixed_offers(10), page_size=10, max_pages=1)
+    search_ai = make_search(source, cache=cache)
+    for _ in range(2):
+        jobs = search_ai.intelligent_job_search(CRITERIA, needed=1)
+
+    assert len(jobs) == 5
+    assert len(source.calls) == 3
+    assert search_ai.last_fetch_report['cache_hits'] == 3
+    assert search_ai.last_fetch_report['duplicates_dropped'] == 20
+    cached_pages = [cache.get(key) for key in list(cache._entries)]
+    assert all(offer['ai_score'] == 0 for page in cached_pages for offer in page)
+
+
+def test_keyword_and_page_fetches_run_concurrently(make_search):
+    source = FakeSource(offers=mixed_offers(50), page_size=10, max_pages=3, delay=0.1)
+    search_ai = make_search(source)
+
+    started = time.monotonic()
+    jobs = search_ai.intelligent_job_search(CRITERIA)
+
+    # Trois mots-clés × trois pages, au plus quatre appels simultanés : trois vagues au lieu de neuf appels
+    assert len(source.calls) == 9
+    assert time.monotonic() - started < 0.6
+    assert len(jobs) == 15
+    assert search_ai.last_fetch_report['completed'] == 9
+
+
+def test_slow_and_failing_sources_leave_partial_results(make_search):
+    engine = JobFetchEngine(max_workers=8, deadline=0.3)
+    fast = FakeSource('Rapide', offers=[make_offer(n, source='Rapide') for n in range(5)], max_pages=1)
+    slow = FakeSource('Lente', offers=[make_offer(n, source='Lente') for n in range(5, 10)], max_pages=1, delay=2.0)
+    broken = FakeSource('Cassée', max_pages=1, error=ConnectionError("hors service"))
+    search_ai = make_search(fast, slow, broken, engine=engine)
+
+    try:
+        started = time.monotonic()
+        jobs = search_ai.intelligent_job_search(CRITERIA)
+        elapsed = time.monotonic() - started
+    finally:
+        engine._executor.shutdown(wait=False)
+
+    assert elapsed < 1.0
+    assert sorted(job['company'] for job in jobs) == [f"Entreprise {n}" for n in range(5)]
+    report = search_ai.last_fetch_report
+    assert (report['completed'], report['timed_out'], report['failed']) == (3, 3, 3)
+    assert report['errors'][0] == "Cassée 'vente' p1: ConnectionError"
+
+
+def test_stream_yields_fast_sources_first_and_ends_with_the_full_ranking(make_search):
+    fast = FakeSource('Rapide', offers=[make_offer(n, source='Rapide') for n in range(5)], max_pages=1)
+    slow = FakeSource('Lente', offers=[make_offer(n, source='Lente') for n in range(5, 10)], max_pages=1, delay=0.3)
+    broken = FakeSource('Cassée', max_pages=1, error=ConnectionError("hors service"))
+    search_ai = make_search(fast, slow, broken)
+
+    started = time.monotonic()
+    first_at = None
+    updates = []
+    for update in search_ai.stream_job_search(CRITERIA, top_k=8):
+        if first_at is None:
+            first_at = time.monotonic() - started
+            first = update
+        updates.append(update)
+
+    assert first_at < 0.2
+    assert first.task.source in ('Rapide', 'Cassée') and not first.done
+    final = updates[-1]
+    assert final.done and final.task is None
+    assert sum(not update.done for update in updates) == 9
+    assert final.progress == {
+        'Rapide': {'done': 3, 'failed': 0, 'total': 3},
+        'Lente': {'done': 3, 'failed': 0, 'total': 3},
+        'Cassée': {'done': 0, 'failed': 3, 'total': 3},
+    }
+    complete = make_search(fast, slow).intelligent_job_search(CRITERIA, top_k=8)
+    assert [job['offer_id'] for job in final.top_jobs] == [job['offer_id'] for job in complete]
+
+
+def test_stream_serves_cached_pages_and_stops_once_enough_offers_are_found(make_search):
+    source = FakeSource(offers=mixed_offers(50), page_size=10, max_pages=5)
+    search_ai = make_search(source, cache=TTLLRUCache())
+
+    list(search_ai.stream_job_search(CRITERIA, needed=12))
+    assert sorted({page for _, _, page in source.calls}) == [1, 2, 3]
+    calls = len(source.calls)
+
+    final = list(search_ai.stream_job_search(CRITERIA, needed=12))[-1]
+    assert len(source.calls) == calls
+    assert search_ai.last_fetch_report['cache_hits'] == calls
+    assert len(final.top_jobs) == 15
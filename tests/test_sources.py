@@ -0,0 +1,96 @@
+import threading
+
+import pytest
+
+from conftest import FakeSource, make_offer
+from safejob.sources import CircuitBreaker, SourceHealth, SourceRegistry
+
+
+def open_breaker(breaker):
+    for _ in range(breaker.failure_threshold):
+        assert breaker.allow()
+        breaker.record_failure()
+
+
+def test_breaker_opens_after_consecutive_failures_only():
+    breaker = CircuitBreaker(failure_threshold=3, cooldown=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_half_open_lets_a_single_trial_through():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=0.05)
+    open_breaker(breaker)
+    breaker.opened_at -= 1
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    allowed = []
+    threads = [threading.Thread(target=lambda: allowed.append(breaker.allow())) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert allowed.count(True) == 1
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_trial_reopens_for_a_new_cooldown():
+    breaker = CircuitBreaker(failure_threshold=2, cooldown=60)
+    open_breaker(breaker)
+    breaker.opened_at -= 61
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_health_stats_over_recent_window():
+    health = SourceHealth(window=4)
+    for latency, ok in [(9.0, False), (0.1, True), (0.2, True), (0.3, False), (0.4, True)]:
+        health.record(latency, ok)
+
+    stats = health.stats()
+    assert (stats['calls'], stats['failures']) == (5, 2)
+    assert stats['error_rate'] == 0.25
+    assert stats['latency_avg'] == pytest.approx(0.25)
+    assert stats['latency_p95'] == 0.4
+
+
+def test_registry_trips_breaker_and_hides_failing_source():
+    registry = SourceRegistry(failure_threshold=2, cooldown=60)
+    broken = registry.register(FakeSource('Cassée', error=ConnectionError("hors service")))
+    registry.register(FakeSource('Saine', offers=[make_offer(n) for n in range(3)]))
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError, match="hors service"):
+            registry.fetch('Cassée', 'vente', '', 1)
+    with pytest.raises(ConnectionError, match="disjoncteur ouvert"):
+        registry.fetch('Cassée', 'vente', '', 1)
+
+    # L'appel refusé par le disjoncteur n'atteint pas la source
+    assert len(broken.calls) == 2
+    assert [adapter.name for adapter in registry.available()] == ['Saine']
+    assert len(registry.fetch('Saine', 'vente', '', 1)) == 3
+    health = registry.health()
+    assert health['Cassée']['circuit'] == CircuitBreaker.OPEN
+    assert (health['Cassée']['failures'], health['Saine']['error_rate']) == (2, 0.0)
+
+
+def test_registry_counts_slow_calls_as_failures():
+    registry = SourceRegistry(slow_call_seconds=0.01, failure_threshold=1, cooldown=60)
+    registry.register(FakeSource('Lente', offers=[make_offer(1)], delay=0.05))
+
+    assert len(registry.fetch('Lente', 'vente', '', 1)) == 1
+    assert registry.health()['Lente']['circuit'] == CircuitBreaker.OPEN
@@ -0,0 +1,248 @@
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+import pytest
+
+from conftest import make_offer
+from safejob.dedup import JobDeduplicator
+from safejob.storage import JobStore
+
+
+def add_applications(store, email, scores):
+    today = datetime.now()
+    ids = []
+    for number, score in enumerate(scores):
+        job = make_offer(number)
+        store.upsert_offers([job])
+        ids.append(store.add_application(
+            email, job, score, {'cv': f"CV {number}", 'cover_letter': "Lettre"},
+            (today - timedelta(days=number)).isoformat()
+        ))
+    return ids
+
+
+def test_application_stats_follow_recorded_outcomes(store):
+    ids = add_applications(store, 'a@example.fr', [0.9, 0.7, 0.5, 0.85])
+
+    stats = store.get_application_stats('a@example.fr')
+    assert stats['total'] == 4
+    assert stats['avg_score'] == (0.9 + 0.7 + 0.5 + 0.85) / 4
+    assert stats['score_bands'] == {'low': 1, 'medium': 1, 'high': 2}
+    assert stats['daily'][datetime.now().date().isoformat()] == 1
+    assert stats['sources'] == {'Fake': 4}
+    assert (stats['responses'], stats['interviews']) == (0, 0)
+
+    assert store.record_application_outcome(ids[0], 'response')
+    assert not store.record_application_outcome(ids[0], 'response')
+    assert store.record_application_outcome(ids[0], 'interview')
+    # Un entretien sans réponse enregistrée compte aussi comme réponse
+    assert store.record_application_outcome(ids[1], 'interview')
+    assert not store.record_application_outcome(ids[1], 'response')
+
+    stats = store.get_application_stats('a@example.fr')
+    assert (stats['responses'], stats['interviews']) == (2, 2)
+    assert stats['response_rate'] == 0.5
+    records, _ = store.page_applications('a@example.fr')
+    assert {record['id']: record['status'] for record in records}[ids[0]] == 'interview'
+
+    # Les agrégats reconstruits à partir de l'historique sont identiques
+    store.rebuild_application_stats('a@example.fr')
+    assert store.get_application_stats('a@example.fr') == stats
+
+
+def test_stats_survive_archiving(store):
+    add_applications(store, 'a@example.fr', [0.9, 0.7])
+    before = store.get_application_stats('a@example.fr')
+    assert store.archive_applications((datetime.now() + timedelta(days=1)).isoformat()) == 2
+    assert store.count_applications('a@example.fr') == 0
+    assert store.count_applications('a@example.fr', include_archived=True) == 2
+    store.rebuild_application_stats('a@example.fr')
+    assert store.get_application_stats('a@example.fr')['total'] == before['total']
+
+
+def test_offers_round_trip_and_persist_across_instances(store, tmp_path):
+    jobs = [make_offer(n, is_remote=n % 2 == 0) for n in range(4)]
+    for job in jobs:
+        job['offer_id'] = JobDeduplicator.offer_id(job)
+    assert store.upsert_offers(jobs) == 4
+
+    reopened = JobStore(str(tmp_path / 'jobs.db'))
+    assert reopened.get_offer(jobs[0]['offer_id']) == jobs[0]
+    assert reopened.get_offer(jobs[1]['offer_id'])['is_remote'] is False
+    assert reopened.get_offers([job['offer_id'] for job in jobs] + ['inconnue'], chunk_size=3) == {
+        job['offer_id']: job for job in jobs
+    }
+
+    # Une offre revue est mise à jour sans être dupliquée
+    store.upsert_offers([make_offer(0, ai_score=0.95, salary="45000€")])
+    assert store.count_offers() == 4
+    assert store.get_offer(jobs[0]['offer_id'])['salary'] == "45000€"
+    # Le score d'un utilisateur n'est pas partagé par la table des offres
+    assert store.get_offer(jobs[0]['offer_id'])['ai_score'] == 0
+
+
+def test_search_results_keep_each_user_score_and_risk(store, tmp_path):
+    job = make_offer(1)
+    job['offer_id'] = JobDeduplicator.offer_id(job)
+    risky = dict(job.to_dict(), ai_score=0.4, risk_score=0.5, risk_level='medium',
+                 risk_reasons=["Contact via messagerie gratuite"])
+    store.save_search_results('a@example.fr', [dict(job.to_dict(), ai_score=0.9)], '2026-10-01T09:00:00')
+    store.save_search_results('b@example.fr', [risky], '2026-10-01T09:00:00')
+
+    [first] = store.get_search_results('a@example.fr')
+    [second] = JobStore(str(tmp_path / 'jobs.db')).get_search_results('b@example.fr')
+    assert (first['ai_score'], first['risk_level'], first['risk_reasons']) == (0.9, 'low', [])
+    assert (second['ai_score'], second['risk_score'], second['risk_level']) == (0.4, 0.5, 'medium')
+    assert second['risk_reasons'] == ["Contact via messagerie gratuite"]
+    assert store.get_offer(job['offer_id'])['ai_score'] == 0
+
+
+def test_search_results_of_older_databases_gain_risk_columns(tmp_path):
+    path = str(tmp_path / 'ancienne.db')
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE search_results (email TEXT NOT NULL, offer_id TEXT NOT NULL, ai_score REAL NOT NULL,
+                                     rank INTEGER NOT NULL, run_at TEXT NOT NULL, PRIMARY KEY (email, offer_id))
+    """)
+    conn.commit()
+    conn.close()
+
+    store = JobStore(path)
+    job = make_offer(1, risk_level='medium', risk_reasons=["Salaire irréaliste"])
+    store.save_search_results('a@example.fr', [job], '2026-10-01T09:00:00')
+    assert store.get_search_results('a@example.fr')[0]['risk_reasons'] == ["Salaire irréaliste"]
+
+
+def test_offer_queries_use_filters_and_orderings(store):
+    store.upsert_offers(
+        [make_offer(n) for n in range(5)]
+        + [make_offer(n, source='Autre', company="Entreprise 1", location="Lyon") for n in range(5, 8)]
+    )
+
+    assert [job['title'] for job in store.iter_offers(source='Fake', order_by='company', batch_size=2)] == [
+        f"Commercial vente {n}" for n in range(5)
+    ]
+    assert [job['date'] for job in store.iter_offers(source='Fake', limit=2)] == [
+        make_offer(4)['date'], make_offer(3)['date']
+    ]
+    assert store.count_offers(location="Lyon") == 3
+    assert store.count_offers(since=make_offer(6)['date']) == 2
+    assert store.count_offers_by('company', limit=1) == [("Entreprise 1", 4)]
+    with pytest.raises(ValueError):
+        store.count_offers_by('description')
+
+
+def test_accounts_round_trip_without_plain_passwords(store):
+    profile = {'name': "Camille", 'password': "secret", 'keywords': ['vente']}
+    assert store.create_user('c@example.fr', "secret", profile)
+    assert not store.create_user('c@example.fr', "autre", profile)
+
+    assert store.authenticate('c@example.fr', "faux") is None
+    assert store.authenticate('inconnu@example.fr', "secret") is None
+    assert store.authenticate('c@example.fr', "secret") == profile
+    assert 'password' not in store.get_user('c@example.fr')
+    raw = store._connection().execute("SELECT password_hash FROM users").fetchone()[0]
+    assert "secret" not in raw
+
+    store.save_user('c@example.fr', dict(profile, keywords=['commercial']))
+    store.create_user('a@example.fr', "mot", {'name': "Alex"})
+    assert [(email, data['name']) for email, data in store.iter_users(batch_size=1)] == [
+        ('a@example.fr', "Alex"), ('c@example.fr', "Camille")
+    ]
+    assert store.get_user('c@example.fr')['keywords'] == ['commercial']
+
+    store.delete_user('c@example.fr')
+    assert not store.user_exists('c@example.fr')
+    assert store.user_exists('a@example.fr')
+
+
+def test_stats_updates_keep_concurrent_account_changes(store):
+    store.create_user('c@example.fr', "secret", {'name': "Camille", 'ai_stats': {'total_jobs_analyzed': 1}})
+    # L'interface modifie le compte pendant que des threads de fond mettent à jour les stats
+    store.save_user('c@example.fr', dict(store.get_user('c@example.fr'), name="Camille Martin"))
+
+    def bump():
+        for _ in range(20):
+            store.update_user(
+                'c@example.fr',
+                lambda data: data['ai_stats'].update(count=data['ai_stats'].get('count', 0) + 1)
+            )
+
+    threads = [threading.Thread(target=bump) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert store.update_user_stats('c@example.fr', {'total_jobs_analyzed': 5})
+    assert not store.update_user_stats('inconnu@example.fr', {'total_jobs_analyzed': 5})
+
+    assert store.get_user('c@example.fr') == {
+        'name': "Camille Martin", 'ai_stats': {'total_jobs_analyzed': 5, 'count': 80}
+    }
+    assert store.authenticate('c@example.fr', "secret")['name'] == "Camille Martin"
+
+
+def test_threads_write_through_their_own_connections(store):
+    def write(offset):
+        for number in range(offset, offset + 25):
+            store.upsert_offers([make_offer(number)])
+
+    threads = [threading.Thread(target=write, args=(offset,)) for offset in range(0, 100, 25)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert store.count_offers() == 100
+
+
+def test_history_pages_with_a_keyset_cursor_and_filters(store):
+    ids = add_applications(store, 'a@example.fr', [0.9, 0.5, 0.7, 0.85, 0.65])
+    add_applications(store, 'b@example.fr', [0.9])
+
+    pages, cursor = [], None
+    while True:
+        records, cursor = store.page_applications('a@example.fr', cursor=cursor, limit=2)
+        pages.append([record['id'] for record in records])
+        if cursor is None:
+            break
+    assert pages == [ids[:-3:-1], ids[2:0:-1], ids[:1]]
+
+    records, cursor = store.page_applications('a@example.fr', min_score=0.6, max_score=0.86)
+    assert ([record['ai_score'] for record in records], cursor) == ([0.65, 0.85, 0.7], None)
+    assert store.count_applications('a@example.fr', since=(datetime.now() - timedelta(days=1, hours=1)).isoformat()) == 2
+    assert store.application_companies('a@example.fr') == [f"Entreprise {n}" for n in range(5)]
+    assert store.applied_offer_ids('a@example.fr', [make_offer(1)['url'], records[0]['offer_id'], None]) == {
+        records[0]['offer_id']
+    }
+
+
+def test_documents_are_stored_compressed_and_loaded_on_demand(store):
+    [application_id] = add_applications(store, 'a@example.fr', [0.9])
+    records, _ = store.page_applications('a@example.fr')
+
+    assert 'cv' not in records[0] and 'application' not in records[0]
+    assert store.get_application_documents(application_id) == {'cv': "CV 0", 'cover_letter': "Lettre"}
+    raw = store._connection().execute("SELECT data FROM application_documents").fetchone()[0]
+    assert b"Lettre" not in raw
+
+
+def test_archiving_compacts_old_applications_by_month(store):
+    add_applications(store, 'a@example.fr', [0.9, 0.7])
+    old_job = make_offer(9)
+    store.add_application('a@example.fr', old_job, 0.6, {'cv': "Ancien CV"}, '2026-01-15T10:00:00')
+    store.add_application('a@example.fr', make_offer(8), 0.5, None, '2026-01-20T10:00:00')
+
+    assert store.archive_applications('2026-02-01', email='a@example.fr') == 2
+    store.add_application('a@example.fr', make_offer(7), 0.4, None, '2026-01-25T10:00:00')
+    assert store.archive_applications('2026-02-01') == 1
+
+    assert store.count_applications('a@example.fr') == 2
+    assert store.count_applications('a@example.fr', include_archived=True) == 5
+    archived = list(store.iter_archived_applications('a@example.fr'))
+    assert [record['sent_date'][:10] for record in archived] == ['2026-01-25', '2026-01-20', '2026-01-15']
+    assert archived[-1]['application'] == {'cv': "Ancien CV"}
+
+    store.delete_applications('a@example.fr')
+    assert store.count_applications('a@example.fr', include_archived=True) == 0
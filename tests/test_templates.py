@@ -0,0 +1,120 @@
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import make_offer
+from safejob.generation import ApplicationGeneratorAI
+from safejob.templates import DocumentTemplate
+
+PROFILE = {'name': "Camille Martin", 'experience': "Cinq ans de vente", 'skills': ['Vente', 'CRM', 'Négociation', 'Anglais']}
+
+
+def baseline_documents(generator, job_offer, user_profile, domain, job_keywords):
+    """CV et lettre tels que les produisaient les f-strings d'origine"""
+    base_template = generator.cv_templates.get(domain, "CV professionnel adapté au poste")
+    cv = f"""
+        {base_template}
+        
+        PROFIL PROFESSIONNEL:
+        {user_profile.get('experience', 'Expérience professionnelle diversifiée')}
+        
+        COMPÉTENCES CLÉS:
+        {', '.join(user_profile.get('skills', ['Compétences variées']))}
+        
+        MOTS-CLÉS OPTIMISÉS POUR CE POSTE:
+        {', '.join(job_keywords)}
+        
+        EXPÉRIENCE PERTINENTE:
+        Expérience adaptée aux exigences du poste de {job_offer['title']} chez {job_offer['company']}
+        """
+    base_template = generator.cover_letter_templates.get(domain, "Madame, Monsieur,\n\nIntéressé(e) par votre offre d'emploi...")
+    letter = f"""
+        {base_template}
+        
+        Votre offre pour le poste de {job_offer['title']} chez {job_offer['company']} a retenu toute mon attention.
+        
+        Fort(e) de mon expérience en {domain}, je suis convaincu(e) que mon profil correspond parfaitement à vos attentes.
+        
+        Mes compétences en {', '.join(user_profile.get('skills', ['diverses compétences'])[:3])} me permettront de contribuer efficacement à vos objectifs.
+        
+        Je serais ravi(e) de vous rencontrer pour discuter de cette opportunité.
+        
+        Cordialement,
+        {user_profile.get('name', 'Candidat')}
+        """
+    return cv, letter
+
+
+def test_render_and_partial_bind_match_str_format():
+    text = "Bonjour {name},\n{{littéral}} poste de {title} chez {company} ({title})"
+    values = {'name': "Camille", 'title': "Commercial", 'company': "Martin SA"}
+    template = DocumentTemplate(text)
+
+    assert template.fields == {'name', 'title', 'company'}
+    assert template.render(**values) == text.format(**values)
+    bound = template.bind(name="Camille")
+    assert bound.fields == {'title', 'company'}
+    assert bound.render(**values) == text.format(**values)
+    # Les littéraux voisins du champ remplacé ne forment plus qu'un segment
+    assert len(bound.segments) == len(template.segments) - 2
+    with pytest.raises(KeyError):
+        bound.render(title="Commercial")
+
+
+@pytest.mark.parametrize('domain', ['commercial', 'informatique', 'inconnu'])
+def test_generated_documents_match_the_original_output(domain):
+    generator = ApplicationGeneratorAI()
+    jobs = [
+        make_offer(1, description="Travail en équipe sur SAP et Excel, autonomie et rigueur."),
+        make_offer(2, description="Gestion du CRM, communication client."),
+        {'title': "Développeur Python", 'company': "Tech SA", 'description': "Python, SQL et organisation"},
+    ]
+
+    applications = generator.generate_batch(jobs, PROFILE, {'main_domain': domain})
+
+    for job, application in zip(jobs, applications):
+        keywords = generator._extract_keywords_from_job(job)
+        assert (application['cv'], application['cover_letter']) == baseline_documents(generator, job, PROFILE, domain, keywords)
+    assert generator._extract_keywords_from_job(jobs[0]) == ['excel', 'sap', 'équipe', 'autonomie', 'rigueur']
+    assert generator._extract_keywords_from_job(jobs[2]) == ['python', 'sql', 'organisation']
+
+
+def test_profile_templates_are_compiled_once_and_bounded(monkeypatch):
+    generator = ApplicationGeneratorAI()
+    monkeypatch.setattr(ApplicationGeneratorAI, 'USER_TEMPLATE_CACHE_SIZE', 2)
+    criteria = {'main_domain': 'commercial'}
+
+    generator.generate_batch([make_offer(1)], PROFILE, criteria)
+    templates = generator._user_templates(PROFILE, 'commercial')
+    generator.generate_batch([make_offer(2)], dict(PROFILE), criteria)
+    assert generator._user_templates(PROFILE, 'commercial') is templates
+
+    for name in ("Alex", "Sam"):
+        generator.generate_batch([make_offer(1)], dict(PROFILE, name=name), criteria)
+    assert len(generator._compiled_users) == 2
+    assert generator._user_templates(PROFILE, 'commercial') is not templates
+
+
+def test_shared_generator_caches_survive_concurrent_batches(monkeypatch):
+    generator = ApplicationGeneratorAI()
+    monkeypatch.setattr(ApplicationGeneratorAI, 'USER_TEMPLATE_CACHE_SIZE', 2)
+    monkeypatch.setattr(ApplicationGeneratorAI, 'KEYWORD_CACHE_SIZE', 2)
+    # Bascule entre threads très fréquente pour provoquer les accès concurrents
+    switch_interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    criteria = {'main_domain': 'commercial'}
+
+    def run(worker):
+        for round_number in range(1000):
+            profile = dict(PROFILE, name=f"Profil {(worker + round_number) % 4}")
+            generator.generate_batch([make_offer(round_number % 5), make_offer(worker % 3)], profile, criteria)
+
+    try:
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            list(executor.map(run, range(8)))
+    finally:
+        sys.setswitchinterval(switch_interval)
+
+    assert len(generator._compiled_users) == 2
+    assert len(generator._job_keywords) == 2